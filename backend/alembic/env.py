@@ -32,8 +32,9 @@ for path in src_path.rglob("*.py"):
 # this is the Alembic Config object
 config = context.config
 
-# Interpret the config file for Python logging
-if config.config_file_name is not None:
+# Interpret the config file for Python logging, unless the app is running
+# the migrations in-process and has already set up its own logging
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # Set sqlalchemy.url
@@ -82,6 +83,12 @@ async def run_async_migrations() -> None:
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
 
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # called from api.core.migrations with an open connection
+        do_run_migrations(connection)
+        return
+
     asyncio.run(run_async_migrations())
 
 
@@ -0,0 +1,44 @@
+"""initial schema
+
+Creates the workouts table the app used before migrations were tracked.
+Databases that already have it (created with `Base.metadata.create_all`)
+are only stamped, so every database starts from the same revision. The
+activity_streams table has a revision of its own, 0004.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "workouts" not in tables:
+        op.create_table(
+            "workouts",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("pace", sa.String(length=5), nullable=True),
+            sa.Column("time", sa.String(length=8), nullable=True),
+            sa.Column("distance", sa.Numeric(precision=4, scale=2), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(op.f("ix_workouts_id"), "workouts", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_workouts_id"), table_name="workouts")
+    op.drop_table("workouts")
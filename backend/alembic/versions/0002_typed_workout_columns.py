@@ -0,0 +1,127 @@
+"""typed workout columns
+
+Stores workout pace and time as whole seconds instead of "mm:ss" and
+"h:mm:ss" strings, widens distance past 99.99, and adds the date and
+athlete columns with the indexes range queries on them use. Strings that
+do not parse as a time become NULL.
+
+On Postgres the values are converted in place by `ALTER COLUMN ... USING`;
+other databases (SQLite in development) convert them in Python and rebuild
+the table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# column -> length of the string column it replaces
+TIME_COLUMNS = {"pace": 5, "time": 8}
+
+INDEXES = {
+    "ix_workouts_athlete_id_date": ["athlete_id", "date"],
+    "ix_workouts_athlete_id_pace": ["athlete_id", "pace"],
+    "ix_workouts_athlete_id_distance": ["athlete_id", "distance"],
+    "ix_workouts_date": ["date"],
+}
+
+
+def _to_seconds_sql(column: str) -> str:
+    column = f'"{column}"'  # time is a keyword
+    part = lambda n: f"split_part({column}, ':', {n})::integer"  # noqa: E731
+    return (
+        f"CASE WHEN {column} ~ '^[0-9]{{1,2}}:[0-9]{{2}}$' "
+        f"THEN {part(1)} * 60 + {part(2)} "
+        f"WHEN {column} ~ '^[0-9]{{1,2}}:[0-9]{{2}}:[0-9]{{2}}$' "
+        f"THEN {part(1)} * 3600 + {part(2)} * 60 + {part(3)} END"
+    )
+
+
+def _to_string_sql(column: str) -> str:
+    column = f'"{column}"'
+    pad = lambda value: f"lpad(({value})::text, 2, '0')"  # noqa: E731
+    return (
+        f"CASE WHEN {column} >= 3600 "
+        f"THEN ({column} / 3600)::text || ':' || {pad(f'{column} % 3600 / 60')} || ':' || {pad(f'{column} % 60')} "
+        f"ELSE ({column} / 60)::text || ':' || {pad(f'{column} % 60')} END"
+    )
+
+
+def _to_seconds(value: str | None) -> int | None:
+    if value is None:
+        return None
+    parts = value.split(":")
+    if not 2 <= len(parts) <= 3 or not all(p.isdigit() and len(p) <= 2 for p in parts):
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def _to_string(value: int | None) -> str | None:
+    if value is None:
+        return None
+    hours, rest = divmod(value, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+
+
+def _convert_in_python(convert) -> None:
+    workouts = sa.table("workouts", sa.column("id"), *(sa.column(c) for c in TIME_COLUMNS))
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(workouts)).all()
+    if rows:
+        bind.execute(
+            workouts.update().where(workouts.c.id == sa.bindparam("_id")),
+            [{"_id": row.id, **{c: convert(getattr(row, c)) for c in TIME_COLUMNS}} for row in rows],
+        )
+
+
+def upgrade() -> None:
+    postgres = op.get_bind().dialect.name == "postgresql"
+    if not postgres:
+        _convert_in_python(_to_seconds)
+    with op.batch_alter_table("workouts") as batch_op:
+        for column, length in TIME_COLUMNS.items():
+            batch_op.alter_column(column, type_=sa.Integer(), existing_type=sa.String(length),
+                                  existing_nullable=True, postgresql_using=_to_seconds_sql(column))
+        batch_op.alter_column("distance", type_=sa.Numeric(precision=7, scale=2),
+                              existing_type=sa.Numeric(precision=4, scale=2), existing_nullable=True)
+        batch_op.add_column(sa.Column("date", sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column("athlete_id", sa.Integer(), nullable=True))
+    for name, columns in INDEXES.items():
+        op.create_index(name, "workouts", columns, unique=False)
+
+
+def downgrade() -> None:
+    # distances of 100 or more no longer fit and make the downgrade fail
+    for name in INDEXES:
+        op.drop_index(name, table_name="workouts")
+    postgres = op.get_bind().dialect.name == "postgresql"
+    with op.batch_alter_table("workouts") as batch_op:
+        batch_op.drop_column("athlete_id")
+        batch_op.drop_column("date")
+        batch_op.alter_column("distance", type_=sa.Numeric(precision=4, scale=2),
+                              existing_type=sa.Numeric(precision=7, scale=2), existing_nullable=True)
+        if postgres:
+            for column, length in TIME_COLUMNS.items():
+                batch_op.alter_column(column, type_=sa.String(length), existing_type=sa.Integer(),
+                                      existing_nullable=True, postgresql_using=_to_string_sql(column))
+    if not postgres:
+        _convert_in_python(_to_string)
+        with op.batch_alter_table("workouts") as batch_op:
+            for column, length in TIME_COLUMNS.items():
+                batch_op.alter_column(column, type_=sa.String(length), existing_type=sa.Integer(),
+                                      existing_nullable=True)
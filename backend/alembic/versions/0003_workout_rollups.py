@@ -0,0 +1,56 @@
+"""workout rollups
+
+Adds the weekly/monthly rollup table maintained by `api.rollups` and fills
+it from the existing workouts.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PERIOD_START = {
+    "postgresql": {
+        "week": "date_trunc('week', \"date\")::date",
+        "month": "date_trunc('month', \"date\")::date",
+    },
+    "sqlite": {
+        "week": "date(date, '-6 days', 'weekday 1')",
+        "month": "date(date, 'start of month')",
+    },
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workout_rollups",
+        sa.Column("athlete_id", sa.Integer(), nullable=False),
+        sa.Column("period", sa.String(length=5), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("distance", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("time", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("athlete_id", "period", "period_start"),
+    )
+    for period, start in PERIOD_START[op.get_bind().dialect.name].items():
+        op.execute(
+            'INSERT INTO workout_rollups (athlete_id, period, period_start, distance, "time", count) '
+            f"SELECT coalesce(athlete_id, 0), '{period}', {start}, "
+            'coalesce(sum(distance), 0), coalesce(sum("time"), 0), count(*) '
+            f'FROM workouts WHERE "date" IS NOT NULL GROUP BY coalesce(athlete_id, 0), {start}'
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("workout_rollups")
@@ -0,0 +1,47 @@
+"""activity streams
+
+Adds the table of recorded tracks uploaded to PUT /workouts/{id}/activity
+(see `api.activities`). Revision 0001 used to create it, so databases that
+already have it are left as they are.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if "activity_streams" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "activity_streams",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("workout_id", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("time", sa.LargeBinary(), nullable=False),
+        sa.Column("distance", sa.LargeBinary(), nullable=False),
+        sa.Column("heart_rate", sa.LargeBinary(), nullable=False),
+        sa.Column("elevation", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["workout_id"], ["workouts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("workout_id"),
+    )
+    op.create_index(op.f("ix_activity_streams_id"), "activity_streams", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_activity_streams_id"), table_name="activity_streams")
+    op.drop_table("activity_streams")
@@ -0,0 +1,237 @@
+"""Streaming GPX/TCX track parsing into compact arrays.
+
+Uploads are fed to an incremental XML parser chunk by chunk as they arrive,
+and every trackpoint is appended to typed arrays (`array.array`) and then
+dropped from the element tree, so memory grows by a few dozen bytes per
+point rather than with the size of the XML. Both formats go through the
+same parser: GPX `trkpt` and TCX `Trackpoint` elements are recognised by
+name, whatever their namespace.
+
+A parsed `Track` holds one value per point:
+
+    time: seconds since the first point
+    distance: cumulative meters, from TCX `DistanceMeters` when present,
+        otherwise the great-circle distance between successive positions
+    heart_rate: beats per minute, NaN where not recorded
+    elevation: meters, NaN where not recorded
+"""
+from __future__ import annotations
+from array import array
+from collections.abc import AsyncIterable, Iterable
+from datetime import datetime, timezone
+from xml.etree.ElementTree import ParseError, XMLPullParser
+from api.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+CHUNK_SIZE = 64 * 1024
+
+# mean earth radius in meters
+EARTH_RADIUS = 6_371_008.8
+
+# column -> little-endian dtype it is stored as
+STREAM_DTYPES = {
+    "time": "<f8",
+    "distance": "<f8",
+    "heart_rate": "<f4",
+    "elevation": "<f4",
+}
+
+_POINT_TAGS = {"trkpt", "Trackpoint"}
+
+# trackpoint child elements (GPX and TCX) -> point field
+_POINT_FIELDS = {
+    "time": "time",
+    "Time": "time",
+    "ele": "elevation",
+    "AltitudeMeters": "elevation",
+    "hr": "heart_rate",
+    "Value": "heart_rate",  # TCX HeartRateBpm/Value
+    "LatitudeDegrees": "lat",
+    "LongitudeDegrees": "lon",
+    "DistanceMeters": "distance",
+}
+
+
+class Track:
+    """Per-point arrays of one activity."""
+
+    def __init__(self, start_time: datetime | None, time: np.ndarray, distance: np.ndarray,
+                 heart_rate: np.ndarray, elevation: np.ndarray):
+        self.start_time = start_time
+        self.time = time
+        self.distance = distance
+        self.heart_rate = heart_rate
+        self.elevation = elevation
+
+    @property
+    def points(self) -> int:
+        return len(self.time)
+
+    def summary(self) -> dict:
+        return {
+            "start_time": self.start_time,
+            "points": self.points,
+            "duration": float(self.time[-1]) if self.points else 0.0,
+            "distance": float(self.distance[-1]) if self.points else 0.0,
+        }
+
+    def to_columns(self) -> dict:
+        """Column values for `models.ActivityStream`."""
+        columns = {
+            name: np.ascontiguousarray(getattr(self, name), dtype=dtype).tobytes()
+            for name, dtype in STREAM_DTYPES.items()
+        }
+        return {"start_time": self.start_time, "points": self.points, **columns}
+
+    @classmethod
+    def from_columns(cls, row: dict) -> "Track":
+        """Inverse of `to_columns`, for a row read from `activity_streams`."""
+        arrays = {name: decode_column(name, row[name]) for name in STREAM_DTYPES}
+        return cls(row["start_time"], **arrays)
+
+
+def decode_column(name: str, data: bytes) -> np.ndarray:
+    """Array stored in the `name` column of `activity_streams`."""
+    dtype = STREAM_DTYPES[name]
+    return np.frombuffer(data, dtype=dtype).astype(dtype[1:])
+
+
+def haversine_distance(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Cumulative great-circle distance in meters along a path.
+
+    Steps to or from a point without a position count as zero.
+    """
+    lat, lon = np.radians(lat), np.radians(lon)
+    a = (np.sin(np.diff(lat) / 2) ** 2
+         + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2)
+    steps = np.nan_to_num(2 * EARTH_RADIUS * np.arcsin(np.sqrt(a)))
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+
+def _float(value: str | None) -> float:
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _timestamp(value: str) -> datetime:
+    timestamp = datetime.fromisoformat(value.strip())
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+class TrackParser:
+    """Incremental GPX/TCX parser; `feed` chunks, then `close` for the `Track`.
+
+    Raises:
+        ValueError: from `feed` or `close` on malformed XML, and from
+            `close` when no trackpoint had a timestamp
+    """
+
+    def __init__(self) -> None:
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._open: list = []
+        self._point: dict | None = None
+        self._start: datetime | None = None
+        self._time = array("d")
+        self._distance = array("d")
+        self._heart_rate = array("f")
+        self._elevation = array("f")
+        self._lat = array("d")
+        self._lon = array("d")
+
+    def feed(self, data: bytes) -> None:
+        try:
+            self._parser.feed(data)
+            self._read_events()
+        except ParseError as e:
+            raise ValueError(f"invalid XML: {e}") from e
+
+    def close(self) -> Track:
+        try:
+            self._parser.close()
+            self._read_events()
+        except ParseError as e:
+            raise ValueError(f"invalid XML: {e}") from e
+        if not self._time:
+            raise ValueError("no timestamped trackpoints found")
+
+        distance = np.frombuffer(self._distance, dtype=np.float64)
+        if np.isnan(distance).all():
+            distance = haversine_distance(np.frombuffer(self._lat, dtype=np.float64),
+                                          np.frombuffer(self._lon, dtype=np.float64))
+        else:
+            # recorded distance only grows, so a running max fills the gaps
+            distance = np.nan_to_num(np.fmax.accumulate(distance))
+        # the arrays share memory with the buffers they were built in
+        return Track(
+            self._start,
+            np.frombuffer(self._time, dtype=np.float64),
+            distance,
+            np.frombuffer(self._heart_rate, dtype=np.float32),
+            np.frombuffer(self._elevation, dtype=np.float32),
+        )
+
+    def _read_events(self) -> None:
+        for event, element in self._parser.read_events():
+            tag = element.tag.rpartition("}")[2]
+            if event == "start":
+                self._open.append(element)
+                if tag in _POINT_TAGS:
+                    self._point = {"lat": element.get("lat"), "lon": element.get("lon")}
+                continue
+
+            self._open.pop()
+            if self._point is None:
+                continue
+            if tag in _POINT_TAGS:
+                self._add_point(self._point)
+                self._point = None
+                # drop the finished point so the tree never holds more than one
+                if self._open:
+                    self._open[-1].remove(element)
+            elif tag in _POINT_FIELDS:
+                self._point[_POINT_FIELDS[tag]] = element.text
+
+    def _add_point(self, point: dict) -> None:
+        if not point.get("time"):
+            return
+        try:
+            timestamp = _timestamp(point["time"])
+        except ValueError:
+            return
+        if self._start is None:
+            self._start = timestamp
+        self._time.append((timestamp - self._start).total_seconds())
+        self._distance.append(_float(point.get("distance")))
+        self._heart_rate.append(_float(point.get("heart_rate")))
+        self._elevation.append(_float(point.get("elevation")))
+        self._lat.append(_float(point.get("lat")))
+        self._lon.append(_float(point.get("lon")))
+
+
+async def parse_track(chunks: AsyncIterable[bytes]) -> Track:
+    """Parse a GPX or TCX document as its chunks arrive."""
+    parser = TrackParser()
+    async for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def parse_track_chunks(chunks: Iterable[bytes]) -> Track:
+    """Synchronous `parse_track`."""
+    parser = TrackParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def parse_track_file(path: str, chunk_size: int = CHUNK_SIZE) -> Track:
+    """Parse a GPX or TCX file from disk `chunk_size` bytes at a time."""
+    with open(path, "rb") as file:
+        return parse_track_chunks(iter(lambda: file.read(chunk_size), b""))
@@ -0,0 +1,204 @@
+"""Time in zone, smoothing and cardiac drift over activity streams.
+
+Streams are treated as intervals between successive points: an interval
+takes the heart rate recorded at its end and the speed it was covered at,
+and counts for the seconds it lasted. Intervals longer than `MAX_GAP` are
+pauses (auto-pause, a stopped watch) and count for nothing.
+
+Zones are half-open ranges above a lower bound, so a set of lower bounds is
+binned with `np.digitize` and summed with a weighted `np.bincount`:
+
+    heart rate: zone 1-5 from `calcs.heart_rate_zones`, 0 below zone 1;
+        the gaps between zones count towards the zone below
+    pace: the `calcs.get_training_paces` bands, each from its own speed up
+        to the next faster one, "Below Easy" slower than Easy (lower)
+
+Rollups over many activities add every activity's seconds in each zone to
+the totals of its week or month as the activity is read, so they hold one
+track and one row per period, however many activities there are.
+"""
+from __future__ import annotations
+from collections.abc import Iterable
+from datetime import date, timedelta
+from api import batch, calcs
+from api.activities import Track
+from api.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# seconds; longer intervals between points are pauses
+MAX_GAP = 30.0
+
+# seconds of trailing speed averaged before pace banding
+DEFAULT_SMOOTHING = 30.0
+
+BELOW_EASY = "Below Easy"
+PACE_BANDS = (BELOW_EASY, *calcs.TRAINING_PACE_PCTS)
+
+
+def rolling_mean(values: np.ndarray, time: np.ndarray, window: float) -> np.ndarray:
+    """Mean of the values recorded in the trailing `window` seconds of every point.
+
+    NaN values are left out of the mean; points with none in their window
+    are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    total = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    count = np.concatenate(([0], np.cumsum(valid)))
+    start = np.searchsorted(time, np.asarray(time) - window, side="right")
+    window_total = total[1:] - total[start]
+    window_count = count[1:] - count[start]
+    return np.divide(window_total, window_count,
+                     out=np.full(len(values), np.nan), where=window_count > 0)
+
+
+def interval_seconds(time: np.ndarray) -> np.ndarray:
+    """Length of every interval between points, zero for pauses."""
+    seconds = np.diff(time)
+    return np.where(seconds <= MAX_GAP, seconds, 0.0)
+
+
+def interval_speed(distance: np.ndarray, time: np.ndarray,
+                   smoothing: float = DEFAULT_SMOOTHING) -> np.ndarray:
+    """Meters per second of every interval, averaged over `smoothing` seconds.
+
+    Pauses have no speed, so they do not drag down the average around them.
+    """
+    seconds = np.diff(time)
+    speed = np.divide(np.diff(distance), seconds,
+                      out=np.full(len(seconds), np.nan), where=(seconds > 0) & (seconds <= MAX_GAP))
+    if smoothing:
+        speed = rolling_mean(speed, time[1:], smoothing)
+    return speed
+
+
+def heart_rate_edges(max_heart_rate: int) -> np.ndarray:
+    """Lower bound of every heart rate zone."""
+    return np.array([low for low, _ in calcs.heart_rate_zones(max_heart_rate).values()],
+                    dtype=np.float64)
+
+
+def pace_band_edges(vdot: float) -> np.ndarray:
+    """Speed (m/s) of every training pace, slowest first."""
+    percentages = np.array(list(calcs.TRAINING_PACE_PCTS.values()))
+    return batch.get_vdot_pace(np.float64(vdot), percentages) / 60
+
+
+def time_in_bins(values: np.ndarray, seconds: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Seconds spent below `edges[0]` and in every [edges[i], edges[i + 1]) range."""
+    valid = ~np.isnan(values)
+    bins = np.digitize(values[valid], edges)
+    return np.bincount(bins, weights=seconds[valid], minlength=len(edges) + 1)
+
+
+def heart_rate_zones(track: Track, max_heart_rate: int) -> dict[int, float]:
+    """Seconds in every heart rate zone, 0 being below zone 1."""
+    seconds = time_in_bins(track.heart_rate[1:].astype(np.float64),
+                           interval_seconds(track.time), heart_rate_edges(max_heart_rate))
+    return dict(enumerate(seconds.tolist()))
+
+
+def pace_bands(track: Track, vdot: float, smoothing: float = DEFAULT_SMOOTHING) -> dict[str, float]:
+    """Seconds in every training pace band."""
+    seconds = time_in_bins(interval_speed(track.distance, track.time, smoothing),
+                           interval_seconds(track.time), pace_band_edges(vdot))
+    return dict(zip(PACE_BANDS, seconds.tolist()))
+
+
+def cardiac_drift(track: Track, smoothing: float = DEFAULT_SMOOTHING) -> float | None:
+    """Percent drop in speed per heartbeat from the first half of the time to the second.
+
+    Positive values mean heart rate rose relative to pace (aerobic
+    decoupling); None without heart rate for both halves.
+    """
+    speed = interval_speed(track.distance, track.time, smoothing)
+    heart_rate = track.heart_rate[1:].astype(np.float64)
+    seconds = interval_seconds(track.time)
+    if not len(seconds):
+        return None
+    valid = ~(np.isnan(speed) | np.isnan(heart_rate)) & (heart_rate > 0) & (seconds > 0)
+    elapsed = np.cumsum(seconds)
+    second_half = elapsed > elapsed[-1] / 2
+    efficiency = []
+    for half in (~second_half, second_half):
+        weights = seconds[valid & half]
+        if weights.sum() == 0:
+            return None
+        efficiency.append(np.average(speed[valid & half] / heart_rate[valid & half], weights=weights))
+    first, second = efficiency
+    return float((first - second) / first * 100)
+
+
+def period_start(day: date, period: str) -> date:
+    """Monday of the week or first day of the month `day` falls in."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    raise ValueError(f"unknown period {period!r}")
+
+
+class Rollup:
+    """Activity count, distance, moving time and time in zone per week or month.
+
+    Tracks are added one at a time and only their per-period totals are
+    kept. Tracks without a start time are left out. Zones are only reported
+    when `max_heart_rate` (heart rate) or `vdot` (pace) is given.
+    """
+
+    def __init__(self, period: str = "week", max_heart_rate: int | None = None,
+                 vdot: float | None = None, smoothing: float = DEFAULT_SMOOTHING):
+        if period not in ("week", "month"):
+            raise ValueError(f"unknown period {period!r}")
+        self.period = period
+        self.smoothing = smoothing
+        self.heart_rate_edges = heart_rate_edges(max_heart_rate) if max_heart_rate is not None else None
+        self.pace_band_edges = pace_band_edges(vdot) if vdot is not None else None
+        self.totals: dict[date, dict] = {}
+
+    def _period_totals(self, start: date) -> dict:
+        totals = self.totals.get(start)
+        if totals is None:
+            totals = self.totals[start] = {"activities": 0, "distance": 0.0, "moving_time": 0.0}
+            if self.heart_rate_edges is not None:
+                totals["heart_rate_zones"] = np.zeros(len(self.heart_rate_edges) + 1)
+            if self.pace_band_edges is not None:
+                totals["pace_bands"] = np.zeros(len(self.pace_band_edges) + 1)
+        return totals
+
+    def add(self, track: Track) -> None:
+        if track.start_time is None or track.points < 2:
+            return
+        totals = self._period_totals(period_start(track.start_time.date(), self.period))
+        seconds = interval_seconds(track.time)
+        totals["activities"] += 1
+        totals["distance"] += float(track.distance[-1] - track.distance[0])
+        totals["moving_time"] += float(seconds.sum())
+        if self.heart_rate_edges is not None:
+            totals["heart_rate_zones"] += time_in_bins(track.heart_rate[1:].astype(np.float64),
+                                                       seconds, self.heart_rate_edges)
+        if self.pace_band_edges is not None:
+            totals["pace_bands"] += time_in_bins(interval_speed(track.distance, track.time, self.smoothing),
+                                                 seconds, self.pace_band_edges)
+
+    def rows(self) -> list[dict]:
+        """One row per period with an activity, earliest first."""
+        rows = []
+        for start, totals in sorted(self.totals.items()):
+            row = {"period_start": start, **totals}
+            if "heart_rate_zones" in row:
+                row["heart_rate_zones"] = dict(enumerate(row["heart_rate_zones"].tolist()))
+            if "pace_bands" in row:
+                row["pace_bands"] = dict(zip(PACE_BANDS, row["pace_bands"].tolist()))
+            rows.append(row)
+        return rows
+
+
+def rollup(tracks: Iterable[Track], period: str = "week", max_heart_rate: int | None = None,
+           vdot: float | None = None, smoothing: float = DEFAULT_SMOOTHING) -> list[dict]:
+    """`Rollup` rows of `tracks`."""
+    totals = Rollup(period, max_heart_rate, vdot, smoothing)
+    for track in tracks:
+        totals.add(track)
+    return totals.rows()
@@ -0,0 +1,179 @@
+"""Array versions of the calculators in `api.calcs`.
+
+Every function takes NumPy arrays (one element per row) and returns the
+same values the scalar routes would produce for each row. The scalar code
+goes through `timedelta`, which rounds to whole microseconds, and through
+`round`/`int`, so a handful of rows that land within floating point noise
+of a rounding boundary are recomputed with the scalar functions to keep the
+results identical.
+"""
+from __future__ import annotations
+from datetime import timedelta
+from api import calcs
+from api.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# tolerance (in output units) for rows recomputed with the scalar functions
+_EPS = 1e-5
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _micro(seconds: np.ndarray) -> np.ndarray:
+    # timedelta keeps whole microseconds, rounding half to even like np.rint
+    return np.rint(seconds * 1e6)
+
+
+def _near_integer(values: np.ndarray, offset: float = 0.0) -> np.ndarray:
+    shifted = values - offset
+    return np.abs(shifted - np.rint(shifted)) < _EPS
+
+
+def _fixup(result: np.ndarray, mask: np.ndarray, scalar) -> np.ndarray:
+    for i in np.flatnonzero(mask):
+        result[i] = scalar(i)
+    return result
+
+
+def format_seconds(seconds: np.ndarray) -> list[str]:
+    """Format whole seconds like `calcs.format_time_delta`."""
+    seconds = np.asarray(seconds, dtype=np.int64)
+    hours, rest = np.divmod(seconds, 3600)
+    minutes, secs = np.divmod(rest, 60)
+    return [
+        f"{h}:{m:02}:{s:02}" if h > 0 else f"{m}:{s:02}"
+        for h, m, s in zip(hours.tolist(), minutes.tolist(), secs.tolist())
+    ]
+
+
+def get_vdot(distances_in_meters, times_in_seconds) -> np.ndarray:
+    d, seconds = np.broadcast_arrays(_as_array(distances_in_meters),
+                                     _micro(_as_array(times_in_seconds)) / 1e6)
+    t = seconds / 60  # minutes
+    v = d / t
+    vo2 = -4.6 + 0.182258 * v + 0.000104 * v**2
+    pct = 0.8 + 0.1894393 * np.exp(-0.012778 * t) + 0.2989558 * np.exp(-0.1932605 * t)
+    raw = vo2 / pct * 10
+    vdot = np.rint(raw) / 10
+    return _fixup(vdot, _near_integer(raw, 0.5),
+                  lambda i: calcs.get_vdot(d[i], timedelta(seconds=float(seconds[i]))))
+
+
+def get_pace(times_in_seconds, distances_in_km) -> np.ndarray:
+    """Pace in microseconds per unit distance, as `calcs.get_pace` would hold it."""
+    return np.rint(_micro(_as_array(times_in_seconds)) / _as_array(distances_in_km))
+
+
+def convert_to_mi_pace(pace_micro: np.ndarray) -> np.ndarray:
+    return np.rint(pace_micro / 0.621)
+
+
+def convert_to_km_pace(pace_micro: np.ndarray) -> np.ndarray:
+    return np.rint(pace_micro / 1.609)
+
+
+def _whole_seconds(micro: np.ndarray, scalar) -> np.ndarray:
+    seconds = micro / 1e6
+    result = np.floor(seconds)
+    return _fixup(result, _near_integer(seconds), scalar).astype(np.int64)
+
+
+def race_pace(times_in_seconds, distances_in_meters, unit: str = "mi") -> np.ndarray:
+    """Whole seconds of pace per `unit`, matching the `/race_pace` route."""
+    times, distances = np.broadcast_arrays(_as_array(times_in_seconds),
+                                           _as_array(distances_in_meters))
+    pace = get_pace(times, distances / 1000)
+    if unit == "mi":
+        pace = convert_to_mi_pace(pace)
+
+    def scalar(i):
+        p = calcs.get_pace(timedelta(seconds=float(times[i])), distances[i] / 1000)
+        if unit == "mi":
+            p = calcs.convert_to_mi_pace(p)
+        return int(p.total_seconds())
+    return _whole_seconds(pace, scalar)
+
+
+def convert_pace(paces_in_seconds, target_unit: str = "mi") -> np.ndarray:
+    """Whole seconds of converted pace, matching the `/convert_pace` route."""
+    paces = _as_array(paces_in_seconds)
+    convert = convert_to_mi_pace if target_unit == "mi" else convert_to_km_pace
+    scalar_convert = calcs.convert_to_mi_pace if target_unit == "mi" else calcs.convert_to_km_pace
+    return _whole_seconds(
+        convert(_micro(paces)),
+        lambda i: int(scalar_convert(timedelta(seconds=float(paces[i]))).total_seconds())
+    )
+
+
+def percentage_of_speed(paces_in_seconds, percentages) -> np.ndarray:
+    paces = _micro(_as_array(paces_in_seconds)) / 1e6
+    pcts = np.broadcast_to(_as_array(percentages), paces.shape)
+    raw = paces / pcts
+    return _fixup(np.rint(raw), _near_integer(raw, 0.5),
+                  lambda i: calcs.percentage_of_speed(timedelta(seconds=float(paces[i])),
+                                                      float(pcts[i])).total_seconds()
+                  ).astype(np.int64)
+
+
+def percentage_of_pace(paces_in_seconds, percentages) -> np.ndarray:
+    paces = _micro(_as_array(paces_in_seconds)) / 1e6
+    pcts = np.broadcast_to(_as_array(percentages), paces.shape)
+    raw = paces * (1 + (1 - pcts))
+    return _fixup(np.rint(raw), _near_integer(raw, 0.5),
+                  lambda i: calcs.percentage_of_pace(timedelta(seconds=float(paces[i])),
+                                                     float(pcts[i])).total_seconds()
+                  ).astype(np.int64)
+
+
+def get_vdot_pace(vdots: np.ndarray, percentage: float) -> np.ndarray:
+    return (
+            -0.182258 + np.sqrt(0.033218 - 0.000416 * (-4.6 - (vdots * percentage)))
+        ) / 0.000208
+
+
+def get_training_paces(vdots, unit: str = "km") -> dict[str, np.ndarray]:
+    """Whole seconds of each training pace, matching the `/vdot_paces` route.
+
+    The scalar route formats the km pace first and converts the formatted
+    value to mi, so the mi paces are derived from the truncated km seconds.
+    """
+    vdots = _as_array(vdots)
+    training_paces = {}
+    for name, pct in calcs.TRAINING_PACE_PCTS.items():
+        v = get_vdot_pace(vdots, pct)  # meters/min
+        pace = 1000 / v  # min/km
+        km_seconds = _whole_seconds(
+            np.rint(pace * 60e6),
+            lambda i: int(timedelta(minutes=float(pace[i])).total_seconds())
+        )
+        if unit == "mi":
+            training_paces[name] = convert_pace(km_seconds, "mi")
+        else:
+            training_paces[name] = km_seconds
+    return training_paces
+
+
+def get_race_time(vdots, distances_in_meters) -> np.ndarray:
+    """Race time in seconds for every (vdot, distance) row, see `calcs.get_race_time`.
+
+    Raises ValueError, like it, when a row has no time within the bounds.
+    """
+    target, d = np.broadcast_arrays(_as_array(vdots), _as_array(distances_in_meters))
+    if (d <= 0).any():
+        raise ValueError("race distances must be positive")
+    fastest, slowest = d / 2000, d / 20
+    lower, upper = fastest, slowest
+    for _ in range(60):
+        t = (lower + upper) / 2
+        v = d / t
+        vo2 = -4.6 + 0.182258 * v + 0.000104 * v**2
+        pct = 0.8 + 0.1894393 * np.exp(-0.012778 * t) + 0.2989558 * np.exp(-0.1932605 * t)
+        faster = vo2 / pct > target
+        lower = np.where(faster, t, lower)
+        upper = np.where(faster, upper, t)
+    if ((lower == fastest) | (upper == slowest)).any():
+        raise ValueError("no race time within bounds for some VDOTs")
+    return (lower + upper) / 2 * 60
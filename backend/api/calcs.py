@@ -1,4 +1,5 @@
-from datetime import timedelta, datetime, date
+from datetime import timedelta
+from functools import lru_cache
 import math
 
 DISTANCES = {
@@ -10,6 +11,15 @@ DISTANCES = {
     'Marathon': 42195
 }
 
+TRAINING_PACE_PCTS = {
+    "Easy (lower)": 0.6304,
+    "Easy (upper)": 0.7346,
+    "Marathon": 0.8251,
+    "Threshold": 0.8799,
+    "Interval": 0.9743,
+    "Repetitions": 1.089
+}
+
 def format_time_delta(td: timedelta) -> str:
     seconds = int(td.total_seconds())
     hours = seconds // 3600
@@ -19,15 +29,42 @@ def format_time_delta(td: timedelta) -> str:
         return f"{hours}:{minutes:02}:{seconds:02}"
     return f"{minutes}:{seconds:02}"
 
+def _parse_time_field(field: str, maximum: int | None) -> int:
+    # one or two ascii digits, like strptime's %H/%M/%S; any number without a maximum
+    if not (field and (maximum is None or len(field) <= 2) and field.isascii() and field.isdigit()):
+        raise ValueError(f"invalid time field {field!r}")
+    value = int(field)
+    if maximum is not None and value > maximum:
+        raise ValueError(f"time field {field!r} out of range")
+    return value
+
+@lru_cache(maxsize=4096)
 def parse_str_time(str_time: str) -> timedelta:
-    for f in ["%H:%M:%S", "%M:%S"]:
-        try:
-            dt = datetime.strptime(str_time, f)
-            td = datetime.combine(date.min, dt.time()) - datetime.min
-            return td
-        except ValueError:
-            continue
-    raise ValueError
+    # accepts H:MM:SS or MM:SS, with optional fractional seconds (e.g. 5:30.5)
+    return _parse_time(str_time, 23)
+
+@lru_cache(maxsize=4096)
+def parse_duration(str_time: str) -> timedelta:
+    # parse_str_time without the 23 hour cap, for multi-day efforts (e.g. 30:15:00)
+    return _parse_time(str_time, None)
+
+def _parse_time(str_time: str, max_hours: int | None) -> timedelta:
+    parts = str_time.split(":")
+    if len(parts) == 3:
+        hours = _parse_time_field(parts[0], max_hours)
+    elif len(parts) == 2:
+        hours = 0
+    else:
+        raise ValueError(f"invalid time {str_time!r}")
+    minutes = _parse_time_field(parts[-2], 59)
+    seconds, dot, fraction = parts[-1].partition(".")
+    seconds = _parse_time_field(seconds, 59)
+    microseconds = 0
+    if dot:
+        if not (fraction and fraction.isascii() and fraction.isdigit()):
+            raise ValueError(f"invalid time {str_time!r}")
+        microseconds = int(fraction[:6].ljust(6, "0"))
+    return timedelta(0, hours * 3600 + minutes * 60 + seconds, microseconds)
 
 def convert_to_mi_pace(pace: timedelta) -> timedelta:
     return pace / 0.621
@@ -120,16 +157,8 @@ def get_training_paces(vdot: float) -> dict:
 # credit here for doing the legwork of researching how different sources derive the
 # training paces as % of vdot 
 # https://github.com/tlgs/vdot/blob/master/notebooks/2-analysis.ipynb
-    training_pace_pcts = {
-        "Easy (lower)": 0.6304,
-        "Easy (upper)": 0.7346,
-        "Marathon": 0.8251,
-        "Threshold": 0.8799,
-        "Interval": 0.9743,
-        "Repetitions": 1.089
-    }
     training_paces = {}
-    for name, pct in training_pace_pcts.items():
+    for name, pct in TRAINING_PACE_PCTS.items():
         v = get_vdot_pace(vdot, pct)  # meters/min
         pace = 1000 / v # min/km
         formatted_pace = format_time_delta(timedelta(minutes=pace))
@@ -139,4 +168,26 @@ def get_training_paces(vdot: float) -> dict:
 def get_vdot_pace(vdot: float, percentage:float) -> float:
     return (
             -0.182258 + math.sqrt(0.033218 - 0.000416 * (-4.6 - (vdot * percentage)))
-        ) / 0.000208
\ No newline at end of file
+        ) / 0.000208
+
+def get_race_time(vdot: float, distance_in_meters: float) -> timedelta:
+    # inverse of get_vdot (before rounding): bisect on the race time in minutes,
+    # the VDOT of a fixed distance only goes down as the time goes up
+    d = distance_in_meters
+    if d <= 0:
+        raise ValueError(f"race distance must be positive, got {d}")
+    fastest, slowest = d / 2000, d / 20  # 2000 m/min is faster than any human, 20 m/min a stroll
+    lower, upper = fastest, slowest
+    for _ in range(60):
+        t = (lower + upper) / 2
+        v = d / t
+        vo2 = -4.6 + 0.182258 * v + 0.000104 * v**2
+        pct = 0.8 + 0.1894393 * math.exp(-0.012778 * t) + 0.2989558 * math.exp(-0.1932605 * t)
+        if vo2 / pct > vdot:
+            lower = t
+        else:
+            upper = t
+    # a bound that never moved means the time lies beyond it, not at it
+    if lower == fastest or upper == slowest:
+        raise ValueError(f"no race time over {d} m at VDOT {vdot}")
+    return timedelta(minutes=(lower + upper) / 2)
@@ -0,0 +1,261 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Coroutine
+from hashlib import blake2b
+from typing import Any, Protocol
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+
+from api.core import metrics
+from api.core.config import settings
+from api.core.profiling import ProfiledRoute
+
+
+class LRUCache:
+    """Size-bounded least recently used cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Any, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+class CacheBackend(Protocol):
+    """The Redis commands `ReadThroughCache` needs.
+
+    `redis.asyncio.Redis` implements it as is; `MemoryBackend` is the
+    in-process default.
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> Any: ...
+
+    async def delete(self, *keys: str) -> int: ...
+
+
+class MemoryBackend:
+    """`CacheBackend` on an `LRUCache` in this process, with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self._cache = LRUCache(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            self._cache.delete(key)
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        self._cache.set(key, (value, None if ex is None else time.monotonic() + ex))
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        size = len(self._cache)
+        for key in keys:
+            self._cache.delete(key)
+        return size - len(self._cache)
+
+
+class NullBackend:
+    """`CacheBackend` that stores nothing, so every read is a load."""
+
+    async def get(self, key: str) -> None:
+        return None
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        return False
+
+    async def delete(self, *keys: str) -> int:
+        return 0
+
+
+def cache_backend(url: str | None, maxsize: int) -> CacheBackend:
+    """A Redis client for `url`, or a `MemoryBackend` without one."""
+    if url is None:
+        return MemoryBackend(maxsize)
+    import redis.asyncio  # the `cache` extra, only needed when a cache server is configured
+
+    return redis.asyncio.from_url(url)
+
+
+class ReadThroughCache:
+    """Values loaded on a miss and kept in a `CacheBackend` for `ttl` seconds.
+
+    Concurrent misses for the same key share one load (single-flight): the
+    first caller starts it and everyone else awaits the same task, which
+    keeps running if the caller that started it goes away. Loads that
+    return None are not cached. Writers call `invalidate` after they
+    commit; a load that was running across an invalidation returns its
+    value to its callers but leaves it out of the cache, since it may have
+    read the row before the write.
+    """
+
+    def __init__(self, backend: CacheBackend, prefix: str, ttl: int | None = None):
+        self.backend = backend
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self._loading: dict[str, asyncio.Task] = {}
+        self._generation = 0
+
+    def _key(self, key: Any) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: Any, load: Callable[[], Awaitable[bytes | None]]) -> bytes | None:
+        name = self._key(key)
+        value = await self.backend.get(name)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        task = self._loading.get(name)
+        if task is None:
+            task = self._loading[name] = asyncio.ensure_future(self._load(name, load))
+            task.add_done_callback(lambda done: self._loaded(name, done))
+        return await asyncio.shield(task)
+
+    async def _load(self, name: str, load: Callable[[], Awaitable[bytes | None]]) -> bytes | None:
+        generation = self._generation
+        value = await load()
+        self.loads += 1
+        if value is not None and generation == self._generation:
+            await self.backend.set(name, value, ex=self.ttl)
+        return value
+
+    def _loaded(self, name: str, task: asyncio.Task) -> None:
+        if self._loading.get(name) is task:
+            del self._loading[name]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller went away
+
+    async def invalidate(self, *keys: Any) -> None:
+        """Drop the keys' entries; later reads load them again."""
+        self._generation += 1
+        names = [self._key(key) for key in keys]
+        for name in names:
+            self._loading.pop(name, None)
+        if names:
+            await self.backend.delete(*names)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "loads": self.loads}
+
+
+response_cache = LRUCache(settings.RESPONSE_CACHE_SIZE)
+
+workout_cache = ReadThroughCache(
+    cache_backend(settings.WORKOUT_CACHE_URL, settings.WORKOUT_CACHE_SIZE),
+    prefix="workout", ttl=settings.WORKOUT_CACHE_TTL,
+)
+
+
+def _cache_stats():
+    stats = response_cache.stats()
+    yield "response_cache_hits_total", (), stats["hits"]
+    yield "response_cache_misses_total", (), stats["misses"]
+    yield "response_cache_entries", (), stats["size"]
+    stats = workout_cache.stats()
+    yield "workout_cache_hits_total", (), stats["hits"]
+    yield "workout_cache_misses_total", (), stats["misses"]
+    yield "workout_cache_loads_total", (), stats["loads"]
+
+metrics.registry.describe("response_cache_hits_total", "counter", "Calculator responses served from cache")
+metrics.registry.describe("response_cache_misses_total", "counter", "Calculator responses computed")
+metrics.registry.describe("response_cache_entries", "gauge", "Calculator responses cached")
+metrics.registry.describe("workout_cache_hits_total", "counter", "Workout reads served from cache")
+metrics.registry.describe("workout_cache_misses_total", "counter", "Workout reads not in cache")
+metrics.registry.describe("workout_cache_loads_total", "counter", "Workout queries run on cache misses")
+metrics.register_collector(_cache_stats)
+
+
+def cache_response(max_age: int = settings.RESPONSE_CACHE_MAX_AGE) -> Callable:
+    """Mark a pure route's responses as cacheable for `max_age` seconds.
+
+    Only takes effect on routers created with `route_class=CachedRoute`.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.cache_max_age = max_age
+        return endpoint
+    return decorator
+
+
+class CachedRoute(ProfiledRoute):
+    """Route that serves `cache_response` endpoints from `response_cache`.
+
+    The cache key is the path plus every declared query parameter, with
+    defaults filled in, so `/vdot` and `/vdot?distance=5000` share an entry.
+    The ETag is derived from the key alone, which means a matching
+    If-None-Match is answered with a 304 before the endpoint runs.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+        max_age = getattr(self.endpoint, "cache_max_age", None)
+        if max_age is None:
+            return route_handler
+
+        query_defaults = [(param.alias, param.default) for param in self.dependant.query_params]
+        cache_control = f"public, max-age={max_age}"
+
+        async def cached_route_handler(request: Request) -> Response:
+            query = urlencode([
+                (name, request.query_params.get(name, default)) for name, default in query_defaults
+            ])
+            key = f"{request.url.path}?{query}"
+            etag = '"' + blake2b(f"{settings.APP_VERSION}:{key}".encode(), digest_size=16).hexdigest() + '"'
+            headers = {"ETag": etag, "Cache-Control": cache_control}
+            if etag in request.headers.get("if-none-match", ""):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            cached = response_cache.get(key)
+            if cached is None:
+                response = await route_handler(request)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cached = (response.body, response.media_type)
+                response_cache.set(key, cached)
+            body, media_type = cached
+            return Response(content=body, media_type=media_type, headers=headers)
+
+        return cached_route_handler
@@ -16,10 +16,52 @@ class Config(CustomBaseSettings):
     DATABASE_POOL_TTL: int = 60 * 20  # 20 minutes
     DATABASE_POOL_PRE_PING: bool = True
 
+    WORKOUT_BULK_BATCH_SIZE: int = 1000
+
+    # queue single creates and write them in batches (see api.write_buffer)
+    WORKOUT_WRITE_BUFFER: bool = False
+    WORKOUT_WRITE_BATCH_SIZE: int = 100
+    WORKOUT_WRITE_MAX_DELAY: float = 0.05  # seconds
+    WORKOUT_WRITE_MAX_QUEUED: int = 10000
+
+    RESPONSE_CACHE_SIZE: int = 4096
+    RESPONSE_CACHE_MAX_AGE: int = 60 * 60 * 24  # 1 day
+
+    # e.g. redis://localhost:6379/0, with the cache extra installed; in-process
+    # without, which server.py turns off when running more than one worker
+    WORKOUT_CACHE_URL: str | None = None
+    WORKOUT_CACHE_SIZE: int = 4096
+    WORKOUT_CACHE_TTL: int = 60 * 5  # 5 minutes
+
+    # live race pacing connections accepted per process (see api.pacing)
+    RACE_PACING_MAX_CONNECTIONS: int = 50000
+
+    # server.py: worker processes (CPUs available by default) and seconds they get to drain
+    SERVER_WORKERS: int | None = None
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+
+    # cold-start mode for serverless hosts: migrations are a deploy step
+    # (python -m api.core.migrations), the VDOT table is built on first use
+    # and /openapi.json is served from the file python -m api.core.openapi writes
+    SERVERLESS: bool = False
+    # where python -m api.core.openapi writes the schema; backend/openapi.json without
+    OPENAPI_SCHEMA_PATH: str | None = None
+
     ENVIRONMENT: Environment = Environment.PRODUCTION
 
     DEBUG: bool = False
 
+    LOG_JSON: bool = True  # JSON lines; plain text without
+    # fraction of records below WARNING kept per logger (and its children), e.g. {"api.access": 0.1}
+    LOG_SAMPLING: dict[str, float] = {}
+
+    # sampling profiler (see api.core.profiling): requests sent with X-Profile: <token>
+    # and this fraction of all requests are profiled; /admin/profile is only served with a token
+    PROFILE_TOKEN: str | None = None
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL: float = 0.005  # seconds between samples
+    PROFILE_MAX_STACKS: int = 10000
+
     SENTRY_DSN: str | None = None
 
     CORS_ORIGINS: list[str] = ["*"]
@@ -1,3 +1,6 @@
+import os
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 from sqlalchemy import (
     CursorResult,
@@ -7,36 +10,126 @@ from sqlalchemy import (
     Update,
     Delete
 )
-from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection, create_async_engine
+from fastapi import Depends
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, AsyncConnection, create_async_engine
+from api.core import metrics
 from api.core.config import settings
 
 
 DATABASE_URL = str(settings.DATABASE_URL)
 
-engine = create_async_engine(
-    DATABASE_URL,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    pool_recycle=settings.DATABASE_POOL_TTL,
-    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
-    future=True
-)
+_engine: AsyncEngine | None = None
+
+
+def get_engine() -> AsyncEngine:
+    """The app's engine, created on first use.
+
+    Creating it imports the database driver and sets up the pool, so
+    processes that only ever serve the calculators never pay for either.
+    Also available as `database.engine`.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            DATABASE_URL,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            pool_recycle=settings.DATABASE_POOL_TTL,
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            future=True
+        )
+        metrics.instrument_engine(_engine.sync_engine)
+    return _engine
+
+
+def __getattr__(name: str) -> Any:
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+def _reset_pool_after_fork() -> None:
+    # a forked worker starts its own pool; connections the parent opened stay the parent's
+    if _engine is not None:
+        _engine.sync_engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
 
 Base = declarative_base()
 
-async def get_session() -> AsyncSession:
+
+class UnitOfWork:
+    """Database work for one request on at most one pooled connection.
+
+    The connection is checked out the first time it is needed and is shared
+    by the `fetch_one`/`fetch_all`/`execute` helpers and the ORM session, so
+    a request never holds two connections. Anything not committed by the
+    time the request ends is rolled back when the connection is returned.
+    """
+
+    def __init__(self) -> None:
+        self._connection: AsyncConnection | None = None
+        self._session: AsyncSession | None = None
+
+    async def connection(self) -> AsyncConnection:
+        if self._connection is None:
+            start = time.perf_counter()
+            self._connection = await get_engine().connect()
+            metrics.observe_checkout_wait(time.perf_counter() - start)
+        return self._connection
+
+    async def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = AsyncSession(bind=await self.connection(), expire_on_commit=False)
+        return self._session
+
+    async def fetch_one(self, select_query: Select | Insert | Update,
+                        commit_after: bool = False) -> dict[str, Any] | None:
+        return await fetch_one(select_query, await self.connection(), commit_after)
+
+    async def fetch_all(self, select_query: Select | Insert | Update,
+                        commit_after: bool = False) -> list[dict[str, Any]]:
+        return await fetch_all(select_query, await self.connection(), commit_after)
+
+    async def execute(self, query: Insert | Update | Delete,
+                      commit_after: bool = False) -> CursorResult:
+        return await execute(query, await self.connection(), commit_after)
+
+    async def commit(self) -> None:
+        if self._session is not None:
+            await self._session.commit()
+        # a session joins a transaction the helpers already began and leaves it open
+        if self._connection is not None and self._connection.in_transaction():
+            await self._connection.commit()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+async def get_unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """Dependency for the request's unit of work.
+
+    Yields:
+        UnitOfWork: shared by every dependency of the same request
+    """
+    unit_of_work = UnitOfWork()
+    try:
+        yield unit_of_work
+    finally:
+        await unit_of_work.close()
+
+async def get_session(unit_of_work: UnitOfWork = Depends(get_unit_of_work)) -> AsyncSession:
     """Dependency for getting async database session.
 
     Yields:
-        AsyncSession: Async database session
+        AsyncSession: Async database session on the request's connection
     """
-    async with async_session() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+    yield await unit_of_work.session()
 
 async def fetch_one(
     select_query: Select | Insert | Update,
@@ -44,12 +137,14 @@ async def fetch_one(
     commit_after: bool = False,
 ) -> dict[str, Any] | None:
     if not connection:
-        async with engine.connect() as connection:
+        async with get_engine().connect() as connection:
             cursor = await _execute_query(select_query, connection, commit_after)
-            return cursor.first()._asdict() if cursor.rowcount > 0 else None
+            row = cursor.first()
+            return row._asdict() if row is not None else None
 
     cursor = await _execute_query(select_query, connection, commit_after)
-    return cursor.first()._asdict() if cursor.rowcount > 0 else None
+    row = cursor.first()
+    return row._asdict() if row is not None else None
 
 
 async def fetch_all(
@@ -58,7 +153,7 @@ async def fetch_all(
     commit_after: bool = False,
 ) -> list[dict[str, Any]]:
     if not connection:
-        async with engine.connect() as connection:
+        async with get_engine().connect() as connection:
             cursor = await _execute_query(select_query, connection, commit_after)
             return [r._asdict() for r in cursor.all()]
 
@@ -66,21 +161,37 @@ async def fetch_all(
     return [r._asdict() for r in cursor.all()]
 
 
+async def stream_all(
+    select_query: Select,
+    yield_per: int = 1000,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield rows one at a time from a server-side cursor.
+
+    Rows are fetched from the database `yield_per` at a time, so memory use
+    stays flat however many rows the query returns.
+    """
+    async with get_engine().connect() as connection:
+        result = await connection.stream(
+            select_query.execution_options(yield_per=yield_per)
+        )
+        async for row in result:
+            yield row._asdict()
+
+
 async def execute(
-    query: Insert | Update,
+    query: Insert | Update | Delete,
     connection: AsyncConnection = None,
     commit_after: bool = False,
-) -> None:
+) -> CursorResult:
     if not connection:
-        async with engine.connect() as connection:
-            await _execute_query(query, connection, commit_after)
-            return
+        async with get_engine().connect() as connection:
+            return await _execute_query(query, connection, commit_after)
 
-    await _execute_query(query, connection, commit_after)
+    return await _execute_query(query, connection, commit_after)
 
 
 async def _execute_query(
-    query: Select | Insert | Update,
+    query: Select | Insert | Update | Delete,
     connection: AsyncConnection,
     commit_after: bool = False,
 ) -> CursorResult:
@@ -91,9 +202,12 @@ async def _execute_query(
     return result
 
 
-async def get_db_connection() -> AsyncConnection:
-    connection = await engine.connect()
-    try:
-        yield connection
-    finally:
-        await connection.close()
\ No newline at end of file
+async def get_db_connection(
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work)
+) -> AsyncConnection:
+    """Dependency for the request's connection.
+
+    Yields:
+        AsyncConnection: the same connection the request's session uses
+    """
+    yield await unit_of_work.connection()
@@ -26,4 +26,17 @@ class ForbiddenException(HTTPException):
     """Base exception for forbidden access errors."""
 
     def __init__(self, detail: str = "Access forbidden"):
-        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
\ No newline at end of file
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+class UnsupportedMediaTypeException(HTTPException):
+    """Base exception for request bodies in an unsupported format."""
+
+    def __init__(self, detail: str = "Unsupported media type"):
+        super().__init__(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=detail)
+
+class UnprocessableEntityException(HTTPException):
+    """Base exception for request bodies that cannot be processed."""
+
+    def __init__(self, detail: str = "Unprocessable entity"):
+        super().__init__(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
@@ -0,0 +1,25 @@
+"""Modules imported on first use rather than with their importer.
+
+numpy takes tens of milliseconds to import and only the batch, track and
+table code needs it, so those modules bind `np = lazy_import("numpy")` and
+annotate with `from __future__ import annotations`: importing `main`, and
+a serverless cold start that only serves the calculators, never loads it.
+"""
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Module `name`, executed when one of its attributes is first read."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -1,20 +1,227 @@
+"""Logging that never blocks the event loop on stdout.
+
+Loggers hand records to a `QueueHandler`; a `QueueListener` thread formats
+them and does the writing, so a slow or blocked stdout holds up that
+thread instead of a request. On the calling side a record costs its
+%-style message rendering and a queue put; messages are passed as format
+arguments (`logger.debug("Fetching workout %s", workout_id)`), so nothing
+is rendered for disabled levels.
+
+Records are written as JSON lines (`LOG_JSON`) carrying the id of the
+request they were logged in, and any `extra` fields such as the access
+log's duration. Loggers named in `LOG_SAMPLING` keep only that fraction of
+their records below WARNING, for hot paths such as `api.access`.
+"""
+import atexit
+import json
 import logging
+import os
+import random
 import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from api.core.config import settings
 
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s"
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# id of the request being handled, stamped on every record logged for it
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# LogRecord attributes that are not `extra` fields (uvicorn adds color_message)
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "color_message"}
+
+# loggers uvicorn gives synchronous stdout handlers of their own
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, request id and extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None) is not None:
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records below WARNING of the configured loggers.
+
+    A logger's rate applies to its children too, unless they have their own.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: dict[str, float] = {}
+
+    def rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            for prefix in _prefixes(name):
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+def _prefixes(name: str):
+    while name:
+        yield name
+        name = name.rpartition(".")[0]
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the current request's id, in the thread that logged them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class BackgroundHandler(QueueHandler):
+    """`QueueHandler` that leaves formatting to the listener thread.
+
+    Only the message is rendered here, while its arguments still hold the
+    values they were logged with.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+
+def _route_uvicorn_loggers() -> None:
+    # `uvicorn main:app` configures its loggers before importing the app; its
+    # messages go through the queue instead, and its access log, which
+    # RequestLogMiddleware replaces, is left without handlers so uvicorn skips it
+    for name in UVICORN_LOGGERS:
+        logger = logging.getLogger(name)
+        for existing in logger.handlers[:]:
+            logger.removeHandler(existing)
+        logger.propagate = name != "uvicorn.access"
+
 
 def setup_logging() -> None:
-    """Set up logging configuration."""
-    format_string = "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s"
-    logging.basicConfig(
-        level=logging.DEBUG if settings.DEBUG else logging.INFO,
-        format=format_string,
-        datefmt="%H:%M:%S",
-        stream=sys.stdout,
-    )
+    """Route every logger through a queue to a background writer thread."""
+    global _listener
+    _route_uvicorn_loggers()
+    if _listener is not None:
+        return
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if settings.LOG_JSON else logging.Formatter(TEXT_FORMAT, "%H:%M:%S"))
+    handler = BackgroundHandler(SimpleQueue())
+    handler.addFilter(RequestIdFilter())
+    if settings.LOG_SAMPLING:
+        handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+
+    _listener = QueueListener(handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Write out everything queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    # the writer thread does not survive a fork; the child gets its own queue and thread
+    global _listener
+    if _listener is None:
+        return
+    handler = next(h for h in logging.getLogger().handlers if isinstance(h, BackgroundHandler))
+    handler.queue = SimpleQueue()
+    _listener = QueueListener(handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+os.register_at_fork(after_in_child=_restart_after_fork)
 
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance."""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
+
+
+access_logger = get_logger("api.access")
+
+
+class RequestLogMiddleware:
+    """ASGI middleware giving every request an id and logging one access line for it.
+
+    The id comes from the X-Request-ID header when the client or proxy sent
+    one, is set as `request_id` for everything logged while handling the
+    request, and is returned in the response's X-Request-ID header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER.encode())
+        current = incoming.decode("latin-1")[:128] if incoming else uuid.uuid4().hex
+        token = request_id.set(current)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", ()),
+                                      (REQUEST_ID_HEADER.encode(), current.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1e3, 2)
+            access_logger.info("%s %s %s %.2fms", scope["method"], scope["path"], status_code, duration_ms,
+                               extra={"method": scope["method"], "path": scope["path"],
+                                      "status": status_code, "duration_ms": duration_ms})
+            request_id.reset(token)
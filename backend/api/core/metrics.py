@@ -0,0 +1,203 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Request latency comes from `MetricsMiddleware`, query timings and pool
+checkouts from SQLAlchemy engine events (`instrument_engine`), and anything
+that is cheaper to read on demand, such as pool size or cache counters, from
+collectors registered with `register_collector` and run at scrape time.
+Recording is a dict lookup, a bisect and two additions, cheap enough to
+leave on in production.
+"""
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+Sample = tuple[str, Labels, float]
+
+
+class Histogram:
+    """Cumulative histogram of observed values."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by metric name and label values."""
+
+    def __init__(self) -> None:
+        self.help: dict[str, tuple[str, str]] = {}
+        self.counters: dict[tuple[str, Labels], float] = {}
+        self.histograms: dict[tuple[str, Labels], Histogram] = {}
+        self.collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, kind: str, description: str) -> None:
+        self.help[name] = (kind, description)
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1) -> None:
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        described: set[str] = set()
+
+        def header(name: str) -> None:
+            if name in described or name not in self.help:
+                return
+            described.add(name)
+            kind, description = self.help[name]
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name)
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            header(name)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        for collector in self.collectors:
+            for name, labels, value in collector():
+                header(name)
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry()
+registry.describe("http_requests_total", "counter", "HTTP requests by route and status code")
+registry.describe("http_request_duration_seconds", "histogram", "HTTP request latency by route")
+registry.describe("db_query_duration_seconds", "histogram", "Database query latency by statement type")
+registry.describe("db_pool_checkouts_total", "counter", "Connections checked out of the pool")
+registry.describe("db_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a pooled connection")
+
+register_collector = registry.register_collector
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency per route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            # unmatched paths share one label so scanners cannot grow the registry
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            registry.inc("http_requests_total",
+                         (("method", method), ("route", path), ("status", str(status_code))))
+            registry.observe("http_request_duration_seconds",
+                             (("method", method), ("route", path)), elapsed)
+
+
+def observe_checkout_wait(seconds: float) -> None:
+    registry.observe("db_pool_checkout_wait_seconds", (), seconds)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every query and count pool checkouts on a (sync) engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        statement_type = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        registry.observe("db_query_duration_seconds", (("statement", statement_type),), elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    @event.listens_for(engine.pool, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        registry.inc("db_pool_checkouts_total")
+
+    def pool_status():
+        pool = engine.pool
+        if hasattr(pool, "overflow"):
+            yield "db_pool_size", (), pool.size()
+            yield "db_pool_checked_out", (), pool.checkedout()
+            # QueuePool reports unused capacity as negative overflow
+            yield "db_pool_overflow", (), max(pool.overflow(), 0)
+
+    registry.describe("db_pool_size", "gauge", "Configured pool size")
+    registry.describe("db_pool_checked_out", "gauge", "Connections currently checked out")
+    registry.describe("db_pool_overflow", "gauge", "Connections open beyond the pool size")
+    register_collector(pool_status)
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+def metrics() -> str:
+    return registry.render()
@@ -1,39 +1,93 @@
-import os
-import subprocess
-import sys
+import asyncio
+from pathlib import Path
 
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection, pool, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from api.core.config import settings
+from api.core.logging import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# arbitrary key shared by every replica for pg_advisory_lock
+MIGRATION_LOCK_KEY = 7_265_411_002
+
+
+def get_alembic_config() -> AlembicConfig:
+    """Alembic config resolved relative to the backend, not the working directory."""
+    config = AlembicConfig(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+async def get_current_revisions(connection: AsyncConnection) -> set[str]:
+    """Revisions the database is at, in a single query."""
+    try:
+        result = await connection.execute(text("SELECT version_num FROM alembic_version"))
+        return set(result.scalars())
+    except DBAPIError:
+        # fresh database without an alembic_version table
+        await connection.rollback()
+        return set()
 
-def run_migrations():
-    """
-    Runs Alembic database migrations using sys.executable and module execution.
 
-    This method is more compatible with environments like Vercel where direct
-    command execution might be restricted.
+def _upgrade(connection: Connection, config: AlembicConfig) -> None:
+    # alembic/env.py runs on this connection instead of opening its own
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+
+
+async def run_async_migrations() -> None:
+    """Upgrade the database to head in-process.
+
+    Compares the current revision with head first, so an up to date
+    database costs one query. Otherwise the upgrade runs under a Postgres
+    advisory lock, so when several replicas start together only one of
+    them migrates and the others find the work done once they get the lock.
     """
+    config = get_alembic_config()
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
     try:
-        # Ensure the current directory is in the Python path
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        sys.path.insert(0, current_dir)
-
-        # Use sys.executable to run the Alembic module
-        result = subprocess.run(
-            [sys.executable, "-m", "alembic", "upgrade", "head"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-
-        # Print the output if there's any
-        if result.stdout:
-            print("Migration output:", result.stdout)
-
-        print("Migrations completed successfully!")
-
-    except subprocess.CalledProcessError as e:
-        print(f"Migration failed. Error: {e}")
-        print("Standard output:", e.stdout)
-        print("Standard error:", e.stderr)
-        raise
+        async with engine.connect() as connection:
+            if await get_current_revisions(connection) == heads:
+                logger.info("Database is up to date, skipping migrations")
+                return
+            await connection.rollback()
+            use_lock = connection.dialect.name == "postgresql"
+            if use_lock:
+                await connection.execute(
+                    text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+                )
+            try:
+                await connection.run_sync(_upgrade, config)
+                await connection.commit()
+            finally:
+                if use_lock:
+                    await connection.rollback()
+                    await connection.execute(
+                        text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
+                    )
+                    await connection.commit()
+        logger.info("Migrations completed successfully")
     except Exception as e:
-        print(f"An error occurred while running migrations: {e}")
-        raise
\ No newline at end of file
+        logger.error("Migration failed: %s", e)
+        raise
+    finally:
+        await engine.dispose()
+
+
+def run_migrations():
+    """Runs Alembic database migrations in-process."""
+    asyncio.run(run_async_migrations())
+
+
+if __name__ == "__main__":
+    setup_logging()
+    run_migrations()
@@ -0,0 +1,50 @@
+"""OpenAPI schema built ahead of time.
+
+FastAPI generates the schema from every route's models the first time
+/openapi.json or the docs are requested, which a cold serverless instance
+pays for on that request. The deploy build writes it to `SCHEMA_PATH`
+(`OPENAPI_SCHEMA_PATH`, backend/openapi.json by default) instead, and
+`use_prebuilt_schema` serves that file:
+
+    SERVERLESS=true python -m api.core.openapi
+
+The file has to be rebuilt with every deploy of changed routes.
+"""
+import json
+from pathlib import Path
+
+from fastapi import FastAPI
+
+from api.core.config import settings
+from api.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA_PATH = Path(settings.OPENAPI_SCHEMA_PATH or Path(__file__).resolve().parents[2] / "openapi.json")
+
+
+def build_schema(app: FastAPI, path: Path = SCHEMA_PATH) -> None:
+    """Write the app's OpenAPI schema to `path`."""
+    path.write_text(json.dumps(app.openapi(), separators=(",", ":")))
+
+
+def use_prebuilt_schema(app: FastAPI, path: Path = SCHEMA_PATH) -> None:
+    """Serve the schema from `path`, read on first request, generating it if the file is missing."""
+    generate = app.openapi
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            try:
+                app.openapi_schema = json.loads(path.read_text())
+            except FileNotFoundError:
+                logger.warning("No prebuilt OpenAPI schema at %s, generating it", path)
+                return generate()
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+if __name__ == "__main__":
+    from main import app
+
+    build_schema(app)
@@ -0,0 +1,306 @@
+"""On-demand sampling profiler for individual requests.
+
+`ProfilerMiddleware` profiles requests sent with `X-Profile: <PROFILE_TOKEN>`
+and a random `PROFILE_SAMPLE_RATE` fraction of all the others. While any
+profiled request is in flight, a sampler thread wakes every
+`PROFILE_INTERVAL` seconds and records where each one is:
+
+    async routes: the request's coroutine chain while it is suspended
+        (a query, a pool checkout), ending in `[awaiting]`, or the event
+        loop thread's stack while it runs
+    sync routes: the stack of the threadpool thread running the endpoint,
+        which `ProfiledRoute` registers for the duration of the call
+
+so the samples add up to wall-clock time, waiting included. Samples are
+folded into collapsed stacks (`GET /vdot_paces;module:function;... count`),
+the input of flamegraph.pl and speedscope, rooted at the route template.
+At most `PROFILE_MAX_STACKS` distinct stacks are kept, later new ones are
+only counted under `[truncated]`, so memory stays bounded when profiling
+is left on. A request that is not profiled costs a random draw and, with
+a token set, a header lookup.
+
+    GET /admin/profile      collapsed stacks, most sampled first
+    DELETE /admin/profile   clear them
+
+Both need the `X-Profile` token and are not served (404) unless
+`PROFILE_TOKEN` is set, so turning on a sample rate alone publishes
+nothing. The stacks are per process: under `server.py` every worker keeps
+and serves only its own samples, and a request reaches whichever worker
+accepts its connection.
+"""
+import functools
+import hmac
+import inspect
+import os
+import random
+import sys
+import threading
+import time
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from types import FrameType
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.core import metrics
+from api.core.config import settings
+from api.core.exceptions import NotFoundException, UnauthorizedException
+
+PROFILE_HEADER = "x-profile"
+
+# frames kept per sample, innermost dropped beyond it
+MAX_DEPTH = 128
+
+AWAITING = "[awaiting]"
+TRUNCATED = "[truncated]"
+
+
+class Session:
+    """A profiled request: its coroutine and the threads running its sync code."""
+
+    __slots__ = ("scope", "coro", "thread_id", "threads")
+
+    def __init__(self, scope: Scope, coro: Coroutine):
+        self.scope = scope
+        self.coro = coro
+        self.thread_id = threading.get_ident()
+        self.threads: set[int] = set()
+
+    @property
+    def label(self) -> str:
+        # the route is only in the scope once the router has matched it
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', 'unmatched')}"
+
+
+# the profiled request being handled; copied into the threadpool with the rest of the context
+_session: ContextVar[Session | None] = ContextVar("profile_session", default=None)
+
+
+def _frame_name(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def _thread_stack(frame: FrameType | None, root: FrameType | None = None) -> list[FrameType] | None:
+    """Frames from `root` (or the thread's first) down to `frame`; None if `root` is not among them."""
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        if frame is root:
+            break
+        frame = frame.f_back
+    else:
+        if root is not None:
+            return None
+    stack.reverse()
+    return stack
+
+
+def _await_stack(awaitable: Any) -> list[FrameType]:
+    """Frames of a suspended coroutine and everything it is awaiting, outermost first."""
+    stack = []
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None) \
+            or getattr(awaitable, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None) \
+            or getattr(awaitable, "ag_await", None)
+    return stack
+
+
+class Profiler:
+    """Samples the stacks of the profiled requests into a bounded table of collapsed stacks.
+
+    The sampler thread starts with the first profiled request in a process
+    and sleeps while none is in flight.
+    """
+
+    def __init__(self, interval: float = 0.005, max_stacks: int = 10000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.stacks: dict[str, int] = {}
+        self.samples = 0
+        self.truncated = 0
+        self._sessions: set[Session] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    def start(self, session: Session) -> None:
+        with self._lock:
+            self._sessions.add(session)
+            # threads do not survive a fork, so every worker starts its own
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+            self._wake.set()
+
+    def stop(self, session: Session) -> None:
+        with self._lock:
+            self._sessions.discard(session)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._wake.clear()
+                    continue
+            self.sample(sessions)
+
+    def sample(self, sessions: list[Session]) -> None:
+        """Record one sample of each session."""
+        frames = sys._current_frames()
+        for session in sessions:
+            threads = list(session.threads)
+            if threads:
+                for ident in threads:
+                    stack = _thread_stack(frames.get(ident))
+                    if stack:
+                        self.record(session.label, stack)
+                continue
+            root = session.coro.cr_frame
+            if root is None:
+                continue
+            stack = _thread_stack(frames.get(session.thread_id), root)
+            if stack is not None:
+                self.record(session.label, stack)
+            else:
+                self.record(session.label, _await_stack(session.coro), AWAITING)
+
+    def record(self, label: str, stack: list[FrameType], leaf: str | None = None) -> None:
+        names = [label, *map(_frame_name, stack[:MAX_DEPTH])]
+        if leaf is not None:
+            names.append(leaf)
+        key = ";".join(names)
+        self.samples += 1
+        if key in self.stacks or len(self.stacks) < self.max_stacks:
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+        else:
+            self.truncated += 1
+
+    def render(self) -> str:
+        """Collapsed stacks, one `frame;frame;... count` line each, most sampled first."""
+        lines = [f"{key} {count}" for key, count in sorted(self.stacks.items(), key=lambda item: -item[1])]
+        if self.truncated:
+            lines.append(f"{TRUNCATED} {self.truncated}")
+        return "".join(line + "\n" for line in lines)
+
+    def reset(self) -> None:
+        self.stacks = {}
+        self.samples = 0
+        self.truncated = 0
+
+
+profiler = Profiler(interval=settings.PROFILE_INTERVAL, max_stacks=settings.PROFILE_MAX_STACKS)
+
+
+def _profile_stats():
+    yield "profile_samples_total", (), profiler.samples
+    yield "profile_stacks", (), len(profiler.stacks)
+
+metrics.registry.describe("profile_samples_total", "counter", "Stack samples taken of profiled requests")
+metrics.registry.describe("profile_stacks", "gauge", "Distinct collapsed stacks held by the profiler")
+metrics.register_collector(_profile_stats)
+
+
+def _token_matches(value: str | bytes | None, token: str) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        value = value.encode("latin-1")
+    return hmac.compare_digest(value, token.encode("latin-1"))
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling the requests that ask for it, and a random sample of the rest."""
+
+    def __init__(self, app: ASGIApp, profiler: Profiler = profiler,
+                 sample_rate: float = settings.PROFILE_SAMPLE_RATE,
+                 token: str | None = settings.PROFILE_TOKEN) -> None:
+        self.app = app
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+        self.token = token
+
+    def wanted(self, scope: Scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if self.token:
+            return _token_matches(dict(scope["headers"]).get(PROFILE_HEADER.encode()), self.token)
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        coro = self.app(scope, receive, send)
+        session = Session(scope, coro)
+        token = _session.set(session)
+        self.profiler.start(session)
+        try:
+            await coro
+        finally:
+            self.profiler.stop(session)
+            _session.reset(token)
+
+
+def _track_thread(endpoint: Callable) -> Callable:
+    @functools.wraps(endpoint)
+    def tracked(*args, **kwargs):
+        session = _session.get()
+        if session is None:
+            return endpoint(*args, **kwargs)
+        ident = threading.get_ident()
+        session.threads.add(ident)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            session.threads.discard(ident)
+    return tracked
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose sync endpoint tells a profiled request which threadpool thread runs it.
+
+    Without it the profiler sees a sync route only as its request awaiting
+    the threadpool.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        if not (inspect.iscoroutinefunction(endpoint) or inspect.isasyncgenfunction(endpoint)
+                or inspect.isgeneratorfunction(endpoint)):
+            endpoint = _track_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _authorize(x_profile: Annotated[str | None, Header()] = None) -> None:
+    if not settings.PROFILE_TOKEN:
+        raise NotFoundException()
+    if not _token_matches(x_profile, settings.PROFILE_TOKEN):
+        raise UnauthorizedException("Profile token required")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(_authorize)])
+
+
+@router.get("/profile", include_in_schema=False, response_class=PlainTextResponse)
+def profile() -> str:
+    return profiler.render()
+
+
+@router.delete("/profile", include_in_schema=False, status_code=status.HTTP_204_NO_CONTENT)
+def reset_profile() -> Response:
+    profiler.reset()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
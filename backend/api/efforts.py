@@ -0,0 +1,72 @@
+"""Best efforts over activity streams.
+
+The best effort for a distance is the shortest time in which any stretch of
+the activity covered it. For every point taken as the end of a stretch, the
+latest point at least the target distance behind it is found with one
+`np.searchsorted` over the cumulative distance, which is the two-pointer
+walk done as a single array pass: the ends are sorted, so the search for
+each starts where the previous one stopped. The start time is interpolated
+between that point and the next, so efforts are timed over exactly the
+target distance rather than over whole GPS samples.
+"""
+from __future__ import annotations
+from api import calcs, batch
+from api.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def best_effort(distance: np.ndarray, time: np.ndarray, target: float) -> dict | None:
+    """Fastest stretch covering `target` meters, None if the activity is shorter.
+
+    Args:
+        distance: cumulative meters per point
+        time: seconds per point
+        target: meters
+
+    Returns:
+        dict: `time` taken in seconds and the `start`/`end` of the stretch
+            in seconds since the first point
+    """
+    distance = np.maximum.accumulate(np.asarray(distance, dtype=np.float64))
+    time = np.asarray(time, dtype=np.float64)
+    if len(distance) < 2 or distance[-1] - distance[0] < target:
+        return None
+
+    start_distance = distance - target
+    ends = np.flatnonzero(start_distance >= distance[0])
+    start_distance = start_distance[ends]
+    # last point at or before the start of the stretch ending at each point
+    starts = np.searchsorted(distance, start_distance, side="right") - 1
+    after = starts + 1
+    span = distance[after] - distance[starts]
+    fraction = np.divide(start_distance - distance[starts], span,
+                         out=np.zeros_like(span), where=span > 0)
+    start_time = time[starts] + fraction * (time[after] - time[starts])
+    elapsed = time[ends] - start_time
+
+    best = int(np.argmin(elapsed))
+    return {
+        "time": float(elapsed[best]),
+        "start": float(start_time[best]),
+        "end": float(time[ends[best]]),
+    }
+
+
+def best_efforts(distance: np.ndarray, time: np.ndarray,
+                 targets: dict[str, float] = calcs.DISTANCES) -> dict[str, dict]:
+    """`best_effort` for every named distance the activity is long enough for.
+
+    Every effort also carries the VDOT it scores.
+    """
+    efforts = {}
+    for name, target in targets.items():
+        effort = best_effort(distance, time, target)
+        if effort is not None:
+            efforts[name] = effort
+    if efforts:
+        meters = [targets[name] for name in efforts]
+        vdots = batch.get_vdot(meters, [effort["time"] for effort in efforts.values()])
+        for effort, vdot in zip(efforts.values(), vdots.tolist()):
+            effort["vdot"] = vdot
+    return efforts
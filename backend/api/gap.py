@@ -0,0 +1,128 @@
+"""Grade-adjusted pace over activity streams.
+
+Uphill running costs more energy per meter than flat running and gentle
+downhills cost less, so hilly splits look off pace against flat-ground
+targets. Every segment of an activity is converted to the flat distance
+that would have cost the same energy, using Minetti et al. (2002)'s cost of
+running at a grade:
+
+    C(i) = 155.4i^5 - 30.4i^4 - 43.3i^3 + 46.3i^2 + 19.5i + 3.6  J/kg/m
+
+and grade-adjusted pace is time over equivalent flat distance. GPS and
+barometric elevation is noisy, so it is resampled to a regular distance
+grid and averaged over `DEFAULT_WINDOW` meters before grades are taken;
+everything after the resampling runs on the grid, which is also what keeps
+dense tracks cheap.
+"""
+from __future__ import annotations
+from datetime import timedelta
+from api import batch, splits
+from api.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# meters of distance elevation is averaged over
+DEFAULT_WINDOW = 100.0
+
+# resampling steps per smoothing window
+GRID_STEPS = 10
+
+# grades outside the range Minetti measured are clipped to it
+MAX_GRADE = 0.45
+
+UNIT_METERS = {"mi": 1609.344, "km": 1000.0}
+
+# Minetti's polynomial, highest power first, and its value on the flat
+_COST = (155.4, -30.4, -43.3, 46.3, 19.5, 3.6)
+_FLAT_COST = _COST[-1]
+
+
+def cost_factor(grade: np.ndarray) -> np.ndarray:
+    """Energy cost per meter at `grade` (rise over run) relative to flat ground."""
+    return np.polyval(_COST, np.clip(grade, -MAX_GRADE, MAX_GRADE)) / _FLAT_COST
+
+
+def elevation_profile(distance: np.ndarray, elevation: np.ndarray,
+                      window: float = DEFAULT_WINDOW) -> tuple[np.ndarray, np.ndarray]:
+    """Elevation averaged over `window` meters, as (distance, elevation) arrays.
+
+    The track is resampled every `window / GRID_STEPS` meters first, so the
+    moving average is a fixed-width difference of cumulative sums however
+    unevenly the points were recorded. Missing readings are interpolated from
+    their neighbours; without any reading the track is taken as flat. With
+    no window the recorded points are returned as they are.
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    elevation = np.asarray(elevation, dtype=np.float64)
+    valid = ~np.isnan(elevation)
+    if not valid.any():
+        return distance, np.zeros_like(distance)
+    if not valid.all():
+        elevation = np.interp(distance, distance[valid], elevation[valid])
+    if window <= 0:
+        return distance, elevation
+
+    grid = np.append(np.arange(distance[0], distance[-1], window / GRID_STEPS), distance[-1])
+    resampled = np.interp(grid, distance, elevation)
+    half = GRID_STEPS // 2
+    total = np.concatenate(([0.0], np.cumsum(np.pad(resampled, half, mode="edge"))))
+    return grid, (total[2 * half + 1:] - total[:-2 * half - 1]) / (2 * half + 1)
+
+
+def grade(distance: np.ndarray, elevation: np.ndarray) -> np.ndarray:
+    """Rise over run of every segment between points, 0 where no distance was covered."""
+    run = np.diff(distance)
+    return np.divide(np.diff(elevation), run, out=np.zeros_like(run), where=run > 0)
+
+
+def flat_distance(distance: np.ndarray, elevation: np.ndarray) -> np.ndarray:
+    """Cumulative equivalent flat meters at every point of an elevation profile."""
+    segments = np.diff(distance) * cost_factor(grade(distance, elevation))
+    return np.concatenate(([0.0], np.cumsum(segments)))
+
+
+def gap_splits(distance: np.ndarray, time: np.ndarray, elevation: np.ndarray,
+               unit: str = "mi", window: float = DEFAULT_WINDOW,
+               marathon_pace: timedelta | None = None,
+               strategy: str = "progressive") -> list[dict]:
+    """Actual and grade-adjusted pace of every mile/km split.
+
+    Rows use the labels of `splits.long_run_splits`; with `marathon_pace`
+    each row also carries that table's target pace and whether the
+    grade-adjusted pace landed within it.
+    """
+    distance = np.maximum.accumulate(np.asarray(distance, dtype=np.float64))
+    time = np.asarray(time, dtype=np.float64)
+    unit_meters = UNIT_METERS[unit]
+    # to the split labels' precision, so GPS noise cannot add a sliver of a split
+    total = round((distance[-1] - distance[0]) / unit_meters, 2)
+    if total <= 0:
+        return []
+
+    ends = splits.split_boundaries(total)
+    bounds = np.concatenate(([0.0], ends)) * unit_meters + distance[0]
+    profile_distance, profile_elevation = elevation_profile(distance, elevation, window)
+    flat = flat_distance(profile_distance, profile_elevation)
+    split_time = np.diff(np.interp(bounds, distance, time))
+    split_flat = np.diff(np.interp(bounds, profile_distance, flat)) / unit_meters
+    split_rise = np.diff(np.interp(bounds, profile_distance, profile_elevation))
+    split_length = np.diff(bounds)
+
+    pace = batch.format_seconds(split_time / np.diff(bounds / unit_meters))
+    gap_seconds = np.divide(split_time, split_flat, out=np.zeros_like(split_time), where=split_flat > 0)
+    gap = batch.format_seconds(gap_seconds)
+    grades = np.round(split_rise / split_length * 100, 1).tolist()
+    labels = [splits.split_label(end) for end in ends.tolist()]
+    rows = [
+        {unit: label, "Pace": p, "Grade Adjusted Pace": g, "Grade": pct}
+        for label, p, g, pct in zip(labels, pace, gap, grades)
+    ]
+
+    if marathon_pace is not None:
+        targets = splits.long_run_splits(total, unit, marathon_pace, strategy, columnar=True)
+        paces = splits.long_run_paces(total, marathon_pace, strategy)
+        within = np.abs(np.floor(gap_seconds) - paces) <= splits.PACE_TOLERANCE
+        for row, target, hit in zip(rows, targets["Target Pace"], within.tolist()):
+            row["Target Pace"] = target
+            row["On Target"] = hit
+    return rows
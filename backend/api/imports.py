@@ -0,0 +1,189 @@
+"""Streaming parsers and batched inserts for bulk workout imports."""
+import csv
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from api.models import Workout
+from api import rollups
+from api.core.cache import workout_cache
+from api.schemas import WorkoutCreate
+
+# errors beyond this are counted but not itemized in the response
+MAX_REPORTED_ERRORS = 1000
+
+
+class UnreadableUploadError(ValueError):
+    """The upload cannot be read at all, so not a single row was imported."""
+
+
+class UndecodableLineError(ValueError):
+    """A line of an upload that is not UTF-8; `text` has the bad bytes replaced."""
+
+    def __init__(self, line: bytes, error: UnicodeDecodeError):
+        super().__init__(f"invalid UTF-8 at byte {error.start}")
+        self.text = line.decode("utf-8", errors="replace")
+
+
+def _decode(line: bytes) -> str | UndecodableLineError:
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return UndecodableLineError(line, e)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str | UndecodableLineError]:
+    """Split a byte stream into lines without reading it all into memory.
+
+    A line that is not valid UTF-8 is yielded as an `UndecodableLineError`,
+    to be reported as its row's error.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield _decode(line + b"\n")
+    if pending:
+        yield _decode(pending)
+
+
+async def iter_ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Any]]:
+    """Yield (row number, parsed object or error) for each non-blank line."""
+    row = 0
+    async for line in iter_lines(chunks):
+        if isinstance(line, UndecodableLineError):
+            row += 1
+            yield row, line
+            continue
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, ValueError(f"invalid JSON: {e.msg}")
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Any]]:
+    """Yield (row number, dict) for each CSV record after the header line.
+
+    Quoted fields may span lines: a record is complete once its quotes
+    balance. Empty cells are read as missing values. A record with a line
+    that is not UTF-8 is an error row.
+
+    Raises:
+        UnreadableUploadError: the header line is not UTF-8
+    """
+    header = None
+    record = ""
+    undecodable = None
+    row = 0
+    async for line in iter_lines(chunks):
+        if isinstance(line, UndecodableLineError):
+            if header is None:
+                raise UnreadableUploadError(f"CSV header: {line}")
+            # read on to the end of the record so the next one starts where it should
+            undecodable, line = line, line.text
+        record += line
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if undecodable is not None:
+            row += 1
+            yield row, undecodable
+            undecodable = None
+            continue
+        if not values:
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, ValueError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}
+    if record.strip():
+        yield row + 1, ValueError("unterminated quoted field")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+class WorkoutImport:
+    """Validates parsed rows and inserts them `batch_size` rows per statement.
+
+    Each batch is a single multi-row INSERT ... RETURNING inside a savepoint.
+    If the database rejects a batch, its rows are retried one at a time so
+    only the offending rows are reported and the rest are still written.
+    The written rows are added to the rollups before the batch commits, and
+    their ids are dropped from `workout_cache` after it does.
+    """
+
+    def __init__(self, connection: AsyncConnection, batch_size: int = 1000):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.created = 0
+        self.failed = 0
+        self.errors: list[dict[str, Any]] = []
+        self._batch: list[tuple[int, dict[str, Any]]] = []
+
+    def _error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    async def add(self, row: int, data: Any) -> None:
+        if isinstance(data, Exception):
+            self._error(row, str(data))
+            return
+        try:
+            workout = WorkoutCreate.model_validate(data)
+        except ValidationError as e:
+            self._error(row, _validation_message(e))
+            return
+        self._batch.append((row, workout.to_row()))
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        written = [values for _, values in batch]
+        try:
+            ids = await self._insert(written)
+        except DBAPIError:
+            written, ids = [], []
+            for row, values in batch:
+                try:
+                    ids += await self._insert([values])
+                    written.append(values)
+                except DBAPIError as e:
+                    self._error(row, str(e.orig))
+        await rollups.apply_workouts(self.connection, written)
+        await self.connection.commit()
+        await workout_cache.invalidate(*ids)
+
+    async def _insert(self, values: list[dict[str, Any]]) -> list[int]:
+        async with self.connection.begin_nested():
+            result = await self.connection.execute(insert(Workout).returning(Workout.id), values)
+            ids = result.scalars().all()
+        self.created += len(ids)
+        return ids
+
+    async def run(self, rows: AsyncIterator[tuple[int, Any]]) -> dict[str, Any]:
+        async for row, data in rows:
+            await self.add(row, data)
+        await self.flush()
+        return {"created": self.created, "failed": self.failed, "errors": self.errors}
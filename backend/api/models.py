@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, Text
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Numeric, Text
 from api.core.database import Base
 
 
@@ -7,16 +7,73 @@ class Workout(Base):
     Attributes:
         id: unique identifier
         name: name for workout
-        pace: target pace
-        time: target duration
+        pace: target pace in seconds per mile/km
+        time: target duration in seconds
         distance: target distance
         notes: additional info on the workout
+        date: day the workout is scheduled for
+        athlete_id: athlete the workout belongs to
     """
     __tablename__ = "workouts"
+    __table_args__ = (
+        Index("ix_workouts_athlete_id_date", "athlete_id", "date"),
+        Index("ix_workouts_athlete_id_pace", "athlete_id", "pace"),
+        Index("ix_workouts_athlete_id_distance", "athlete_id", "distance"),
+        Index("ix_workouts_date", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
-    pace = Column(String(5), nullable=True)
-    time = Column(String(8), nullable=True)
-    distance = Column(Numeric(precision=4, scale=2), nullable=True)
+    pace = Column(Integer, nullable=True)
+    time = Column(Integer, nullable=True)
+    distance = Column(Numeric(precision=7, scale=2), nullable=True)
     notes = Column(Text, nullable=True)
+    date = Column(Date, nullable=True)
+    athlete_id = Column(Integer, nullable=True)
+
+
+class ActivityStream(Base):
+    """Recorded track of a workout, stored as packed little-endian arrays.
+
+    See `api.activities.Track` for the array columns.
+    Attributes:
+        id: unique identifier
+        workout_id: workout the track was recorded for
+        start_time: timestamp of the first point
+        points: number of points in every array
+        time: seconds since the first point (float64)
+        distance: cumulative meters (float64)
+        heart_rate: beats per minute, NaN where not recorded (float32)
+        elevation: meters, NaN where not recorded (float32)
+    """
+    __tablename__ = "activity_streams"
+
+    id = Column(Integer, primary_key=True, index=True)
+    workout_id = Column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"),
+                        nullable=False, unique=True)
+    start_time = Column(DateTime(timezone=True), nullable=True)
+    points = Column(Integer, nullable=False)
+    time = Column(LargeBinary, nullable=False)
+    distance = Column(LargeBinary, nullable=False)
+    heart_rate = Column(LargeBinary, nullable=False)
+    elevation = Column(LargeBinary, nullable=False)
+
+
+class WorkoutRollup(Base):
+    """Training load of an athlete over one week or month, see `api.rollups`.
+    Attributes:
+        athlete_id: athlete the workouts belong to, 0 for none
+        period: "week" or "month"
+        period_start: Monday of the week or first day of the month
+        distance: total distance
+        time: total recorded duration in seconds
+        count: number of workouts
+    """
+    __tablename__ = "workout_rollups"
+
+    athlete_id = Column(Integer, primary_key=True)
+    period = Column(String(5), primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    distance = Column(Numeric(precision=12, scale=2), nullable=False, default=0)
+    time = Column(Integer, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
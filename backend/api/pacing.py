@@ -0,0 +1,129 @@
+"""Live race pacing over a WebSocket.
+
+A runner's device connects to `/race/live?goal_time=3:30:00&distance=42195`
+and streams its progress as the race goes on:
+
+    {"elapsed": 3605.2, "distance": 12040.5}    seconds, meters
+
+Every update is answered with the pace the rest of the race has to be run
+at to finish on the goal, the finish time at the average pace so far, and
+how many seconds that is behind (positive) or ahead of (negative) the goal:
+
+    {"elapsed": 3605.2, "distance": 12040.5,
+     "required_pace": "4:59", "projected_finish": "3:30:41", "goal_delta": 41}
+
+`required_pace` is null once the goal can no longer be made or the race is
+run, the projection and delta until `MIN_PROJECTION_DISTANCE` meters are
+run. A malformed update, or one past `MAX_ELAPSED` seconds, gets
+`{"error": ...}` back and the connection stays open.
+
+The endpoint is meant for many mostly idle connections per process: an
+update touches no database and costs a JSON parse, a few `calcs` calls and
+a JSON dump, and a connection holds nothing but `stream_pacing`'s locals.
+Beyond `RACE_PACING_MAX_CONNECTIONS` in a process, connections are closed
+with 1013 (try again later). `benchmarks/race_soak.py` measures it.
+"""
+import json
+import math
+from datetime import timedelta
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from api import calcs
+from api.core import metrics
+from api.core.config import settings
+
+UPDATE_FORMAT = 'expected {"elapsed": seconds, "distance": meters}'
+
+# longest race an update may report, in seconds; timedelta overflows far beyond it
+MAX_ELAPSED = 7 * 24 * 3600
+
+# meters run before a finish is projected from the pace so far
+MIN_PROJECTION_DISTANCE = 10.0
+
+_connections = 0
+
+
+def pace_update(goal_time: timedelta, distance: float, elapsed: float, covered: float,
+                unit: str = "mi") -> dict:
+    """Required pace, projected finish and goal delta `elapsed` seconds and `covered` meters into a race.
+
+    Args:
+        goal_time (timedelta): goal finish time
+        distance (float): race distance in meters
+        elapsed (float): seconds run so far
+        covered (float): meters run so far
+        unit (str): "mi" or "km", the unit of the required pace
+
+    Returns:
+        dict: the update echoed back with required_pace, projected_finish and goal_delta
+    """
+    covered = min(covered, distance)
+    remaining = (distance - covered) / 1000
+    so_far = timedelta(seconds=elapsed)
+
+    required_pace = None
+    time_left = goal_time - so_far
+    if remaining > 0 and time_left > timedelta(0):
+        pace = calcs.get_pace(time_left, remaining)  # seconds/km
+        if unit == "mi":
+            pace = calcs.convert_to_mi_pace(pace)
+        required_pace = calcs.format_time_delta(pace)
+
+    projected_finish = goal_delta = None
+    if covered >= MIN_PROJECTION_DISTANCE:
+        projected = so_far + calcs.get_time(calcs.get_pace(so_far, covered / 1000), remaining)
+        projected_finish = calcs.format_time_delta(projected)
+        goal_delta = round((projected - goal_time).total_seconds())
+
+    return {"elapsed": elapsed, "distance": covered, "required_pace": required_pace,
+            "projected_finish": projected_finish, "goal_delta": goal_delta}
+
+
+def parse_update(message: str | bytes) -> tuple[float, float]:
+    """Elapsed seconds and meters of a progress update.
+
+    Raises:
+        ValueError: the message is not an update
+    """
+    try:
+        update = json.loads(message)
+        elapsed, covered = float(update["elapsed"]), float(update["distance"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(UPDATE_FORMAT) from e
+    if not (math.isfinite(elapsed) and math.isfinite(covered)) or not 0 <= elapsed <= MAX_ELAPSED or covered < 0:
+        raise ValueError(UPDATE_FORMAT)
+    return elapsed, covered
+
+
+async def stream_pacing(websocket: WebSocket, goal_time: timedelta, distance: float, unit: str) -> None:
+    """Answer a runner's progress updates until they disconnect."""
+    global _connections
+    await websocket.accept()
+    if _connections >= settings.RACE_PACING_MAX_CONNECTIONS:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    _connections += 1
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            try:
+                elapsed, covered = parse_update(message.get("text") or message.get("bytes") or "")
+            except ValueError as e:
+                reply = {"error": str(e)}
+            else:
+                reply = pace_update(goal_time, distance, elapsed, covered, unit)
+            await websocket.send_text(json.dumps(reply))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _connections -= 1
+
+
+def _pacing_stats():
+    yield "race_pacing_connections", (), _connections
+
+metrics.registry.describe("race_pacing_connections", "gauge", "Open live race pacing connections")
+metrics.register_collector(_pacing_stats)
@@ -0,0 +1,205 @@
+"""Periodized training plans built from the calculators in `api.calcs`.
+
+A plan is a sequence of weeks (base, build, peak, taper) with seven days
+each. Weekly volume ramps towards the requested peak with a cutback every
+fourth week, each day gets a share of the week's volume and a workout type
+for the phase, and every workout carries its target pace, heart rate zone
+and, for long runs, the per-mile/km splits from `splits.long_run_splits`.
+
+Everything that depends only on the athlete's fitness (paces, zones, long
+run splits) or only on the plan shape (phases and volumes) is memoized, so
+generating plans for many athletes mostly costs the date arithmetic.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from api import calcs, splits
+
+# share of the weekly volume run on each day, Monday first
+DAY_SHARES = (0.0, 0.16, 0.16, 0.18, 0.10, 0.12, 0.28)
+
+# (name, training pace, heart rate zone) for every day of the week per phase
+WEEK_TEMPLATES = {
+    "Base": (
+        ("Rest", None, None),
+        ("Easy + strides", "Easy (upper)", 2),
+        ("Easy", "Easy (lower)", 2),
+        ("Steady", "Easy (upper)", 2),
+        ("Recovery", "Easy (lower)", 1),
+        ("Easy", "Easy (lower)", 2),
+        ("Long Run", "Long Run", 2),
+    ),
+    "Build": (
+        ("Rest", None, None),
+        ("Intervals", "Interval", 5),
+        ("Easy", "Easy (lower)", 2),
+        ("Threshold", "Threshold", 4),
+        ("Recovery", "Easy (lower)", 1),
+        ("Easy", "Easy (upper)", 2),
+        ("Long Run", "Long Run", 2),
+    ),
+    "Peak": (
+        ("Rest", None, None),
+        ("Repetitions", "Repetitions", 5),
+        ("Easy", "Easy (lower)", 2),
+        ("Race Pace", "Race Pace", 3),
+        ("Recovery", "Easy (lower)", 1),
+        ("Easy", "Easy (upper)", 2),
+        ("Long Run", "Long Run", 2),
+    ),
+    "Taper": (
+        ("Rest", None, None),
+        ("Intervals", "Interval", 5),
+        ("Easy", "Easy (lower)", 2),
+        ("Race Pace", "Race Pace", 3),
+        ("Rest", None, None),
+        ("Easy", "Easy (lower)", 2),
+        ("Long Run", "Long Run", 2),
+    ),
+}
+
+# training pace used as race pace for each goal race
+RACE_PACES = {
+    "800M": "Repetitions",
+    "1600M": "Repetitions",
+    "5K": "Interval",
+    "10K": "Threshold",
+    "Half Marathon": "Threshold",
+    "Marathon": "Marathon",
+}
+
+
+@lru_cache(maxsize=4096)
+def training_paces(vdot: float, unit: str) -> dict[str, str]:
+    """`calcs.get_training_paces` in `unit`, as the `/vdot_paces` route returns them."""
+    paces = calcs.get_training_paces(vdot)
+    if unit == "mi":
+        paces = {
+            name: calcs.format_time_delta(calcs.convert_to_mi_pace(calcs.parse_str_time(pace)))
+            for name, pace in paces.items()
+        }
+    return paces
+
+
+@lru_cache(maxsize=1024)
+def heart_rate_zones(max_heart_rate: int) -> dict[int, tuple[int, int]]:
+    return calcs.heart_rate_zones(max_heart_rate)
+
+
+@lru_cache(maxsize=16384)
+def long_run(distance: float, unit: str, marathon_pace: str) -> tuple[str, list[dict]]:
+    """Average target pace (15% slower than marathon pace) and splits of a long run."""
+    m_pace = calcs.parse_str_time(marathon_pace)
+    pace = calcs.format_time_delta(calcs.percentage_of_pace(m_pace, 0.85))
+    return pace, splits.long_run_splits(distance, unit, m_pace)
+
+
+@lru_cache(maxsize=1024)
+def plan_shape(weeks: int, weekly_volume: float, taper_weeks: int) -> tuple[tuple[str, float], ...]:
+    """(phase, volume) for every week of a plan."""
+    build_weeks = weeks - taper_weeks
+    base_weeks = round(build_weeks * 0.4)
+    peak_weeks = max(1, round(build_weeks * 0.25))
+    shape = []
+    for week in range(build_weeks):
+        if week < base_weeks:
+            phase = "Base"
+        elif week < build_weeks - peak_weeks:
+            phase = "Build"
+        else:
+            phase = "Peak"
+        # ramp from 70% to 100% of the peak volume, cutting back every 4th week
+        ramp = 0.7 + 0.3 * week / max(1, build_weeks - 1)
+        if week % 4 == 3:
+            ramp *= 0.8
+        shape.append((phase, weekly_volume * ramp))
+    for week in range(taper_weeks):
+        shape.append(("Taper", weekly_volume * (0.75 - 0.2 * week)))
+    return tuple(shape)
+
+
+def _round_distance(distance: float) -> float:
+    return round(distance * 2) / 2
+
+
+def generate_plan(goal_race: str,
+                  vdot: float,
+                  start_date: date,
+                  weekly_volume: float,
+                  weeks: int = 16,
+                  unit: str = "mi",
+                  max_heart_rate: int | None = None) -> dict:
+    """Day by day plan from the first Monday on or after `start_date`.
+
+    The race is the Sunday of the last week. Runs whose share of a low
+    weekly volume rounds to nothing become rest days.
+    """
+    taper_weeks = 2 if calcs.DISTANCES[goal_race] > calcs.DISTANCES["10K"] else 1
+    paces = training_paces(vdot, unit)
+    zones = heart_rate_zones(max_heart_rate) if max_heart_rate else None
+    race_pace = paces[RACE_PACES[goal_race]]
+    marathon_pace = paces["Marathon"]
+    start = start_date + timedelta(days=-start_date.weekday() % 7)
+
+    plan_weeks = []
+    for index, (phase, volume) in enumerate(plan_shape(weeks, weekly_volume, taper_weeks)):
+        week_start = start + timedelta(weeks=index)
+        days = []
+        for day, ((name, pace_name, zone), share) in enumerate(zip(WEEK_TEMPLATES[phase], DAY_SHARES)):
+            distance = _round_distance(volume * share) if pace_name is not None else 0
+            if not distance:
+                days.append({"date": week_start + timedelta(days=day), "name": "Rest"})
+                continue
+            workout = {"date": week_start + timedelta(days=day), "name": name, "distance": distance}
+            if pace_name == "Long Run":
+                workout["pace"], workout["splits"] = long_run(distance, unit, marathon_pace)
+            elif pace_name == "Race Pace":
+                workout["pace"] = race_pace
+            else:
+                workout["pace"] = paces[pace_name]
+            if zones is not None:
+                workout["heart_rate_zone"] = zone
+                workout["heart_rate"] = zones[zone]
+            days.append(workout)
+        plan_weeks.append({
+            "week": index + 1,
+            "phase": phase,
+            "volume": _round_distance(volume),
+            "days": days,
+        })
+
+    race_day = plan_weeks[-1]["days"][-1]
+    race_day.pop("splits", None)
+    race_day.update(
+        name=f"{goal_race} Race",
+        distance=round(calcs.DISTANCES[goal_race] / (1609.344 if unit == "mi" else 1000), 2),
+        pace=race_pace,
+    )
+    return {
+        "goal_race": goal_race,
+        "vdot": vdot,
+        "unit": unit,
+        "training_paces": paces,
+        "heart_rate_zones": zones,
+        "weeks": plan_weeks,
+    }
+
+
+def plan_workouts(plan: dict) -> list[dict]:
+    """Plan days as `WorkoutCreate` fields, rest days left out."""
+    workouts = []
+    for week in plan["weeks"]:
+        for day in week["days"]:
+            if "distance" not in day:
+                continue
+            notes = f"{day['date'].isoformat()} | Week {week['week']} ({week['phase']})"
+            if "heart_rate" in day:
+                low, high = day["heart_rate"]
+                notes += f" | HR zone {day['heart_rate_zone']} ({low}-{high} bpm)"
+            workouts.append({
+                "name": day["name"],
+                "pace": day["pace"],
+                "distance": day["distance"],
+                "notes": notes,
+                "date": day["date"],
+            })
+    return workouts
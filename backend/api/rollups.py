@@ -0,0 +1,125 @@
+"""Weekly and monthly training load per athlete, kept up to date as workouts change.
+
+`workout_rollups` holds one row per (athlete, period, period start) with the
+distance, recorded time and number of dated workouts in it. Every write
+path adds its workouts' contribution in the same transaction as the write,
+with one upsert per touched row, so reading a week or month is a primary
+key lookup instead of an aggregate over `workouts`. Workouts without an
+athlete are rolled up under athlete 0; workouts without a date are left out.
+
+`rebuild` recomputes the table from `workouts` with one INSERT ... SELECT
+per period, for backfills or after writes that bypassed the API:
+
+    python -m api.rollups
+"""
+import asyncio
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import Date, cast, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from api.analytics import period_start
+from api.models import Workout, WorkoutRollup
+
+PERIODS = ("week", "month")
+
+# athlete_id the workouts of no athlete are rolled up under
+NO_ATHLETE = 0
+
+
+def rollup_deltas(workouts: Iterable[dict[str, Any]], sign: int = 1) -> list[dict[str, Any]]:
+    """Changes to every rollup row the workouts fall in, sorted by key.
+
+    Args:
+        workouts: `Workout` column values
+        sign: 1 when the workouts are added, -1 when they are removed
+    """
+    deltas: dict[tuple, dict[str, Any]] = {}
+    for workout in workouts:
+        if workout.get("date") is None:
+            continue
+        athlete_id = workout.get("athlete_id")
+        athlete_id = NO_ATHLETE if athlete_id is None else athlete_id
+        for period in PERIODS:
+            key = (athlete_id, period, period_start(workout["date"], period))
+            delta = deltas.get(key)
+            if delta is None:
+                delta = deltas[key] = {
+                    "athlete_id": key[0], "period": key[1], "period_start": key[2],
+                    "distance": 0.0, "time": 0, "count": 0,
+                }
+            delta["distance"] += sign * float(workout.get("distance") or 0)
+            delta["time"] += sign * (workout.get("time") or 0)
+            delta["count"] += sign
+    # a fixed order keeps concurrent writers from deadlocking on each other's rows
+    return [deltas[key] for key in sorted(deltas)]
+
+
+async def apply_workouts(connection: AsyncConnection, workouts: Iterable[dict[str, Any]],
+                         sign: int = 1) -> None:
+    """Add (or with `sign=-1` remove) workouts to their rollups, without committing."""
+    deltas = rollup_deltas(workouts, sign)
+    if not deltas:
+        return
+    # imported on first write, not with the routes
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(WorkoutRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=[WorkoutRollup.athlete_id, WorkoutRollup.period, WorkoutRollup.period_start],
+        set_={
+            "distance": WorkoutRollup.distance + statement.excluded.distance,
+            "time": WorkoutRollup.time + statement.excluded.time,
+            "count": WorkoutRollup.count + statement.excluded.count,
+        },
+    )
+    await connection.execute(statement, deltas)
+
+
+def _period_start_sql(dialect_name: str, period: str):
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(period, Workout.date), Date)
+    # SQLite: back to the Monday on or before the date, or the 1st of the month
+    if period == "week":
+        return func.date(Workout.date, "-6 days", "weekday 1")
+    return func.date(Workout.date, "start of month")
+
+
+async def rebuild(connection: AsyncConnection) -> None:
+    """Recompute every rollup from `workouts` and commit."""
+    await connection.execute(delete(WorkoutRollup))
+    athlete_id = func.coalesce(Workout.athlete_id, NO_ATHLETE)
+    for period in PERIODS:
+        start = _period_start_sql(connection.dialect.name, period)
+        totals = (
+            select(
+                athlete_id,
+                literal(period),
+                start,
+                func.coalesce(func.sum(Workout.distance), 0),
+                func.coalesce(func.sum(Workout.time), 0),
+                func.count(),
+            )
+            .where(Workout.date.is_not(None))
+            .group_by(athlete_id, start)
+        )
+        await connection.execute(
+            insert(WorkoutRollup).from_select(
+                ["athlete_id", "period", "period_start", "distance", "time", "count"], totals
+            )
+        )
+    await connection.commit()
+
+
+async def _rebuild() -> None:
+    from api.core.database import engine
+
+    async with engine.connect() as connection:
+        await rebuild(connection)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_rebuild())
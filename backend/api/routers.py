@@ -1,20 +1,64 @@
-from fastapi import APIRouter, Query, Depends, status
+from collections.abc import AsyncIterator
+from fastapi import APIRouter, Query, Depends, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
 from typing import Literal, Annotated
-from api import calcs
-from api.models import Workout
-from api.schemas import WorkoutCreate, WorkoutResponse
-from api.core.database import get_session, fetch_all, fetch_one, execute
-from api.core.exceptions import NotFoundException
+from datetime import date, datetime, timedelta, timezone
+from api import activities, analytics, calcs, batch, efforts, gap, imports, pacing, plans, rollups, splits
+from api.write_buffer import workout_writes
+from api.vdot_table import get_vdot_table
+from api.models import ActivityStream, Workout, WorkoutRollup
+from api.schemas import (
+    WorkoutCreate,
+    WorkoutResponse,
+    StrDuration,
+    StrTime,
+    WorkoutPage,
+    WorkoutSearchPage,
+    ActivitySummary,
+    BulkImportResult,
+    PlanRequest,
+    BatchVdotRequest,
+    BatchRacePaceRequest,
+    BatchTrainingPacesRequest,
+    BatchPacePercentageRequest
+)
+from api.core.config import settings
+from api.core.database import (
+    UnitOfWork,
+    get_unit_of_work,
+    get_db_connection,
+    fetch_one,
+    stream_all
+)
+from api.core.exceptions import (
+    NotFoundException,
+    UnprocessableEntityException,
+    UnsupportedMediaTypeException
+)
+from api.core.cache import CachedRoute, cache_response, workout_cache
 from api.core.logging import get_logger
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert
 
 logger = get_logger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# days of activities the current fitness VDOT is taken from
+FITNESS_WINDOW_DAYS = 42
+
+# sort keys of /workouts, "-" for descending
+WORKOUT_SORTS = ("date", "-date", "pace", "-pace", "time", "-time", "distance", "-distance", "id", "-id")
+
+# days of activities rolled up by /analytics/rollup
+ROLLUP_WINDOW_DAYS = 84
 
 @router.get("/race_pace")
-def race_pace(finish_time: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*|[^:]*:)$")] = "20:00",
+@cache_response()
+def race_pace(finish_time: StrTime = "20:00",
               unit: Annotated[Literal["mi", "km"], "pace units in km or mi"] = "mi",
               distance: Annotated[float, "race distance in meters"] = 5000):
     parsed_time = calcs.parse_str_time(finish_time)
@@ -25,7 +69,8 @@ def race_pace(finish_time: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[
     return {"pace": formatted_pace}
 
 @router.get("/race_time")
-def race_time(pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*|[^:]*:)$")] = "6:30",
+@cache_response()
+def race_time(pace: StrTime = "6:30",
               unit: Annotated[Literal["mi", "km"], "pace units in km or mi"] = "mi",
               distance: Annotated[float, "race distance in meters"] = 5000):
     parsed_time = calcs.parse_str_time(pace)
@@ -35,21 +80,33 @@ def race_time(pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*|[^
     formatted_time = calcs.format_time_delta(total_time)
     return {"time": formatted_time}
 
+@router.websocket("/race/live")
+async def race_live(websocket: WebSocket,
+                    goal_time: StrTime,
+                    distance: Annotated[float, Query(gt=0, le=1_000_000, description="race distance in meters")],
+                    unit: Literal["mi", "km"] = "mi"):
+    await pacing.stream_pacing(websocket, calcs.parse_str_time(goal_time), distance, unit)
+
 @router.get("/pfitz_long_run_pace")
-def pfitz_long_run_pace(distance: Annotated[float, "distance of long run"] = 15,
-                        marathon_pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*|[^:]*:)$")] = "6:30",
-                        unit: Annotated[Literal["mi", "km"], "pace units in km or mi"] = "mi"):
+@cache_response()
+def pfitz_long_run_pace(distance: Annotated[float, Query(gt=0, le=1000, description="distance of long run")] = 15,
+                        marathon_pace: StrTime = "6:30",
+                        unit: Annotated[Literal["mi", "km"], "pace units in km or mi"] = "mi",
+                        strategy: Annotated[Literal[splits.STRATEGIES], "pacing strategy"] = "progressive",
+                        columnar: Annotated[bool, "return parallel lists instead of one row per split"] = False):
     m_pace = calcs.parse_str_time(marathon_pace)
-    result = calcs.pfitz_long_run_pace(distance, unit, m_pace)
+    result = splits.long_run_splits(distance, unit, m_pace, strategy, columnar)
     return result
 
 @router.get("/heart_rate_zones")
+@cache_response()
 def heart_rate_zones(max_heart_rate: Annotated[int, "maximum heart rate"] = 185):
     zones = calcs.heart_rate_zones(max_heart_rate)
     return zones
 
 @router.get("/pace_percentage")
-def pace_percentage(pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*|[^:]*:)$")] = "6:00",
+@cache_response()
+def pace_percentage(pace: StrTime = "6:00",
               method: Annotated[Literal["pace", "speed"], "calculation method"] = "pace",
               percentage: Annotated[int, "percentage"] = 95):
     total_time = calcs.parse_str_time(pace)
@@ -61,7 +118,8 @@ def pace_percentage(pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^
     return {"pace": formatted_pace}
 
 @router.get("/pace_workouts")
-def pace_workouts(pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*|[^:]*:)$")] = "6:00",
+@cache_response()
+def pace_workouts(pace: StrTime = "6:00",
                   method: Annotated[Literal["pace", "speed"], "calculation method"] = "pace"):
     workout_paces =[
         {
@@ -112,7 +170,8 @@ def pace_workouts(pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]
     return {"workout_paces": paces}
 
 @router.get("/convert_pace")
-def convert_pace(pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*|[^:]*:)$")] = "6:00",
+@cache_response()
+def convert_pace(pace: StrTime = "6:00",
                  target_unit: Annotated[Literal["mi", "km"], "pace units in km or mi"] = "mi"):
     parsed_pace = calcs.parse_str_time(pace)
     if target_unit == "mi":
@@ -123,13 +182,15 @@ def convert_pace(pace: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*
     return {"pace": formatted_pace}
 
 @router.get("/vdot")
+@cache_response()
 def vdot(distance: Annotated[float, "race distance in meters"] = 5000,
-         time: Annotated[str | None, Query(pattern="^[^:]*(:[^:]*:?[^:]*|[^:]*:)$")] = "20:00"):
+         time: StrTime = "20:00"):
     time = calcs.parse_str_time(time)
     vdot = calcs.get_vdot(distance, time)
     return {"vdot": vdot}
 
 @router.get("/vdot_paces")
+@cache_response()
 def vdot_paces(vdot: float,
                unit: Annotated[Literal["mi", "km"], "pace units in km or mi"] = "mi"):
     training_paces = calcs.get_training_paces(vdot)
@@ -141,64 +202,443 @@ def vdot_paces(vdot: float,
             training_paces[name] = formatted_pace
     return {"training_paces": training_paces}
 
+@router.get("/race_predictions")
+@cache_response()
+def race_predictions(vdot: Annotated[float | None, Query(gt=0)] = None,
+                     distance: Annotated[float, Query(gt=0, description="race distance in meters")] = 5000,
+                     time: StrTime = "20:00"):
+    """Equivalent race times for every distance, from a VDOT or a race result."""
+    if vdot is None:
+        vdot = calcs.get_vdot(distance, calcs.parse_str_time(time))
+        if vdot <= 0:
+            raise UnprocessableEntityException(f"{distance} m in {time} gives no VDOT")
+    try:
+        race_times = get_vdot_table().race_times(vdot)
+    except ValueError as e:
+        raise UnprocessableEntityException(str(e))
+    predictions = {
+        name: calcs.format_time_delta(timedelta(seconds=seconds))
+        for name, seconds in race_times.items()
+    }
+    return {"vdot": vdot, "predictions": predictions}
+
+def _parse_str_times(str_times: list[str]) -> list[float]:
+    return [calcs.parse_str_time(t).total_seconds() for t in str_times]
+
+@router.post("/batch/vdot")
+def batch_vdot(data: BatchVdotRequest):
+    """VDOT for every (distance, time) row, same as `/vdot` per row."""
+    times = _parse_str_times(data.time)
+    vdots = batch.get_vdot(data.distance, times)
+    return {"vdot": vdots.tolist()}
+
+@router.post("/batch/race_pace")
+def batch_race_pace(data: BatchRacePaceRequest):
+    """Pace for every (distance, time) row, same as `/race_pace` per row."""
+    times = _parse_str_times(data.time)
+    paces = batch.race_pace(times, data.distance, data.unit)
+    return {"pace": batch.format_seconds(paces)}
+
+@router.post("/batch/training_paces")
+def batch_training_paces(data: BatchTrainingPacesRequest):
+    """Training paces for every VDOT row, same as `/vdot_paces` per row."""
+    training_paces = batch.get_training_paces(data.vdot, data.unit)
+    return {
+        "training_paces": {
+            name: batch.format_seconds(paces) for name, paces in training_paces.items()
+        }
+    }
+
+@router.post("/batch/pace_percentage")
+def batch_pace_percentage(data: BatchPacePercentageRequest):
+    """Scaled pace for every (pace, percentage) row, same as `/pace_percentage` per row."""
+    paces = _parse_str_times(data.pace)
+    percentages = [p * 0.01 for p in data.percentage]
+    if data.method == "pace":
+        updated_paces = batch.percentage_of_pace(paces, percentages)
+    else:
+        updated_paces = batch.percentage_of_speed(paces, percentages)
+    return {"pace": batch.format_seconds(updated_paces)}
+
+@router.post("/plans")
+async def create_plan(plan_data: PlanRequest,
+                      save: Annotated[bool, "write the plan's workouts to the workouts table"] = False,
+                      unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Generate a periodized training plan, optionally saving its workouts."""
+    vdot = plan_data.vdot
+    if vdot is None:
+        race_distance = calcs.DISTANCES[plan_data.goal_race]
+        vdot = calcs.get_vdot(race_distance, calcs.parse_str_time(plan_data.goal_time))
+    plan = plans.generate_plan(plan_data.goal_race, vdot, plan_data.start_date,
+                               plan_data.weekly_volume, plan_data.weeks, plan_data.unit,
+                               plan_data.max_heart_rate)
+    if save:
+        workouts = [dict(workout, athlete_id=plan_data.athlete_id)
+                    for workout in plans.plan_workouts(plan)]
+        workout_import = imports.WorkoutImport(await unit_of_work.connection(),
+                                               settings.WORKOUT_BULK_BATCH_SIZE)
+        plan["saved"] = await workout_import.run(_enumerate_rows(workouts))
+    return plan
+
+async def _enumerate_rows(rows: list[dict]) -> AsyncIterator[tuple[int, dict]]:
+    for row, data in enumerate(rows, start=1):
+        yield row, data
+
 @router.post("/create_workout", response_model=WorkoutResponse,
              response_model_exclude_unset=True)
 async def create_workout(workout_data: WorkoutCreate,
-                         session: AsyncSession=Depends(get_session)):
+                         unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
     """Create a new workout.
+
+    With `WORKOUT_WRITE_BUFFER` on, the row is queued and written in a
+    batch with other creates; the response still waits for its commit.
     Args:
         workout_data: Workout creation data
     Returns:
         Workout: Created Workout
     """
-    workout = Workout(**workout_data.model_dump())
+    row = workout_data.to_row()
+    if settings.WORKOUT_WRITE_BUFFER:
+        return await workout_writes.submit(row)
+    session = await unit_of_work.session()
+    workout = Workout(**row)
     try:
         session.add(workout)
+        await rollups.apply_workouts(await session.connection(), [row])
         await session.commit()
         await session.refresh(workout)
+        await workout_cache.invalidate(workout.id)
         return workout
     except IntegrityError:
         await session.rollback()
         raise
 
-@router.get("/get_workouts")
-async def get_all_workouts():
-    """Get all workouts"""
+@router.post("/workouts/bulk", response_model=BulkImportResult)
+async def bulk_create_workouts(
+    request: Request,
+    batch_size: Annotated[int, Query(ge=1, le=10000)] = settings.WORKOUT_BULK_BATCH_SIZE,
+    connection: AsyncConnection=Depends(get_db_connection)):
+    """Create workouts from a streamed CSV (text/csv) or NDJSON upload.
+
+    Rows are validated as `WorkoutCreate` and written `batch_size` at a
+    time; invalid rows are reported back without aborting the import.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "text/csv":
+        rows = imports.iter_csv_rows(request.stream())
+    elif content_type in ("application/x-ndjson", "application/jsonl", "application/json"):
+        rows = imports.iter_ndjson_rows(request.stream())
+    else:
+        raise UnsupportedMediaTypeException("Upload workouts as text/csv or application/x-ndjson")
+    try:
+        result = await imports.WorkoutImport(connection, batch_size).run(rows)
+    except imports.UnreadableUploadError as e:
+        raise UnprocessableEntityException(str(e))
+    logger.info("Bulk imported %s workouts, %s rows rejected", result["created"], result["failed"])
+    return result
+
+@router.get("/get_workouts", response_model=WorkoutPage)
+async def get_all_workouts(
+    after_id: Annotated[int, Query(ge=0, description="return workouts with a greater id")] = 0,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    format: Annotated[Literal["json", "ndjson"], "response format"] = "json",
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Get workouts ordered by id, one page at a time.
+
+    Pages are keyed on id: pass the returned `next_after_id` as `after_id`
+    to get the next page. With `format=ndjson` every workout after
+    `after_id` is streamed as one JSON object per line, ignoring `limit`.
+    """
+    query = select(Workout).where(Workout.id > after_id).order_by(Workout.id)
+    if format == "ndjson":
+        return StreamingResponse(_ndjson_lines(query), media_type="application/x-ndjson")
     try:
-        result = await fetch_all(select_query=select(Workout))
-        if len(result) > 1:
-            return result
-        else:
-            return []
+        workouts = await unit_of_work.fetch_all(select_query=query.limit(limit))
     except Exception as e:
-        logger.error(f"Failed to fetch workouts: {str(e)}")
+        logger.error("Failed to fetch workouts: %s", e)
+        raise
+    next_after_id = workouts[-1]["id"] if len(workouts) == limit else None
+    return {"workouts": workouts, "next_after_id": next_after_id}
 
-@router.get("/{workout_id}", response_model=WorkoutResponse)
-async def get_workout(
+async def _ndjson_lines(query) -> AsyncIterator[str]:
+    async for workout in stream_all(query):
+        yield WorkoutResponse.model_validate(workout).model_dump_json() + "\n"
+
+@router.get("/rollups")
+async def get_rollups(
+    athlete_id: Annotated[int, "athlete, 0 for workouts without one"] = rollups.NO_ATHLETE,
+    period: Annotated[Literal[rollups.PERIODS], "rollup period"] = "week",
+    date_from: Annotated[date | None, "first period start, inclusive"] = None,
+    date_to: Annotated[date | None, "last period start, inclusive"] = None,
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Distance, time and workout count per week or month, from `workout_rollups`."""
+    query = (
+        select(WorkoutRollup.period_start, WorkoutRollup.distance,
+               WorkoutRollup.time, WorkoutRollup.count)
+        .where(WorkoutRollup.athlete_id == athlete_id, WorkoutRollup.period == period,
+               WorkoutRollup.count > 0)
+        .order_by(WorkoutRollup.period_start)
+    )
+    if date_from is not None:
+        query = query.where(WorkoutRollup.period_start >= date_from)
+    if date_to is not None:
+        query = query.where(WorkoutRollup.period_start <= date_to)
+    rows = await unit_of_work.fetch_all(query)
+    for row in rows:
+        row["distance"] = float(row["distance"])
+        row["time"] = calcs.format_time_delta(timedelta(seconds=row["time"]))
+    return {"athlete_id": athlete_id, "period": period, "rollups": rows}
+
+@router.get("/workouts", response_model=WorkoutSearchPage)
+async def search_workouts(
+    athlete_id: int | None = None,
+    date_from: Annotated[date | None, "first day, inclusive"] = None,
+    date_to: Annotated[date | None, "last day, inclusive"] = None,
+    pace_min: Annotated[StrDuration | None, "fastest pace, inclusive"] = None,
+    pace_max: Annotated[StrDuration | None, "slowest pace, inclusive"] = None,
+    time_min: StrDuration | None = None,
+    time_max: StrDuration | None = None,
+    distance_min: Annotated[float | None, Query(ge=0)] = None,
+    distance_max: Annotated[float | None, Query(ge=0)] = None,
+    sort: Annotated[Literal[WORKOUT_SORTS], "sort key, - for descending"] = "date",
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Workouts matching every given range, sorted and paged by the database.
+
+    Paces and times are compared as seconds, so `pace_min=6:00&pace_max=6:30`
+    finds workouts paced between 6:00 and 6:30. Workouts without a value for
+    the sort key come last.
+    """
+    ranges = (
+        (Workout.date, date_from, date_to),
+        (Workout.pace, _seconds(pace_min), _seconds(pace_max)),
+        (Workout.time, _seconds(time_min), _seconds(time_max)),
+        (Workout.distance, distance_min, distance_max),
+    )
+    query = select(Workout)
+    if athlete_id is not None:
+        query = query.where(Workout.athlete_id == athlete_id)
+    for column, low, high in ranges:
+        if low is not None:
+            query = query.where(column >= low)
+        if high is not None:
+            query = query.where(column <= high)
+    column = getattr(Workout, sort.lstrip("-"))
+    order = column.desc() if sort.startswith("-") else column.asc()
+    id_order = Workout.id.desc() if sort.startswith("-") else Workout.id.asc()
+    query = query.order_by(order.nulls_last(), id_order).offset(offset).limit(limit + 1)
+    workouts = await unit_of_work.fetch_all(query)
+    next_offset = offset + limit if len(workouts) > limit else None
+    return {"workouts": workouts[:limit], "next_offset": next_offset}
+
+def _seconds(str_time: str | None) -> int | None:
+    return int(calcs.parse_duration(str_time).total_seconds()) if str_time else None
+
+@router.put("/workouts/{workout_id}/activity", response_model=ActivitySummary)
+async def upload_activity(
     workout_id: int,
-    session: AsyncSession=Depends(get_session))-> WorkoutResponse:
-    """Get workout by ID."""
-    logger.debug(f"Fetching workout {workout_id}")
+    request: Request,
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Attach a GPX or TCX track to a workout, replacing any previous one.
+
+    The upload is parsed as it streams in, and no database connection is
+    taken until it has been read in full.
+    """
     try:
-        workout = await fetch_one(
-            select_query=select(Workout).where(Workout.id == workout_id)
-        )
-        if not workout:
-            raise NotFoundException(f"Workout with id {workout_id} not found")
-        return workout
+        track = await activities.parse_track(request.stream())
+    except ValueError as e:
+        raise UnprocessableEntityException(f"Could not read activity file: {e}")
+    workout = await unit_of_work.fetch_one(select(Workout.id).where(Workout.id == workout_id))
+    if not workout:
+        raise NotFoundException(f"Workout with id {workout_id} not found")
+    await unit_of_work.execute(delete(ActivityStream).where(ActivityStream.workout_id == workout_id))
+    await unit_of_work.execute(
+        insert(ActivityStream).values(workout_id=workout_id, **track.to_columns())
+    )
+    await unit_of_work.commit()
+    logger.info("Stored %s trackpoints for workout %s", track.points, workout_id)
+    return {"workout_id": workout_id, **track.summary()}
+
+@router.get("/workouts/{workout_id}/activity")
+async def get_activity(
+    workout_id: int,
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Get the track of a workout as parallel per-point lists."""
+    row = await unit_of_work.fetch_one(
+        select(ActivityStream).where(ActivityStream.workout_id == workout_id)
+    )
+    if not row:
+        raise NotFoundException(f"No activity for workout {workout_id}")
+    track = activities.Track.from_columns(row)
+    return {
+        "workout_id": workout_id,
+        **track.summary(),
+        **{name: _json_floats(getattr(track, name)) for name in activities.STREAM_DTYPES},
+    }
+
+@router.get("/workouts/{workout_id}/best_efforts")
+async def get_best_efforts(
+    workout_id: int,
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Fastest stretch of the workout's track over every race distance, with its VDOT."""
+    row = await unit_of_work.fetch_one(
+        select(ActivityStream.time, ActivityStream.distance)
+        .where(ActivityStream.workout_id == workout_id)
+    )
+    if not row:
+        raise NotFoundException(f"No activity for workout {workout_id}")
+    best = efforts.best_efforts(activities.decode_column("distance", row["distance"]),
+                                activities.decode_column("time", row["time"]))
+    for effort in best.values():
+        effort["seconds"] = effort["time"]
+        effort["time"] = calcs.format_time_delta(timedelta(seconds=effort["seconds"]))
+    return {"workout_id": workout_id, "best_efforts": best}
+
+@router.get("/fitness/vdot")
+async def get_fitness_vdot(
+    days: Annotated[int, Query(ge=1, le=366)] = FITNESS_WINDOW_DAYS):
+    """Current fitness VDOT, the best VDOT of any best effort in the last `days` days.
+
+    Tracks are read and scored one at a time, so memory does not grow with
+    the number of activities in the window.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    query = (
+        select(ActivityStream.workout_id, ActivityStream.start_time,
+               ActivityStream.time, ActivityStream.distance)
+        .where(ActivityStream.start_time >= since)
+    )
+    best = {}
+    async for row in stream_all(query, yield_per=16):
+        scored = efforts.best_efforts(activities.decode_column("distance", row["distance"]),
+                                      activities.decode_column("time", row["time"]))
+        for name, effort in scored.items():
+            if name not in best or effort["time"] < best[name]["seconds"]:
+                best[name] = {
+                    "time": calcs.format_time_delta(timedelta(seconds=effort["time"])),
+                    "seconds": effort["time"],
+                    "vdot": effort["vdot"],
+                    "workout_id": row["workout_id"],
+                    "start_time": row["start_time"],
+                }
+    vdot = max((effort["vdot"] for effort in best.values()), default=None)
+    return {"days": days, "vdot": vdot, "best_efforts": best}
+
+@router.get("/workouts/{workout_id}/zones")
+async def get_workout_zones(
+    workout_id: int,
+    max_heart_rate: Annotated[int | None, Query(gt=0, le=250)] = None,
+    vdot: Annotated[float | None, Query(gt=0)] = None,
+    smoothing: Annotated[float, Query(ge=0, le=600, description="seconds of speed smoothing")]
+        = analytics.DEFAULT_SMOOTHING,
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Seconds in every heart rate zone and training pace band, and cardiac drift.
+
+    Heart rate zones need `max_heart_rate` and pace bands need `vdot`.
+    """
+    row = await unit_of_work.fetch_one(
+        select(ActivityStream).where(ActivityStream.workout_id == workout_id)
+    )
+    if not row:
+        raise NotFoundException(f"No activity for workout {workout_id}")
+    track = activities.Track.from_columns(row)
+    zones = {"workout_id": workout_id, "cardiac_drift": analytics.cardiac_drift(track, smoothing)}
+    if max_heart_rate is not None:
+        zones["heart_rate_zones"] = analytics.heart_rate_zones(track, max_heart_rate)
+    if vdot is not None:
+        zones["pace_bands"] = analytics.pace_bands(track, vdot, smoothing)
+    return zones
+
+@router.get("/analytics/rollup")
+async def get_rollup(
+    period: Annotated[Literal["week", "month"], "rollup period"] = "week",
+    days: Annotated[int, Query(ge=1, le=366)] = ROLLUP_WINDOW_DAYS,
+    max_heart_rate: Annotated[int | None, Query(gt=0, le=250)] = None,
+    vdot: Annotated[float | None, Query(gt=0)] = None):
+    """Activities, distance, moving time and time in zone per week or month.
+
+    Tracks are read and added to their period's totals one at a time, so
+    memory does not grow with the number of activities in the window.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    query = select(ActivityStream).where(ActivityStream.start_time >= since)
+    totals = analytics.Rollup(period, max_heart_rate, vdot)
+    async for row in stream_all(query, yield_per=16):
+        totals.add(activities.Track.from_columns(row))
+    return {"period": period, "rollup": totals.rows()}
+
+@router.get("/workouts/{workout_id}/gap")
+async def get_grade_adjusted_pace(
+    workout_id: int,
+    unit: Annotated[Literal["mi", "km"], "split units in km or mi"] = "mi",
+    window: Annotated[float, Query(ge=0, le=1000, description="meters of elevation smoothing")]
+        = gap.DEFAULT_WINDOW,
+    marathon_pace: StrTime | None = None,
+    strategy: Annotated[Literal[splits.STRATEGIES], "long run pacing strategy"] = "progressive",
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)):
+    """Actual and grade-adjusted pace of every split of the workout's track.
+
+    With `marathon_pace` (per `unit`) every split also gets its long run
+    target pace from `/pfitz_long_run_pace`, to compare with the adjusted pace.
+    """
+    row = await unit_of_work.fetch_one(
+        select(ActivityStream.time, ActivityStream.distance, ActivityStream.elevation)
+        .where(ActivityStream.workout_id == workout_id)
+    )
+    if not row:
+        raise NotFoundException(f"No activity for workout {workout_id}")
+    m_pace = calcs.parse_str_time(marathon_pace) if marathon_pace else None
+    rows = gap.gap_splits(activities.decode_column("distance", row["distance"]),
+                          activities.decode_column("time", row["time"]),
+                          activities.decode_column("elevation", row["elevation"]),
+                          unit, window, m_pace, strategy)
+    return {"workout_id": workout_id, "splits": rows}
+
+def _json_floats(values) -> list[float | None]:
+    # JSON has no NaN; missing readings become null
+    return [None if value != value else value for value in values.tolist()]
+
+@router.get("/{workout_id}", response_model=WorkoutResponse)
+async def get_workout(workout_id: int) -> Response:
+    """Get workout by ID.
+
+    Served from `workout_cache`; a miss is loaded on a connection of its
+    own, since concurrent misses for the same id share the load.
+    """
+    logger.debug("Fetching workout %s", workout_id)
+
+    async def load() -> bytes | None:
+        workout = await fetch_one(select(Workout).where(Workout.id == workout_id))
+        if workout is None:
+            return None
+        return WorkoutResponse.model_validate(workout).model_dump_json().encode()
+
+    try:
+        body = await workout_cache.get(workout_id, load)
     except Exception as e:
-        logger.error(f"Failed fetch workout id {workout_id}: {str(e)}")
+        logger.error("Failed fetch workout id %s: %s", workout_id, e)
         raise
+    if body is None:
+        raise NotFoundException(f"Workout with id {workout_id} not found")
+    return Response(content=body, media_type="application/json")
 
 @router.delete("/{workout_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_workout(
     workout_id: int,
-    session: AsyncSession=Depends(get_session)
+    unit_of_work: UnitOfWork=Depends(get_unit_of_work)
 ) -> None:
     """Delete workout by ID."""
-    logger.debug(f"Deleting workout {workout_id}")
-    query = delete(Workout).where(Workout.id == workout_id)
-    result = await session.execute(query)
-    if result.rowcount == 0:
+    logger.debug("Deleting workout %s", workout_id)
+    query = (
+        delete(Workout)
+        .where(Workout.id == workout_id)
+        .returning(Workout.athlete_id, Workout.date, Workout.distance, Workout.time)
+    )
+    result = await unit_of_work.execute(query)
+    deleted = [row._asdict() for row in result.all()]
+    if not deleted:
         raise NotFoundException(f"Workout with id {workout_id} not found")
-    await session.commit()
\ No newline at end of file
+    await rollups.apply_workouts(await unit_of_work.connection(), deleted, sign=-1)
+    await unit_of_work.commit()
+    await workout_cache.invalidate(workout_id)
\ No newline at end of file
@@ -1,4 +1,27 @@
-from pydantic import BaseModel, ConfigDict, Field
+import datetime as dt
+from datetime import date, datetime, timedelta
+from typing import Annotated, Literal
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, field_validator, model_validator
+from api import calcs
+
+
+def validate_str_time(value: str) -> str:
+    """Check a time or pace string parses; the parse is cached for the route."""
+    calcs.parse_str_time(value)
+    return value
+
+# time or pace formatted as h:mm:ss or mm:ss, optionally with fractional seconds
+StrTime = Annotated[str, AfterValidator(validate_str_time)]
+
+
+def validate_duration(value: str) -> str:
+    """Check a duration string parses, hours uncapped."""
+    calcs.parse_duration(value)
+    return value
+
+# StrTime of a stored workout, which may last a day or more (e.g. 30:15:00)
+StrDuration = Annotated[str, AfterValidator(validate_duration)]
 
 class WorkoutBase(BaseModel):
     """Base schema for Workout data.
@@ -9,19 +32,198 @@ class WorkoutBase(BaseModel):
         time: target duration
         distance: target distance
         notes: additional info on the workout
+        date: day the workout is scheduled for
+        athlete_id: athlete the workout belongs to
     """
     name: str = Field(..., min_length=1, max_length=100, description="Workout Name")
-    pace: str | None = Field(None, description="Target Pace")
-    distance: float | None = Field(None, description="Target Distance")
-    time: str | None = Field(None, description="Target Time")
+    pace: StrDuration | None = Field(None, description="Target Pace")
+    distance: float | None = Field(None, ge=0, lt=100000, description="Target Distance")
+    time: StrDuration | None = Field(None, description="Target Time")
     notes: str | None = Field(None, description="Additional notes on the workout")
+    date: dt.date | None = Field(None, description="Scheduled Date")
+    athlete_id: int | None = Field(None, description="Athlete")
 
 class WorkoutCreate(WorkoutBase):
     """Schema for creating a workout"""
 
+    def to_row(self) -> dict:
+        """Column values for `models.Workout`, with pace and time in whole seconds."""
+        row = self.model_dump()
+        for field in ("pace", "time"):
+            if row[field] is not None:
+                row[field] = int(calcs.parse_duration(row[field]).total_seconds())
+        return row
+
 class WorkoutResponse(WorkoutBase):
     """Schema for workout responses.
     Includes all base fields plus the id.
     """
     model_config = ConfigDict(from_attributes=True)
-    id: int
\ No newline at end of file
+    id: int
+
+    @field_validator("pace", "time", mode="before")
+    @classmethod
+    def format_seconds(cls, value):
+        # stored as whole seconds
+        if isinstance(value, int):
+            return calcs.format_time_delta(timedelta(seconds=value))
+        return value
+
+
+class WorkoutSearchPage(BaseModel):
+    """One page of workouts matching a search.
+
+    Attributes:
+        workouts: workouts on this page, in the requested order
+        next_offset: offset of the next page, None on the last page
+    """
+    workouts: list[WorkoutResponse]
+    next_offset: int | None = None
+
+
+class BulkImportError(BaseModel):
+    """A row rejected by a bulk import.
+
+    Attributes:
+        row: 1-based data row (the CSV header is not counted)
+        error: why the row was rejected
+    """
+    row: int
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    """Outcome of a bulk import.
+
+    Attributes:
+        created: number of workouts written
+        failed: number of rows rejected
+        errors: rejected rows, truncated to the first 1000
+    """
+    created: int
+    failed: int
+    errors: list[BulkImportError]
+
+
+class WorkoutPage(BaseModel):
+    """One page of workouts ordered by id.
+
+    Attributes:
+        workouts: workouts on this page
+        next_after_id: cursor for the next page, None on the last page
+    """
+    workouts: list[WorkoutResponse]
+    next_after_id: int | None = None
+
+class ActivitySummary(BaseModel):
+    """Track attached to a workout.
+
+    Attributes:
+        workout_id: workout the track belongs to
+        start_time: timestamp of the first point
+        points: number of trackpoints
+        duration: seconds from the first to the last point
+        distance: meters covered
+    """
+    workout_id: int
+    start_time: datetime | None = None
+    points: int
+    duration: float
+    distance: float
+
+class BatchVdotRequest(BaseModel):
+    """Columnar input for scoring many race results at once.
+
+    Attributes:
+        distance: race distance in meters, one per row
+        time: finish time (hh:mm:ss or mm:ss), one per row
+    """
+    distance: list[float] = Field(..., description="Race distances in meters")
+    time: list[StrTime] = Field(..., description="Finish times")
+
+    @model_validator(mode="after")
+    def validate_columns(self) -> "BatchVdotRequest":
+        if len(self.distance) != len(self.time):
+            raise ValueError("distance and time must have the same length")
+        if any(d <= 0 for d in self.distance):
+            raise ValueError("distance must be positive")
+        return self
+
+
+class BatchRacePaceRequest(BatchVdotRequest):
+    """Columnar input for converting many finish times into paces.
+
+    Attributes:
+        unit: pace units in km or mi
+    """
+    unit: Literal["mi", "km"] = Field("mi", description="Pace units")
+
+
+class BatchTrainingPacesRequest(BaseModel):
+    """Columnar input for deriving training paces from many VDOT values.
+
+    Attributes:
+        vdot: VDOT, one per row
+        unit: pace units in km or mi
+    """
+    vdot: list[float] = Field(..., description="VDOT values")
+    unit: Literal["mi", "km"] = Field("mi", description="Pace units")
+
+    @model_validator(mode="after")
+    def validate_vdot(self) -> "BatchTrainingPacesRequest":
+        if any(v <= 0 for v in self.vdot):
+            raise ValueError("vdot must be positive")
+        return self
+
+
+class BatchPacePercentageRequest(BaseModel):
+    """Columnar input for scaling many paces by a percentage.
+
+    Attributes:
+        pace: pace (mm:ss), one per row
+        percentage: percentage of pace or speed, one per row
+        method: calculation method
+    """
+    pace: list[StrTime] = Field(..., description="Paces")
+    percentage: list[int] = Field(..., description="Percentages")
+    method: Literal["pace", "speed"] = Field("pace", description="Calculation method")
+
+    @model_validator(mode="after")
+    def validate_columns(self) -> "BatchPacePercentageRequest":
+        if len(self.pace) != len(self.percentage):
+            raise ValueError("pace and percentage must have the same length")
+        if any(p <= 0 for p in self.percentage):
+            raise ValueError("percentage must be positive")
+        return self
+
+
+
+class PlanRequest(BaseModel):
+    """Inputs for a periodized training plan.
+
+    Attributes:
+        goal_race: goal race, one of calcs.DISTANCES
+        goal_time: goal finish time, used to derive the VDOT
+        vdot: current or goal VDOT, instead of goal_time
+        start_date: first day of the plan
+        weekly_volume: peak weekly volume in `unit`
+        weeks: plan length in weeks
+        unit: distance and pace units in km or mi
+        max_heart_rate: maximum heart rate, adds heart rate targets
+        athlete_id: athlete the saved workouts belong to
+    """
+    goal_race: Literal[tuple(calcs.DISTANCES)] = Field("Marathon", description="Goal race")
+    goal_time: StrTime | None = Field(None, description="Goal finish time")
+    vdot: float | None = Field(None, gt=0, description="VDOT")
+    start_date: date = Field(..., description="First day of the plan")
+    weekly_volume: float = Field(..., gt=0, description="Peak weekly volume")
+    weeks: int = Field(16, ge=12, le=18, description="Plan length in weeks")
+    unit: Literal["mi", "km"] = Field("mi", description="Distance and pace units")
+    max_heart_rate: int | None = Field(None, gt=0, description="Maximum heart rate")
+    athlete_id: int | None = Field(None, description="Athlete")
+
+    @model_validator(mode="after")
+    def validate_goal(self) -> "PlanRequest":
+        if (self.goal_time is None) == (self.vdot is None):
+            raise ValueError("provide exactly one of goal_time or vdot")
+        return self
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""Long run split tables computed as arrays.
+
+Split boundaries fall on every whole mile/km plus a final partial split for
+fractional distances. Target paces for all splits are derived in one pass
+from the band `calcs.pfitz_long_run_pace` uses, 20% to 10% slower than
+marathon pace, according to a pacing strategy:
+
+    progressive: slow to fast across the band, as `pfitz_long_run_pace`
+    even: the middle of the band for every split
+    negative: first half at the slow end, second half at the fast end
+"""
+from __future__ import annotations
+import math
+from datetime import timedelta
+from api import calcs, batch
+from api.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+STRATEGIES = ("progressive", "even", "negative")
+
+# seconds either side of the target pace
+PACE_TOLERANCE = 2
+
+
+def split_boundaries(distance: float) -> np.ndarray:
+    """Cumulative distance at the end of every split."""
+    return np.minimum(np.arange(1, int(np.ceil(distance)) + 1, dtype=np.float64), distance)
+
+
+def split_label(end: float) -> int | float:
+    """A split's end as shown: whole, else to 2 decimals, more if those would round it to 0."""
+    if end.is_integer():
+        return int(end)
+    return round(end, max(2, 1 - math.floor(math.log10(end))))
+
+
+def split_paces(distance: float, slow_pace: float, fast_pace: float,
+                strategy: str = "progressive") -> np.ndarray:
+    """Target pace (seconds) of every split between `slow_pace` and `fast_pace`."""
+    ends = split_boundaries(distance)
+    if strategy == "progressive":
+        # the same whole-second steps per mile/km as calcs.pfitz_long_run_pace,
+        # taken at the split's end so a final partial split only gets its fraction
+        step = (slow_pace - fast_pace) // distance
+        return slow_pace - step * ends
+    if strategy == "even":
+        return np.full(len(ends), (slow_pace + fast_pace) // 2)
+    if strategy == "negative":
+        starts = ends - np.diff(ends, prepend=0)
+        first_half = (starts + ends) / 2 <= distance / 2
+        return np.where(first_half, (3 * slow_pace + fast_pace) // 4, (slow_pace + 3 * fast_pace) // 4)
+    raise ValueError(f"unknown pacing strategy {strategy!r}")
+
+
+def long_run_paces(distance: float, marathon_pace: timedelta,
+                   strategy: str = "progressive") -> np.ndarray:
+    """Target pace (seconds) of every split of a long run, see `split_paces`."""
+    slow_pace = calcs.percentage_of_pace(marathon_pace, 0.8).total_seconds()
+    fast_pace = calcs.percentage_of_pace(marathon_pace, 0.9).total_seconds()
+    return split_paces(distance, slow_pace, fast_pace, strategy)
+
+
+def long_run_splits(distance: float, unit: str, marathon_pace: timedelta,
+                    strategy: str = "progressive", columnar: bool = False) -> list[dict] | dict:
+    """Split table for a long run at 10-20% slower than `marathon_pace`.
+
+    Rows look like `calcs.pfitz_long_run_pace`; for integer distances and the
+    progressive strategy they are identical. With `columnar`, the table is
+    returned as parallel lists instead of one dict per split.
+    """
+    ends = split_boundaries(distance)
+    paces = long_run_paces(distance, marathon_pace, strategy)
+    # a target pace within the tolerance of 0 (an absurdly fast marathon pace) starts the band at 0
+    lower = batch.format_seconds(np.maximum(paces - PACE_TOLERANCE, 0))
+    upper = batch.format_seconds(paces + PACE_TOLERANCE)
+    labels = [split_label(end) for end in ends.tolist()]
+    targets = [f"{low} to {high}" for low, high in zip(lower, upper)]
+    if columnar:
+        return {unit: labels, "Target Pace": targets}
+    return [{unit: label, "Target Pace": target} for label, target in zip(labels, targets)]
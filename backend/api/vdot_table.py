@@ -0,0 +1,53 @@
+"""Equivalent race performances for every distance in `calcs.DISTANCES`.
+
+The table holds the race time of each distance for VDOT values on a fixed
+grid and is built once, so a prediction is a row lookup plus a linear
+interpolation instead of a numerical solve.
+"""
+from __future__ import annotations
+from functools import cache
+from api import calcs, batch
+from api.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+VDOT_MIN = 20.0
+VDOT_MAX = 90.0
+VDOT_STEP = 0.1
+
+
+class VdotTable:
+    """Race times (seconds) indexed by VDOT grid row and distance column."""
+
+    def __init__(self, distances: dict[str, float] = calcs.DISTANCES,
+                 vdot_min: float = VDOT_MIN, vdot_max: float = VDOT_MAX,
+                 vdot_step: float = VDOT_STEP):
+        self.names = list(distances)
+        self.distances = np.array(list(distances.values()), dtype=np.float64)
+        self.vdot_min = vdot_min
+        self.vdot_step = vdot_step
+        rows = int(round((vdot_max - vdot_min) / vdot_step)) + 1
+        self.vdots = vdot_min + np.arange(rows) * vdot_step
+        self.times = batch.get_race_time(self.vdots[:, None], self.distances[None, :])
+
+    @property
+    def vdot_max(self) -> float:
+        return float(self.vdots[-1])
+
+    def race_times(self, vdot: float) -> dict[str, float]:
+        """Race time in seconds for every distance at `vdot`."""
+        if not self.vdot_min <= vdot <= self.vdot_max:
+            return {
+                name: calcs.get_race_time(vdot, d).total_seconds()
+                for name, d in zip(self.names, self.distances.tolist())
+            }
+        position = (vdot - self.vdot_min) / self.vdot_step
+        row = min(int(position), len(self.vdots) - 2)
+        frac = position - row
+        times = self.times[row] * (1 - frac) + self.times[row + 1] * frac
+        return dict(zip(self.names, times.tolist()))
+
+
+@cache
+def get_vdot_table() -> VdotTable:
+    return VdotTable()
@@ -0,0 +1,151 @@
+"""Write-behind buffer that coalesces single workout creates into batches.
+
+With `WORKOUT_WRITE_BUFFER` on, `create_workout` queues its row instead of
+running its own transaction. A background flusher takes rows off the
+queue and writes them with one multi-row INSERT ... RETURNING per batch,
+as soon as `WORKOUT_WRITE_BATCH_SIZE` rows are waiting or the oldest has
+waited `WORKOUT_WRITE_MAX_DELAY` seconds, and hands every caller back its
+own row with the id the database assigned. A burst of N creates then
+costs N / batch size transactions and a single pooled connection, at the
+price of up to the delay in added latency.
+
+A row the database rejects fails only its own caller: the batch is
+retried one row per savepoint, as bulk imports do. `close` (called from
+the app's lifespan on shutdown) flushes everything queued before it
+returns.
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+
+from api import rollups
+from api.core.cache import workout_cache
+from api.core import database
+from api.core.config import settings
+from api.core.logging import get_logger
+from api.models import Workout
+
+logger = get_logger(__name__)
+
+# a written row, or the error that kept it from being written
+Result = dict[str, Any] | Exception
+
+
+async def insert_workouts(rows: list[dict[str, Any]]) -> list[Result]:
+    """Insert workout rows in one transaction, returning each as stored."""
+    statement = insert(Workout).returning(*Workout.__table__.c, sort_by_parameter_order=True)
+    async with database.engine.connect() as connection:
+        try:
+            async with connection.begin_nested():
+                results = [row._asdict() for row in (await connection.execute(statement, rows)).all()]
+        except DBAPIError:
+            results = []
+            for values in rows:
+                try:
+                    async with connection.begin_nested():
+                        results.append((await connection.execute(statement, [values])).one()._asdict())
+                except DBAPIError as e:
+                    results.append(e)
+        written = [row for row in results if not isinstance(row, Exception)]
+        await rollups.apply_workouts(connection, written)
+        await connection.commit()
+    await workout_cache.invalidate(*(row["id"] for row in written))
+    return results
+
+
+class WriteBuffer:
+    """Queue of rows written `batch_size` at a time by a background task.
+
+    The flusher starts with the first `submit`; `close` drains the queue
+    and stops it, and a later `submit` starts a new one.
+    """
+
+    def __init__(self, write: Callable[[list[dict[str, Any]]], Awaitable[list[Result]]],
+                 batch_size: int = 100, max_delay: float = 0.05, max_queued: int = 10000):
+        self.write = write
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_queued = max_queued
+        self.batches = 0
+        self._queue: asyncio.Queue | None = None
+        self._flusher: asyncio.Task | None = None
+        self._closing = False
+
+    async def submit(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Queue a row and wait until its batch is committed.
+
+        Returns:
+            dict: the row as written, with its id
+        """
+        if self._closing:
+            raise RuntimeError("write buffer is closed")
+        if self._flusher is None:
+            self._queue = asyncio.Queue(self.max_queued)
+            self._flusher = asyncio.create_task(self._flush_loop())
+        written = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, written))
+        # a caller that goes away does not take its row out of the batch
+        result = await asyncio.shield(written)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _flush_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            results = await self.write([row for row, _ in batch])
+        except Exception as e:
+            logger.error("Failed to write a batch of %s workouts: %s", len(batch), e)
+            results = [e] * len(batch)
+        self.batches += 1
+        for (_, written), result in zip(batch, results):
+            if not written.done():
+                written.set_result(result)
+
+    async def close(self) -> None:
+        """Write everything queued so far and stop the flusher."""
+        if self._flusher is None:
+            return
+        self._closing = True
+        try:
+            await self._queue.put(None)
+            await self._flusher
+        finally:
+            self._queue = self._flusher = None
+            self._closing = False
+
+
+workout_writes = WriteBuffer(
+    insert_workouts,
+    batch_size=settings.WORKOUT_WRITE_BATCH_SIZE,
+    max_delay=settings.WORKOUT_WRITE_MAX_DELAY,
+    max_queued=settings.WORKOUT_WRITE_MAX_QUEUED,
+)
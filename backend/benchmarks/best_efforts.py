@@ -0,0 +1,67 @@
+"""Benchmark for `efforts.best_efforts` on synthetic multi-hour streams.
+
+Streams are sampled every second with a varying pace and short stops, and
+every race distance is searched. The array pass is compared with a plain
+Python two-pointer walk over the same points.
+
+    python -m benchmarks.best_efforts
+"""
+import time as timer
+import numpy as np
+from api import calcs, efforts
+
+HOURS = (1, 3, 6, 12, 24)
+
+
+def synthetic_stream(hours: float, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """(distance, time) at 1 Hz, pace wandering around 5:00/km with stops."""
+    rng = np.random.default_rng(seed)
+    points = int(hours * 3600)
+    speed = 1000 / 300 + np.cumsum(rng.normal(0, 0.02, points)).clip(-1.5, 1.5)
+    speed[rng.random(points) < 0.01] = 0.0
+    return np.concatenate(([0.0], np.cumsum(speed[1:]))), np.arange(points, dtype=np.float64)
+
+
+def two_pointer(distance: np.ndarray, time: np.ndarray, target: float) -> float | None:
+    # reference: the same search done one point at a time
+    distance, time = distance.tolist(), time.tolist()
+    best, start = None, 0
+    for end in range(len(distance)):
+        start_distance = distance[end] - target
+        if start_distance < distance[0]:
+            continue
+        while distance[start + 1] <= start_distance:
+            start += 1
+        span = distance[start + 1] - distance[start]
+        fraction = (start_distance - distance[start]) / span if span else 0.0
+        elapsed = time[end] - (time[start] + fraction * (time[start + 1] - time[start]))
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench(function, repeat: int = 5) -> float:
+    """Best wall time in milliseconds."""
+    runs = []
+    for _ in range(repeat):
+        start = timer.perf_counter()
+        function()
+        runs.append(timer.perf_counter() - start)
+    return min(runs) * 1e3
+
+
+def main() -> None:
+    print(f"{'hours':>5}{'points':>10}{'arrays':>12}{'loop':>12}")
+    for hours in HOURS:
+        distance, time = synthetic_stream(hours)
+        found = efforts.best_efforts(distance, time)
+        for name, effort in found.items():
+            expected = two_pointer(distance, time, calcs.DISTANCES[name])
+            assert abs(effort["time"] - expected) < 1e-6, name
+        arrays = bench(lambda: efforts.best_efforts(distance, time))
+        loop = bench(lambda: [two_pointer(distance, time, target)
+                              for target in calcs.DISTANCES.values()], repeat=1)
+        print(f"{hours:>5}{len(time):>10}{arrays:>10.1f}ms{loop:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Benchmark for `gap.gap_splits` on synthetic trail runs.
+
+Points are 2-4 m apart with rolling hills and a couple of meters of
+elevation noise, the density of a 1 Hz watch on a slow trail.
+
+    python -m benchmarks.gap
+"""
+import time as timer
+from datetime import timedelta
+import numpy as np
+from api import gap
+
+POINTS = (10_000, 100_000, 1_000_000)
+
+
+def synthetic_trail(points: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(distance, time, elevation) of a hilly run at 1 Hz."""
+    rng = np.random.default_rng(seed)
+    distance = np.cumsum(rng.uniform(2, 4, points))
+    elevation = 300 + 80 * np.sin(distance / 1500) + rng.normal(0, 2, points)
+    return distance, np.arange(points, dtype=np.float64), elevation
+
+
+def main(repeat: int = 5) -> None:
+    marathon_pace = timedelta(minutes=8)
+    for points in POINTS:
+        distance, time, elevation = synthetic_trail(points)
+        runs = []
+        for _ in range(repeat):
+            start = timer.perf_counter()
+            gap.gap_splits(distance, time, elevation, "mi", marathon_pace=marathon_pace)
+            runs.append(timer.perf_counter() - start)
+        print(f"{points:>10} points{min(runs) * 1e3:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
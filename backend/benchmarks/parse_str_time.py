@@ -0,0 +1,47 @@
+"""Microbenchmark for `calcs.parse_str_time`.
+
+Compares the previous strptime based parser with the hand-written parser,
+both uncached and through the memoization cache the routes hit.
+
+    python -m benchmarks.parse_str_time
+"""
+from datetime import datetime, date, timedelta
+import timeit
+from api import calcs
+
+INPUTS = ["20:00", "6:30", "3:24:35", "18:30", "1:25:07", "45:12", "5:05", "2:59:59"]
+
+
+def strptime_parse_str_time(str_time: str) -> timedelta:
+    # implementation replaced by calcs.parse_str_time
+    for f in ["%H:%M:%S", "%M:%S"]:
+        try:
+            dt = datetime.strptime(str_time, f)
+            td = datetime.combine(date.min, dt.time()) - datetime.min
+            return td
+        except ValueError:
+            continue
+    raise ValueError
+
+
+def bench(parse, number: int) -> float:
+    """Nanoseconds per parse, best of five runs."""
+    runs = timeit.repeat(lambda: [parse(s) for s in INPUTS], number=number, repeat=5)
+    return min(runs) / (number * len(INPUTS)) * 1e9
+
+
+def main(number: int = 20000) -> None:
+    for s in INPUTS:
+        assert strptime_parse_str_time(s) == calcs.parse_str_time(s)
+    baseline = bench(strptime_parse_str_time, number)
+    results = {
+        "strptime": baseline,
+        "hand-written": bench(calcs.parse_str_time.__wrapped__, number),
+        "hand-written, cached": bench(calcs.parse_str_time, number),
+    }
+    for name, ns in results.items():
+        print(f"{name:<22}{ns:>10.0f} ns/parse{baseline / ns:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
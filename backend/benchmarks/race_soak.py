@@ -0,0 +1,245 @@
+"""Soak test of the live race pacing WebSocket (`/race/live`).
+
+Starts the app with uvicorn in a subprocess, configured as `server.py` runs
+it (no per-message deflate), and opens `--connections` WebSockets at
+`--ramp` per second from `--processes` client processes. Every connection
+sends a progress update as soon as it is open and then every `--interval`
+seconds; once all of them are open and `--warmup` seconds have passed,
+`--duration` seconds are measured. Reported are the connections opened,
+refused and dropped, updates per second, the latency from sending an
+update to receiving its answer (p50/p95/p99/max) and the server's resident
+memory per open connection:
+
+    python -m benchmarks.race_soak
+    python -m benchmarks.race_soak --connections 30000 --interval 2 --output soak.json
+
+Every connection takes a file descriptor on each end and a source port.
+The open file limit is raised to the hard limit for the clients and the
+server, and connections beyond `PORTS_PER_ADDRESS` come from 127.0.0.2,
+127.0.0.3 and so on. Latency includes the clients' own scheduling, so if
+their processes saturate their CPUs first, add processes or machines.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed, InvalidHandshake
+
+from benchmarks.load import BACKEND_DIR, _free_port, _git_revision, _wait_until, summarize, throwaway_database
+
+# source ports used per loopback address, well inside the ephemeral range
+PORTS_PER_ADDRESS = 20000
+
+GOAL_TIME = "3:30:00"
+RACE_DISTANCE = 42195
+
+# race seconds that pass between two updates of a simulated runner
+RACE_SECONDS_PER_UPDATE = 30
+
+
+def raise_open_files_limit() -> int:
+    """Raise the soft limit on open files to the hard one, which is returned."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def resident_memory(pid: int) -> int:
+    """Resident set size of a process in bytes."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def cpu_seconds(pid: int) -> float:
+    """User and system CPU time a process has used."""
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rpartition(")")[2].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def _runner(uri: str, index: int, opens_at: float, measure_from: float, until: float,
+                  interval: float, samples: dict) -> None:
+    await asyncio.sleep(max(0.0, opens_at - time.time()))
+    local_addr = (f"127.0.0.{1 + index // PORTS_PER_ADDRESS}", 0)
+    try:
+        websocket = await connect(uri, compression=None, ping_interval=None, open_timeout=60,
+                                  local_addr=local_addr)
+    except (OSError, TimeoutError, InvalidHandshake):
+        samples["refused"] += 1
+        return
+    samples["opened"] += 1
+    rng = random.Random(index)
+    pace = rng.uniform(240, 420)  # seconds per km
+    elapsed = 0.0
+    async with websocket:
+        next_at = time.time()
+        while (now := time.time()) < until:
+            elapsed += RACE_SECONDS_PER_UPDATE
+            update = json.dumps({"elapsed": elapsed, "distance": elapsed / pace * 1000 * rng.uniform(0.98, 1.02)})
+            start = time.perf_counter()
+            try:
+                await websocket.send(update)
+                reply = await websocket.recv()
+            except ConnectionClosed:
+                samples["dropped"] += 1
+                return
+            latency = time.perf_counter() - start
+            if now >= measure_from:
+                samples["latencies"].append(latency)
+                samples["errors"] += '"error"' in reply
+            # keep to the schedule: a slow answer does not postpone the next update
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.time()))
+
+
+async def _clients(uri: str, indexes: range, start: float, ramp: float, measure_from: float,
+                   until: float, interval: float) -> dict:
+    samples = {"latencies": [], "errors": 0, "opened": 0, "refused": 0, "dropped": 0}
+    await asyncio.gather(*(
+        _runner(uri, i, start + i / ramp, measure_from, until, interval, samples) for i in indexes
+    ))
+    return samples
+
+
+def run_clients(*args) -> dict:
+    """Samples of one client process' share of the connections."""
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    return asyncio.run(_clients(*args))
+
+
+@contextmanager
+def pacing_server(database_url: str, env: dict[str, str], ws: str):
+    """Port and process of the app served by uvicorn in a subprocess."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log", "--backlog", "4096",
+         "--ws", ws, "--ws-per-message-deflate", "false"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "ENVIRONMENT": "LOCAL", **env, "DATABASE_URL": database_url},
+    )
+
+    def healthy() -> bool:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            return httpx.get(f"http://127.0.0.1:{port}/healthcheck").status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    try:
+        _wait_until(healthy, 60, "server")
+        yield port, server
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def soak(port: int, server_pid: int, connections: int, processes: int, ramp: float,
+         interval: float, warmup: float, duration: float) -> dict:
+    uri = f"ws://127.0.0.1:{port}/race/live?goal_time={GOAL_TIME}&distance={RACE_DISTANCE}&unit=km"
+    idle_memory = resident_memory(server_pid)
+    start = time.time() + 1
+    measure_from = start + connections / ramp + warmup
+    until = measure_from + duration
+    with ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(run_clients, uri, range(p, connections, processes), start, ramp,
+                               measure_from, until, interval)
+                   for p in range(processes)]
+        time.sleep(max(0.0, measure_from - time.time()))
+        open_memory = resident_memory(server_pid)
+        cpu_start = cpu_seconds(server_pid)
+        time.sleep(max(0.0, until - time.time()))
+        cpu = cpu_seconds(server_pid) - cpu_start
+        shares = [future.result() for future in futures]
+
+    opened = sum(share["opened"] for share in shares)
+    return {
+        "opened": opened,
+        "refused": sum(share["refused"] for share in shares),
+        "dropped": sum(share["dropped"] for share in shares),
+        "updates": summarize([latency for share in shares for latency in share["latencies"]],
+                             sum(share["errors"] for share in shares), duration),
+        "server_cpu": round(cpu / duration, 3),
+        "server_memory_idle": idle_memory,
+        "server_memory_open": open_memory,
+        "memory_per_connection": round((open_memory - idle_memory) / opened) if opened else None,
+    }
+
+
+def _print_results(results: dict) -> None:
+    updates = results["updates"]
+    print(f"connections  {results['opened']} opened, {results['refused']} refused, "
+          f"{results['dropped']} dropped")
+    print(f"updates      {updates['requests']} ({updates['throughput']:.1f}/s), {updates['errors']} errors")
+    if updates["requests"]:
+        print(f"latency      p50 {updates['p50']:.2f}ms  p95 {updates['p95']:.2f}ms  "
+              f"p99 {updates['p99']:.2f}ms  max {updates['max']:.2f}ms")
+    print(f"server CPU   {results['server_cpu'] * 100:.0f}% of a core while measuring")
+    per_connection = results["memory_per_connection"]
+    print(f"server RSS   {results['server_memory_idle'] / 2**20:.1f}MB idle, "
+          f"{results['server_memory_open'] / 2**20:.1f}MB open"
+          + (f" ({per_connection / 1024:.1f}KB per connection)" if per_connection is not None else ""))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=max(1, min(4, (os.cpu_count() or 2) - 1)),
+                        help="client processes")
+    parser.add_argument("--ramp", type=float, default=500, help="connections opened per second")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between a runner's updates")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds run after the ramp before measuring")
+    parser.add_argument("--duration", type=float, default=30, help="seconds measured")
+    parser.add_argument("--ws", default="auto", help="uvicorn WebSocket implementation")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="setting passed to the server, repeatable")
+    parser.add_argument("--output", type=Path, help="JSON file to write the results to")
+    args = parser.parse_args()
+
+    limit = raise_open_files_limit()
+    if args.connections > limit - 100:
+        print(f"warning: open file limit is {limit}, connections beyond it will be refused", file=sys.stderr)
+    env = {"RACE_PACING_MAX_CONNECTIONS": str(args.connections),
+           **dict(item.split("=", 1) for item in args.env)}
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "connections": args.connections,
+        "processes": args.processes,
+        "interval": args.interval,
+        "duration": args.duration,
+        "env": env,
+    }
+    with throwaway_database("sqlite") as database_url, \
+            pacing_server(database_url, env, args.ws) as (port, server):
+        results.update(soak(port, server.pid, args.connections, args.processes, args.ramp,
+                            args.interval, args.warmup, args.duration))
+
+    _print_results(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Cold-start cost of the app: imports per module and initialization phases.
+
+Every measurement runs in a fresh interpreter. The import report comes
+from `python -X importtime -c "import main"`: each module's own import
+time is added up per `api` module and per third-party package, so the
+rows sum to the whole import. The phases are timed in a second fresh
+process:
+
+    settings: importing and validating `api.core.config`
+    app: importing `main` (logging, migrations unless serverless, routes)
+    lifespan: the app's startup hook
+    first calculator request: GET /vdot
+    first database request: GET /get_workouts, which creates the engine
+    first docs request: GET /openapi.json
+
+Run it in serverless mode (the default here) or in the regular one:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --env SERVERLESS=false --output startup.json
+
+The database is migrated and the OpenAPI schema prebuilt first, as a
+serverless deploy would, into a temporary directory that the measured
+processes read them from. The database is a SQLite file there (needs
+aiosqlite) unless `--database-url` is given.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# rows shown in the import report
+TOP_MODULES = 25
+
+
+def import_costs(importtime: str) -> dict[str, float]:
+    """Milliseconds of import time per `api` module and per other top-level package."""
+    costs: dict[str, float] = defaultdict(float)
+    for line in importtime.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        module = match[4]
+        key = module if module == "main" or module.startswith("api.") else module.split(".")[0]
+        costs[key] += int(match[1]) / 1e3
+    return dict(sorted(costs.items(), key=lambda item: -item[1]))
+
+
+def _measure_phases() -> dict[str, float]:
+    # runs in the child process; milliseconds per phase
+    import asyncio
+
+    phases = {}
+    start = time.perf_counter()
+    import api.core.config  # noqa: F401
+    phases["settings"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from main import app
+    phases["app"] = time.perf_counter() - start
+
+    import httpx
+
+    async def requests() -> None:
+        transport = httpx.ASGITransport(app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            for phase, url in (("first calculator request", "/vdot"),
+                               ("first database request", "/get_workouts?limit=1"),
+                               ("first docs request", "/openapi.json")):
+                start = time.perf_counter()
+                (await client.get(url)).raise_for_status()
+                phases[phase] = time.perf_counter() - start
+
+    async def run() -> None:
+        async with app.router.lifespan_context(app):
+            phases["lifespan"] = time.perf_counter() - lifespan_start
+            await requests()
+
+    lifespan_start = time.perf_counter()
+    asyncio.run(run())
+    return {phase: round(seconds * 1e3, 2) for phase, seconds in phases.items()}
+
+
+def _run(args: list[str], env: dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def measure(env: dict[str, str]) -> dict:
+    """Import costs and phase timings of a cold start with `env`."""
+    importtime = _run(["-X", "importtime", "-c", "import main"], env).stderr
+    costs = import_costs(importtime)
+    phases = json.loads(_run(["-m", "benchmarks.startup", "--phases"], env).stdout.splitlines()[-1])
+    return {"imports": {name: round(ms, 2) for name, ms in costs.items()},
+            "import_total": round(sum(costs.values()), 2), "phases": phases}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="setting for the measured process, repeatable")
+    parser.add_argument("--database-url", help="database to use instead of a migrated SQLite file")
+    parser.add_argument("--output", type=Path, help="JSON file to write the report to")
+    parser.add_argument("--phases", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.phases:
+        print(json.dumps(_measure_phases()))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {**os.environ, "ENVIRONMENT": "LOCAL", "SERVERLESS": "true",
+               "DATABASE_URL": args.database_url or f"sqlite+aiosqlite:///{directory}/startup.db",
+               "OPENAPI_SCHEMA_PATH": f"{directory}/openapi.json",
+               **dict(item.split("=", 1) for item in args.env)}
+        _run(["-m", "api.core.migrations"], env)
+        _run(["-m", "api.core.openapi"], {**env, "SERVERLESS": "true"})
+        report = measure(env)
+
+    print(f"{'module':<40}{'import':>10}")
+    for name, ms in list(report["imports"].items())[:TOP_MODULES]:
+        print(f"{name:<40}{ms:>8.1f}ms")
+    print(f"{'total':<40}{report['import_total']:>8.1f}ms\n")
+    print(f"{'phase':<40}{'time':>10}")
+    for phase, ms in report["phases"].items():
+        print(f"{phase:<40}{ms:>8.1f}ms")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
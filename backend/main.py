@@ -3,26 +3,52 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from api import routers
-from api.core.logging import get_logger, setup_logging
+from api.vdot_table import get_vdot_table
+from api.core.logging import RequestLogMiddleware, get_logger, setup_logging
 from api.core.config import app_configs, settings
-from api.core.migrations import run_migrations
+from api.core import metrics
+from api.core.metrics import MetricsMiddleware
+from api.core.openapi import use_prebuilt_schema
+from api.core import profiling
+from api.core.profiling import ProfilerMiddleware
+from api.write_buffer import workout_writes
 
 setup_logging()
 logger = get_logger(__name__)
-run_migrations()
+if not settings.SERVERLESS:
+    # imported here so a serverless cold start never loads alembic
+    from api.core.migrations import run_migrations
 
-app = FastAPI(title="Marathon Training Planner",
-              docs_url="/docs",
-              redoc_url="/")
-
-app.include_router(routers.router)
+    run_migrations()
 
 @asynccontextmanager
 async def lifespan(_application: FastAPI) -> AsyncGenerator:
     # Startup
+    if not settings.SERVERLESS:
+        get_vdot_table()
     yield
     # Shutdown
+    await workout_writes.close()
 
+app = FastAPI(title="Marathon Training Planner",
+              docs_url="/docs",
+              redoc_url="/",
+              lifespan=lifespan)
+if settings.SERVERLESS:
+    use_prebuilt_schema(app)
+
+# before routers.router, whose /{workout_id} would otherwise match them
+@app.get("/healthcheck", include_in_schema=False)
+async def healthcheck() -> dict[str, str]:
+    return {"status": "ok"}
+
+app.include_router(metrics.router)
+app.include_router(profiling.router)
+app.include_router(routers.router)
+
+# innermost, so profiled stacks start at the app
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -31,7 +57,5 @@ app.add_middleware(
     allow_methods=("GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"),
     allow_headers=settings.CORS_HEADERS,
 )
-
-@app.get("/healthcheck", include_in_schema=False)
-async def healthcheck() -> dict[str, str]:
-    return {"status": "ok"}
\ No newline at end of file
+# outermost, so the request id covers everything logged for the request
+app.add_middleware(RequestLogMiddleware)
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""Pre-fork production server.
+
+    python server.py --port 8000 --workers 4
+
+The parent process validates the settings and imports `main` once, which
+sets up logging, runs the migrations and builds the app. It then fills the
+pure-calculation tables, binds the listening socket and forks the workers.
+Workers inherit all of that copy-on-write and accept connections on the
+shared socket, each running its own uvicorn event loop. Every forked
+child replaces the database engine's pool (see `api.core.database`), so
+pooled connections are never shared between processes.
+
+Signals to the parent:
+
+    TERM, INT: workers stop accepting and get `SERVER_GRACEFUL_TIMEOUT`
+        seconds to finish their requests, then the parent exits
+    HUP: graceful reload. The parent re-executes itself on the same
+        socket, so new code and settings are loaded and migrated once.
+        The old workers drain only after the new ones are serving.
+
+A worker that exits unexpectedly is replaced.
+
+The workout cache is only shared between workers through a cache server
+(`WORKOUT_CACHE_URL`). Without one, each worker's in-process cache would
+be invalidated only by the writes that worker handles, so with more than
+one worker the workout cache is turned off.
+"""
+import argparse
+import os
+import resource
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+# importing the settings validates them, before any other work is done
+from api.core.config import settings
+from api.core.cache import NullBackend, workout_cache
+from api.core.logging import get_logger, stop_logging
+
+logger = get_logger(__name__)
+
+# environment a reloading parent hands its successor the socket and old workers in
+LISTEN_FD_ENV = "SERVER_LISTEN_FD"
+RETIRING_ENV = "SERVER_RETIRING_PIDS"
+
+# seconds new workers get to start before a reload gives up waiting for them
+STARTUP_TIMEOUT = 60
+
+
+def default_workers() -> int:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def raise_open_files_limit() -> None:
+    """Raise the soft limit on open files to the hard one; every WebSocket holds a descriptor."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def configure_workout_cache(workers: int) -> None:
+    """Turn the workout cache off when several workers would each keep their own."""
+    if workers > 1 and settings.WORKOUT_CACHE_URL is None:
+        logger.warning("WORKOUT_CACHE_URL is not set, turning the workout cache off for %s workers", workers)
+        workout_cache.backend = NullBackend()
+
+
+def listen(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """The listening socket, inherited from a reloading parent or newly bound."""
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd is not None:
+        sock = socket.socket(fileno=int(fd))
+    else:
+        sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def warm_up() -> None:
+    """Build the tables the calculators read, so workers inherit them instead of each building its own."""
+    from api.vdot_table import get_vdot_table
+
+    get_vdot_table()
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that reports on a pipe once it is accepting connections."""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        await super().startup(sockets)
+        if self.started:
+            os.write(self.ready_fd, b".")
+
+
+class Arbiter:
+    """Forks the workers, replaces the ones that die and handles the signals."""
+
+    def __init__(self, app, sock: socket.socket, workers: int, graceful_timeout: int):
+        self.app = app
+        self.sock = sock
+        self.size = workers
+        self.graceful_timeout = graceful_timeout
+        self.workers: set[int] = set()
+        self.retiring = {int(pid) for pid in os.environ.pop(RETIRING_ENV, "").split(",") if pid}
+        self.ready_read, self.ready_write = os.pipe()
+        os.set_blocking(self.ready_read, False)
+        self.signal: int | None = None
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.workers.add(pid)
+
+    def _run_worker(self) -> None:
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        os.close(self.ready_read)
+        # per-message deflate keeps tens of kilobytes of zlib state per WebSocket
+        # for messages of a few dozen bytes (see api.pacing)
+        config = uvicorn.Config(self.app, log_config=None, access_log=False, proxy_headers=True,
+                                ws_per_message_deflate=False,
+                                timeout_graceful_shutdown=self.graceful_timeout)
+        status = 0
+        try:
+            WorkerServer(config, self.ready_write).run(sockets=[self.sock])
+        except BaseException:
+            logger.exception("Worker %s failed", os.getpid())
+            status = 1
+        finally:
+            # os._exit skips atexit, which would write out the queued log records
+            stop_logging()
+            os._exit(status)
+
+    def _wait_ready(self, count: int) -> bool:
+        ready = 0
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while ready < count and time.monotonic() < deadline:
+            try:
+                ready += len(os.read(self.ready_read, count - ready))
+            except BlockingIOError:
+                self._reap()
+                time.sleep(0.05)
+        return ready >= count
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+            elif pid in self.workers:
+                self.workers.discard(pid)
+                if self.signal is None:
+                    logger.warning("Worker %s exited with status %s, starting a new one",
+                                   pid, os.waitstatus_to_exitcode(status))
+
+    def _handle(self, signum: int, _frame) -> None:
+        self.signal = signum
+
+    def _stop(self, pids: set[int], timeout: float) -> None:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        while (self.workers | self.retiring) & pids and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in (self.workers | self.retiring) & pids:
+            logger.warning("Worker %s did not stop in time, killing it", pid)
+            os.kill(pid, signal.SIGKILL)
+        self._reap()
+
+    def _reload(self) -> None:
+        logger.info("Reloading")
+        os.environ[LISTEN_FD_ENV] = str(self.sock.fileno())
+        os.environ[RETIRING_ENV] = ",".join(str(pid) for pid in self.workers | self.retiring)
+        # same pid, so the running workers stay this process' children
+        os.execv(sys.executable, [sys.executable, *sys.orig_argv[1:]])
+
+    def run(self) -> None:
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._handle)
+        for _ in range(self.size):
+            self.spawn()
+        if not self._wait_ready(self.size):
+            logger.error("Workers did not start in time")
+        elif self.retiring:
+            logger.info("Retiring %s workers of the previous generation", len(self.retiring))
+            self._stop(set(self.retiring), self.graceful_timeout + 5)
+        logger.info("Serving with %s workers", self.size)
+
+        while True:
+            if self.signal == signal.SIGHUP:
+                self._reload()
+            if self.signal is not None:
+                logger.info("Shutting down")
+                self._stop(self.workers | self.retiring, self.graceful_timeout + 5)
+                return
+            self._reap()
+            for _ in range(self.size - len(self.workers)):
+                self.spawn()
+            time.sleep(0.5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, help="worker processes (default: SERVER_WORKERS or CPU count)")
+    args = parser.parse_args()
+
+    # logging and migrations, once for every worker
+    from main import app
+
+    warm_up()
+    raise_open_files_limit()
+    workers = args.workers or settings.SERVER_WORKERS or default_workers()
+    configure_workout_cache(workers)
+    sock = listen(args.host, args.port)
+    Arbiter(app, sock, workers, settings.SERVER_GRACEFUL_TIMEOUT).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import pytest
+from api import activities
+
+DATA = Path(__file__).parent / "data"
+
+def test_parse_gpx():
+    track = activities.parse_track_file(DATA / "sample.gpx")
+    assert track.points == 12
+    assert track.start_time.isoformat() == "2026-10-04T07:00:00+00:00"
+    assert track.time.tolist() == [10.0 * i for i in range(12)]
+    # 0.0003 degrees of latitude per point is about 33.4 m
+    np.testing.assert_allclose(np.diff(track.distance), 33.36, atol=0.01)
+    assert track.heart_rate.tolist() == [140.0 + i for i in range(12)]
+    assert track.elevation[-1] == pytest.approx(15.5)
+
+def test_parse_tcx_uses_recorded_distance():
+    track = activities.parse_track_file(DATA / "sample.tcx")
+    assert track.points == 12
+    assert track.distance.tolist() == [30.0 * i for i in range(12)]
+    assert track.heart_rate[0] == 140.0
+
+def test_chunk_size_does_not_change_result():
+    whole = activities.parse_track_file(DATA / "sample.gpx")
+    tiny = activities.parse_track_file(DATA / "sample.gpx", chunk_size=7)
+    for name in activities.STREAM_DTYPES:
+        np.testing.assert_array_equal(getattr(whole, name), getattr(tiny, name))
+
+def test_parse_track_async():
+    async def chunks():
+        data = (DATA / "sample.tcx").read_bytes()
+        for i in range(0, len(data), 100):
+            yield data[i:i + 100]
+    track = asyncio.run(activities.parse_track(chunks()))
+    assert track.summary()["distance"] == 330.0
+
+def test_columns_round_trip():
+    track = activities.parse_track_file(DATA / "sample.gpx")
+    columns = track.to_columns()
+    assert len(columns["heart_rate"]) == 4 * track.points
+    restored = activities.Track.from_columns(columns)
+    for name in activities.STREAM_DTYPES:
+        np.testing.assert_array_equal(getattr(restored, name), getattr(track, name))
+
+def test_missing_readings_are_nan():
+    data = (b'<gpx><trk><trkseg>'
+            b'<trkpt lat="1" lon="1"><time>2026-01-01T00:00:00Z</time></trkpt>'
+            b'<trkpt><ele>5</ele></trkpt>'
+            b'<trkpt lat="1" lon="1.001"><time>2026-01-01T00:00:05Z</time><ele>5</ele></trkpt>'
+            b'</trkseg></trk></gpx>')
+    track = activities.parse_track_chunks([data])
+    assert track.points == 2  # the point without a timestamp is skipped
+    assert np.isnan(track.heart_rate).all()
+    assert np.isnan(track.elevation[0]) and track.elevation[1] == 5.0
+
+@pytest.mark.parametrize("data", [b"<gpx><trk>", b"<gpx></gpx>", b"not xml"])
+def test_invalid_documents(data):
+    with pytest.raises(ValueError):
+        activities.parse_track_chunks([data])
+
+def _synthetic_gpx(points: int):
+    yield b'<gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>'
+    for start in range(0, points, 1000):
+        yield "".join(
+            f'<trkpt lat="{40 + i * 1e-5:.6f}" lon="-73.9"><ele>{i % 50}</ele>'
+            f'<time>2026-10-04T{i // 3600:02}:{i // 60 % 60:02}:{i % 60:02}Z</time></trkpt>'
+            for i in range(start, min(start + 1000, points))
+        ).encode()
+    yield b"</trkseg></trk></gpx>"
+
+def test_memory_grows_with_points_not_xml():
+    tracemalloc.start()
+    try:
+        track = activities.parse_track_chunks(_synthetic_gpx(50_000))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert track.points == 50_000
+    # ~100 bytes of XML per point; the arrays need 40 bytes per point
+    assert peak < 100 * 50_000
@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from api import analytics, calcs, routers
+from api.activities import Track
+from api.models import ActivityStream, Workout
+
+def _track(start: datetime, heart_rate, speed: float = 10 / 3, points: int = 601) -> Track:
+    time = np.arange(points, dtype=np.float64)
+    return Track(start, time, time * speed,
+                 np.broadcast_to(np.asarray(heart_rate, dtype=np.float32), points).copy(),
+                 np.zeros(points, dtype=np.float32))
+
+def test_rolling_mean_is_time_based_and_skips_nan():
+    time = np.array([0.0, 1.0, 2.0, 10.0])
+    values = np.array([1.0, np.nan, 3.0, 5.0])
+    np.testing.assert_allclose(analytics.rolling_mean(values, time, 5), [1.0, 1.0, 2.0, 5.0])
+
+def test_heart_rate_zones():
+    zones = calcs.heart_rate_zones(200)  # zone 2 starts at 130, zone 3 at 166
+    track = _track(datetime(2026, 1, 5, tzinfo=timezone.utc),
+                   np.r_[np.full(301, 140.0), np.full(300, 170.0)])
+    seconds = analytics.heart_rate_zones(track, 200)
+    assert zones[2][0] <= 140 < zones[3][0] <= 170 < zones[4][0]
+    assert seconds == {0: 0.0, 1: 0.0, 2: 300.0, 3: 300.0, 4: 0.0, 5: 0.0}
+
+def test_pauses_are_not_counted():
+    track = _track(None, 140.0, points=3)
+    track.time = np.array([0.0, 1.0, 1 + analytics.MAX_GAP + 1])
+    assert sum(analytics.heart_rate_zones(track, 200).values()) == 1.0
+
+def test_pace_bands():
+    # marathon pace for VDOT 50, between the Marathon and Threshold speeds
+    edges = analytics.pace_band_edges(50)
+    speed = (edges[2] + edges[3]) / 2
+    track = _track(None, np.nan, speed=speed)
+    bands = analytics.pace_bands(track, 50)
+    assert bands["Marathon"] == pytest.approx(600)
+    assert sum(bands.values()) == pytest.approx(600)
+
+def test_cardiac_drift():
+    steady = _track(None, 150.0)
+    assert analytics.cardiac_drift(steady) == pytest.approx(0)
+    drifting = _track(None, np.linspace(140, 160, 601))
+    assert analytics.cardiac_drift(drifting) > 0
+    assert analytics.cardiac_drift(_track(None, np.nan)) is None
+
+def test_rollup_matches_per_track():
+    tracks = [
+        _track(datetime(2026, 1, 5, 7, tzinfo=timezone.utc), 140.0),
+        _track(datetime(2026, 1, 11, 7, tzinfo=timezone.utc), 170.0),
+        _track(datetime(2026, 1, 12, 7, tzinfo=timezone.utc), 150.0),
+    ]
+    weeks = analytics.rollup(tracks, "week", max_heart_rate=200, vdot=50)
+    assert [str(week["period_start"]) for week in weeks] == ["2026-01-05", "2026-01-12"]
+    assert weeks[0]["activities"] == 2
+    assert weeks[0]["distance"] == pytest.approx(4000)
+    assert weeks[0]["moving_time"] == 1200
+    first, second = (analytics.heart_rate_zones(t, 200) for t in tracks[:2])
+    assert weeks[0]["heart_rate_zones"] == {z: first[z] + second[z] for z in first}
+    assert weeks[1]["pace_bands"] == analytics.pace_bands(tracks[2], 50)
+    assert len(analytics.rollup(tracks, "month")) == 1
+
+def test_rollup_adds_tracks_one_at_a_time():
+    tracks = (_track(datetime(2026, 1, day, 7, tzinfo=timezone.utc), 150.0) for day in (5, 6, 20))
+    totals = analytics.Rollup("week", max_heart_rate=200)
+    totals.add(_track(None, 150.0))
+    for track in tracks:
+        totals.add(track)
+    assert [week["activities"] for week in totals.rows()] == [2, 1]
+    assert len(totals.totals) == 2
+    with pytest.raises(ValueError):
+        analytics.Rollup("year")
+
+def test_rollup_route_streams_tracks(sqlite_database):
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+    async def seed():
+        async with sqlite_database.begin() as connection:
+            for workout_id in (1, 2):
+                await connection.execute(insert(Workout).values(id=workout_id, name="Easy"))
+                await connection.execute(insert(ActivityStream).values(
+                    workout_id=workout_id, **_track(start, 150.0).to_columns()))
+
+    asyncio.run(seed())
+    app = FastAPI()
+    app.include_router(routers.router)
+    response = TestClient(app).get("/analytics/rollup", params={"period": "month", "max_heart_rate": 200})
+    assert response.status_code == 200
+    (month,) = response.json()["rollup"]
+    assert month["activities"] == 2
+    assert month["moving_time"] == 1200
+    assert sum(month["heart_rate_zones"].values()) == 1200
@@ -0,0 +1,33 @@
+from api import batch, calcs
+from datetime import timedelta
+import numpy as np
+
+def test_format_seconds():
+    assert batch.format_seconds(np.array([3700, 71])) == ['1:01:40', '1:11']
+
+def test_batch_vdot_matches_scalar():
+    times = np.arange(600, 3 * 3600, 7)
+    distances = np.resize([800, 5000, 21097.5, 42195], len(times))
+    vdots = batch.get_vdot(distances, times)
+    for d, t, v in zip(distances, times, vdots):
+        assert v == calcs.get_vdot(d, timedelta(seconds=int(t)))
+
+def test_batch_race_pace_matches_scalar():
+    times = np.arange(600, 3 * 3600, 7)
+    paces = batch.race_pace(times, 10000, "mi")
+    for t, p in zip(times, paces):
+        pace = calcs.convert_to_mi_pace(calcs.get_pace(timedelta(seconds=int(t)), 10))
+        assert p == int(pace.total_seconds())
+
+def test_batch_percentage_of_pace_matches_scalar():
+    paces = np.arange(180, 900)
+    assert batch.percentage_of_pace(paces, 0.95).tolist() == [
+        calcs.percentage_of_pace(timedelta(seconds=int(p)), 0.95).total_seconds() for p in paces
+    ]
+    assert batch.percentage_of_speed(paces, 0.95).tolist() == [
+        calcs.percentage_of_speed(timedelta(seconds=int(p)), 0.95).total_seconds() for p in paces
+    ]
+
+def test_batch_training_paces():
+    paces = batch.get_training_paces([54.6, 54.6], "km")
+    assert batch.format_seconds(paces["Easy (lower)"]) == ["5:11", "5:11"]
@@ -0,0 +1,145 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api import routers
+from api.core.cache import LRUCache, MemoryBackend, NullBackend, ReadThroughCache, response_cache
+
+app = FastAPI()
+app.include_router(routers.router)
+client = TestClient(app)
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 2}
+
+def test_cached_route_normalizes_defaults():
+    response_cache.clear()
+    first = client.get("/vdot", params={"distance": 5000, "time": "20:00"})
+    second = client.get("/vdot")
+    assert first.json() == second.json()
+    assert first.headers["etag"] == second.headers["etag"]
+    assert len(response_cache) == 1
+
+def test_cached_route_not_modified():
+    response = client.get("/race_pace", params={"finish_time": "18:30"})
+    assert "max-age" in response.headers["cache-control"]
+    not_modified = client.get("/race_pace", params={"finish_time": "18:30"},
+                              headers={"If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+def test_cached_route_skips_errors():
+    response_cache.clear()
+    assert client.get("/vdot", params={"time": "bad"}).status_code == 422
+    assert len(response_cache) == 0
+
+class FakeRedis:
+    """The `CacheBackend` subset of redis.asyncio.Redis, in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+def _loader(value, calls, delay=0.0):
+    async def load():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return load
+
+def test_read_through_cache_loads_once():
+    redis = FakeRedis()
+    cache = ReadThroughCache(redis, prefix="workout", ttl=60)
+    calls = []
+
+    async def run():
+        assert await cache.get(1, _loader(b"one", calls)) == b"one"
+        assert await cache.get(1, _loader(b"other", calls)) == b"one"
+    asyncio.run(run())
+    assert calls == [b"one"]
+    assert redis.data == {"workout:1": b"one"}
+    assert redis.expiry == {"workout:1": 60}
+    assert cache.stats() == {"hits": 1, "misses": 1, "loads": 1}
+
+def test_read_through_cache_coalesces_concurrent_misses():
+    cache = ReadThroughCache(FakeRedis(), prefix="workout")
+    calls = []
+
+    async def run():
+        return await asyncio.gather(*(cache.get(1, _loader(b"one", calls, 0.01)) for _ in range(10)))
+    assert asyncio.run(run()) == [b"one"] * 10
+    assert calls == [b"one"]
+
+def test_read_through_cache_skips_missing():
+    cache = ReadThroughCache(MemoryBackend(), prefix="workout")
+    calls = []
+
+    async def run():
+        assert await cache.get(1, _loader(None, calls)) is None
+        assert await cache.get(1, _loader(None, calls)) is None
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert len(cache.backend) == 0
+
+def test_read_through_cache_without_storage_always_loads():
+    cache = ReadThroughCache(NullBackend(), prefix="workout")
+    calls = []
+
+    async def run():
+        assert await cache.get(1, _loader(b"one", calls)) == b"one"
+        assert await cache.get(1, _loader(b"two", calls)) == b"two"
+    asyncio.run(run())
+    assert calls == [b"one", b"two"]
+
+def test_read_through_cache_invalidate():
+    redis = FakeRedis()
+    cache = ReadThroughCache(redis, prefix="workout")
+    calls = []
+
+    async def run():
+        await cache.get(1, _loader(b"old", calls))
+        await cache.invalidate(1)
+        assert redis.data == {}
+        assert await cache.get(1, _loader(b"new", calls)) == b"new"
+    asyncio.run(run())
+    assert calls == [b"old", b"new"]
+
+def test_read_through_cache_drops_load_raced_by_invalidate():
+    redis = FakeRedis()
+    cache = ReadThroughCache(redis, prefix="workout")
+
+    async def run():
+        calls = []
+        stale = asyncio.ensure_future(cache.get(1, _loader(b"old", calls, 0.05)))
+        while not calls:
+            await asyncio.sleep(0)
+        await cache.invalidate(1)
+        assert await stale == b"old"
+        assert redis.data == {}
+        assert await cache.get(1, _loader(b"new", [])) == b"new"
+    asyncio.run(run())
+
+def test_memory_backend_expiry():
+    backend = MemoryBackend()
+
+    async def run():
+        await backend.set("a", b"1", ex=-1)
+        await backend.set("b", b"2")
+        return await backend.get("a"), await backend.get("b"), await backend.delete("a", "b")
+    assert asyncio.run(run()) == (None, b"2", 1)
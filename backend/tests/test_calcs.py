@@ -1,3 +1,4 @@
+import pytest
 from api import calcs
 from datetime import timedelta
 def test_convert_seconds_to_hours_minutes_seconds():
@@ -13,6 +14,22 @@ def test_parse_hhmmss_into_seconds():
     seconds= calcs.parse_str_time('3:24:35').total_seconds()
     assert seconds == 3*3600+24*60 + 35
 
+def test_parse_fractional_seconds():
+    seconds = calcs.parse_str_time('5:30.25').total_seconds()
+    assert seconds == 5*60 + 30.25
+
+def test_parse_invalid_time():
+    for str_time in ['', '90', '1:60', '24:00:00', '1:2:3:4', '5:30.', 'a:00']:
+        with pytest.raises(ValueError):
+            calcs.parse_str_time(str_time)
+
+def test_parse_duration_uncaps_hours():
+    assert calcs.parse_duration('30:15:00').total_seconds() == 30*3600 + 15*60
+    assert calcs.parse_duration('120:00:00').total_seconds() == 120*3600
+    for str_time in ['', ':00:00', '30:60:00', '30:00:60', '-1:00:00']:
+        with pytest.raises(ValueError):
+            calcs.parse_duration(str_time)
+
 def test_percentage_of_speed():
     p = calcs.percentage_of_speed(timedelta(seconds=600), 0.95)
     assert p.total_seconds() == 632
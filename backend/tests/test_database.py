@@ -0,0 +1,61 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+from sqlalchemy import func, insert, select
+from api.core import database
+from api.models import Workout
+
+def test_engine_created_on_first_use():
+    code = ("from api.core import database; assert database._engine is None; "
+            "import main; assert database._engine is None; "
+            "assert database.engine is database.get_engine() is database._engine")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parents[1],
+                   env={"DATABASE_URL": database.DATABASE_URL, "ENVIRONMENT": "TESTING",
+                        "SERVERLESS": "true", "PATH": ""})
+
+async def _workout_count() -> int:
+    return (await database.fetch_one(select(func.count().label("count")).select_from(Workout)))["count"]
+
+def test_unit_of_work_shares_one_connection(sqlite_database):
+    async def run():
+        unit_of_work = database.UnitOfWork()
+        connection = await unit_of_work.connection()
+        assert (await unit_of_work.session()).bind is connection
+        assert await unit_of_work.connection() is connection
+        await unit_of_work.close()
+        assert connection.closed
+
+    asyncio.run(run())
+
+def test_unit_of_work_commits_session_after_helper_query(sqlite_database):
+    async def run():
+        unit_of_work = database.UnitOfWork()
+        # autobegins the connection's transaction, which the session then joins
+        await unit_of_work.fetch_one(select(func.count()).select_from(Workout))
+        (await unit_of_work.session()).add(Workout(name="Tempo"))
+        await unit_of_work.commit()
+        await unit_of_work.close()
+        return await _workout_count()
+
+    assert asyncio.run(run()) == 1
+
+def test_unit_of_work_commits_helper_writes(sqlite_database):
+    async def run():
+        unit_of_work = database.UnitOfWork()
+        await unit_of_work.execute(insert(Workout).values(name="Easy"))
+        await unit_of_work.commit()
+        await unit_of_work.close()
+        return await _workout_count()
+
+    assert asyncio.run(run()) == 1
+
+def test_unit_of_work_rolls_back_uncommitted(sqlite_database):
+    async def run():
+        unit_of_work = database.UnitOfWork()
+        (await unit_of_work.session()).add(Workout(name="Tempo"))
+        await unit_of_work.execute(insert(Workout).values(name="Easy"))
+        await unit_of_work.close()
+        return await _workout_count()
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from api import calcs, efforts
+from datetime import timedelta
+
+def _brute_force(distance, time, target):
+    best = None
+    for end in range(len(distance)):
+        for start in range(end - 1, -1, -1):
+            if distance[end] - distance[start] >= target:
+                span = distance[start + 1] - distance[start]
+                fraction = (distance[end] - target - distance[start]) / span if span else 0
+                elapsed = time[end] - (time[start] + fraction * (time[start + 1] - time[start]))
+                best = elapsed if best is None else min(best, elapsed)
+                break
+    return best
+
+def test_best_effort_matches_brute_force():
+    rng = np.random.default_rng(7)
+    time = np.cumsum(rng.uniform(0.5, 2.0, 600))
+    distance = np.cumsum(rng.uniform(0.0, 8.0, 600))  # includes stops
+    for target in (100, 800, 1600):
+        effort = efforts.best_effort(distance, time, target)
+        assert effort["time"] == pytest.approx(_brute_force(distance, time, target))
+        assert effort["end"] - effort["start"] == pytest.approx(effort["time"])
+
+def test_best_effort_interpolates_exact_distance():
+    time = np.arange(0, 11, dtype=float)
+    distance = time * 4.0  # 4 m/s
+    assert efforts.best_effort(distance, time, 10)["time"] == pytest.approx(2.5)
+
+def test_best_effort_too_short():
+    assert efforts.best_effort(np.array([0.0, 500.0]), np.array([0.0, 100.0]), 800) is None
+
+def test_best_efforts_vdot():
+    time = np.arange(0, 3001, dtype=float)
+    distance = time * 5000 / 1200  # 20:00 5K pace throughout
+    best = efforts.best_efforts(distance, time)
+    assert set(best) == {"800M", "1600M", "5K", "10K"}
+    assert best["5K"]["time"] == pytest.approx(1200)
+    assert best["5K"]["vdot"] == calcs.get_vdot(5000, timedelta(minutes=20))
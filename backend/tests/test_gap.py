@@ -0,0 +1,46 @@
+from datetime import timedelta
+import numpy as np
+import pytest
+from api import gap, splits
+
+def test_cost_factor():
+    assert gap.cost_factor(np.array([0.0]))[0] == 1.0
+    uphill, downhill = gap.cost_factor(np.array([0.05, -0.05]))
+    assert uphill > 1 > downhill
+    assert gap.cost_factor(np.array([1.0]))[0] == gap.cost_factor(np.array([gap.MAX_GRADE]))[0]
+
+def test_elevation_profile_fills_gaps_and_averages():
+    distance = np.arange(0, 50, 10, dtype=np.float64)
+    elevation = np.array([0.0, np.nan, 20.0, 30.0, 40.0])
+    grid, smoothed = gap.elevation_profile(distance, elevation, 0)
+    np.testing.assert_allclose(smoothed, [0, 10, 20, 30, 40])
+    grid, smoothed = gap.elevation_profile(distance, elevation, 20)
+    assert grid[1] - grid[0] == 20 / gap.GRID_STEPS and grid[-1] == 40
+    # a straight slope stays straight away from the ends
+    np.testing.assert_allclose(smoothed[10:-10], grid[10:-10])
+    assert not gap.elevation_profile(distance, np.full(5, np.nan))[1].any()
+
+def test_flat_track_gap_equals_pace():
+    distance = np.linspace(0, 5000, 5001)
+    time = distance * 0.3  # 5:00/km
+    rows = gap.gap_splits(distance, time, np.full(5001, 10.0), unit="km")
+    assert [row["km"] for row in rows] == [1, 2, 3, 4, 5]
+    assert {row["Pace"] for row in rows} == {row["Grade Adjusted Pace"] for row in rows} == {"5:00"}
+
+def test_uphill_gap_is_faster_than_pace():
+    distance = np.linspace(0, 2000, 2001)
+    time = distance * 0.3
+    elevation = np.where(distance < 1000, distance * 0.05, 50.0)
+    rows = gap.gap_splits(distance, time, elevation, unit="km", window=0)
+    assert rows[0]["Grade"] == 5.0 and rows[1]["Grade"] == 0.0
+    assert rows[0]["Grade Adjusted Pace"] < rows[0]["Pace"] == "5:00"
+    assert rows[1]["Grade Adjusted Pace"] == "5:00"
+
+def test_targets_match_long_run_splits():
+    marathon_pace = timedelta(minutes=8)
+    distance = np.linspace(0, 10 * 1609.344, 10001)
+    time = distance / 1609.344 * 572  # 9:32/mi, the first split's target
+    rows = gap.gap_splits(distance, time, np.zeros(10001), marathon_pace=marathon_pace)
+    expected = splits.long_run_splits(10, "mi", marathon_pace)
+    assert [row["Target Pace"] for row in rows] == [row["Target Pace"] for row in expected]
+    assert rows[0]["On Target"] and not rows[-1]["On Target"]
@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from api import imports
+
+async def _chunks(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+def _collect(rows):
+    async def collect():
+        return [row async for row in rows]
+    return asyncio.run(collect())
+
+def test_iter_csv_rows_across_chunks():
+    data = b'name,distance,notes\nEasy,5,"two\nlines"\nTempo,6.5,\n'
+    rows = _collect(imports.iter_csv_rows(_chunks(data)))
+    assert rows == [
+        (1, {"name": "Easy", "distance": "5", "notes": "two\nlines"}),
+        (2, {"name": "Tempo", "distance": "6.5"}),
+    ]
+
+def test_iter_csv_rows_column_mismatch():
+    rows = _collect(imports.iter_csv_rows(_chunks(b"name,distance\nEasy\n")))
+    assert rows[0][0] == 1
+    assert isinstance(rows[0][1], ValueError)
+
+def test_iter_ndjson_rows():
+    data = b'{"name": "Easy"}\n\nnot json\n{"name": "Tempo"}'
+    rows = _collect(imports.iter_ndjson_rows(_chunks(data)))
+    assert rows[0] == (1, {"name": "Easy"})
+    assert isinstance(rows[1][1], ValueError)
+    assert rows[2] == (3, {"name": "Tempo"})
+
+def test_undecodable_lines_are_row_errors():
+    rows = _collect(imports.iter_ndjson_rows(_chunks(b'\xff\xfe\n{"name": "Easy"}\n')))
+    assert isinstance(rows[0][1], ValueError) and "UTF-8" in str(rows[0][1])
+    assert rows[1] == (2, {"name": "Easy"})
+    rows = _collect(imports.iter_csv_rows(_chunks(b'name\nEa\xffsy\n"bad\xff\nstill bad"\nTempo\n')))
+    assert [row for row, _ in rows] == [1, 2, 3]
+    assert all(isinstance(data, ValueError) for _, data in rows[:2])
+    assert rows[2] == (3, {"name": "Tempo"})
+
+def test_undecodable_csv_header():
+    with pytest.raises(imports.UnreadableUploadError):
+        _collect(imports.iter_csv_rows(_chunks(b"na\xffme\nEasy\n")))
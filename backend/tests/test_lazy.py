@@ -0,0 +1,16 @@
+import subprocess
+import sys
+from pathlib import Path
+from api.core import database
+from api.core.lazy import lazy_import
+
+def test_lazy_import_returns_loaded_module():
+    assert lazy_import("json") is sys.modules["json"]
+
+def test_main_does_not_import_numpy():
+    code = ("import sys, main; assert type(sys.modules['numpy']).__name__ == '_LazyModule'; "
+            "from api import batch; batch.get_vdot([42195], [12600]); "
+            "assert type(sys.modules['numpy']).__name__ == 'module'")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parents[1],
+                   env={"DATABASE_URL": database.DATABASE_URL, "ENVIRONMENT": "TESTING",
+                        "SERVERLESS": "true", "PATH": ""})
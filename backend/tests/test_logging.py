@@ -0,0 +1,98 @@
+import json
+import logging
+import logging.config
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from uvicorn.config import LOGGING_CONFIG
+from api.core import logging as app_logging
+from api.core.logging import (
+    BackgroundHandler,
+    JsonFormatter,
+    RequestIdFilter,
+    RequestLogMiddleware,
+    SamplingFilter,
+    request_id,
+)
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+def _record(name="api.routers", level=logging.INFO, msg="Fetching workout %s", args=(7,), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter():
+    line = json.loads(JsonFormatter().format(_record(request_id="abc", duration_ms=1.5)))
+    assert line["message"] == "Fetching workout 7"
+    assert line["level"] == "INFO"
+    assert line["logger"] == "api.routers"
+    assert line["request_id"] == "abc"
+    assert line["duration_ms"] == 1.5
+
+def test_sampling_filter():
+    sampler = SamplingFilter({"api.access": 0.0, "api": 1.0})
+    assert not sampler.filter(_record("api.access"))
+    assert not sampler.filter(_record("api.access.child"))
+    assert sampler.filter(_record("api.access", level=logging.WARNING))
+    assert sampler.filter(_record("api.routers"))
+    assert sampler.filter(_record("uvicorn"))
+
+def test_background_handler_formats_on_listener():
+    output = ListHandler()
+    output.setFormatter(JsonFormatter())
+    handler = BackgroundHandler(SimpleQueue())
+    handler.addFilter(RequestIdFilter())
+    listener = QueueListener(handler.queue, output)
+    logger = logging.getLogger("tests.background")
+    logger.propagate = False
+    logger.addHandler(handler)
+    listener.start()
+    try:
+        args = [1]
+        token = request_id.set("req-1")
+        logger.warning("values %s", args)
+        request_id.reset(token)
+        args.append(2)  # rendered before the record left the caller
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+    line = json.loads(output.lines[0])
+    assert line["message"] == "values [1]"
+    assert line["request_id"] == "req-1"
+
+def test_request_log_middleware(caplog):
+    app = FastAPI()
+    app.add_middleware(RequestLogMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"request_id": request_id.get()}
+
+    client = TestClient(app)
+    with caplog.at_level(logging.INFO, logger="api.access"):
+        response = client.get("/ping", headers={"X-Request-ID": "given"})
+    assert response.headers["x-request-id"] == "given"
+    assert response.json() == {"request_id": "given"}
+    access = [r for r in caplog.records if r.name == "api.access"][-1]
+    assert (access.method, access.path, access.status) == ("GET", "/ping", 200)
+    assert access.duration_ms >= 0
+    generated = client.get("/ping")
+    assert len(generated.headers["x-request-id"]) == 32
+
+def test_setup_logging_takes_over_uvicorn_loggers(monkeypatch):
+    # as `uvicorn main:app` leaves them before the app is imported
+    logging.config.dictConfig(LOGGING_CONFIG)
+    monkeypatch.setattr(app_logging, "_listener", object())
+    app_logging.setup_logging()
+    access, error = logging.getLogger("uvicorn.access"), logging.getLogger("uvicorn.error")
+    assert not access.hasHandlers()
+    assert not error.handlers and error.propagate
+    assert not logging.getLogger("uvicorn").handlers
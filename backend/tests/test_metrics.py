@@ -0,0 +1,22 @@
+from api.core.metrics import Histogram, MetricsRegistry
+
+def test_histogram_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+
+def test_registry_render():
+    registry = MetricsRegistry()
+    registry.describe("requests_total", "counter", "Requests")
+    registry.inc("requests_total", (("route", "/vdot"),))
+    registry.inc("requests_total", (("route", "/vdot"),))
+    registry.observe("latency_seconds", (), 0.003)
+    registry.register_collector(lambda: [("entries", (), 3)])
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/vdot"} 2' in text
+    assert 'latency_seconds_bucket{le="0.005"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "entries 3" in text
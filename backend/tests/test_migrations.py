@@ -0,0 +1,48 @@
+import asyncio
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, pool
+from sqlalchemy.ext.asyncio import create_async_engine
+from api import models
+from api.core import migrations
+
+def _revisions(url: str) -> set[str]:
+    async def read():
+        engine = create_async_engine(url, poolclass=pool.NullPool)
+        async with engine.connect() as connection:
+            revisions = await migrations.get_current_revisions(connection)
+        await engine.dispose()
+        return revisions
+
+    return asyncio.run(read())
+
+def _tables(url: str) -> set[str]:
+    async def read():
+        engine = create_async_engine(url, poolclass=pool.NullPool)
+        async with engine.connect() as connection:
+            tables = await connection.run_sync(lambda sync: inspect(sync).get_table_names())
+        await engine.dispose()
+        return set(tables)
+
+    return asyncio.run(read())
+
+def test_migrates_fresh_database_then_skips(tmp_path, monkeypatch):
+    url = f"sqlite+aiosqlite:///{tmp_path}/migrations.db"
+    monkeypatch.setattr(migrations.settings, "DATABASE_URL", url)
+    heads = set(ScriptDirectory.from_config(migrations.get_alembic_config()).get_heads())
+    assert _revisions(url) == set()
+
+    migrations.run_migrations()
+    assert _revisions(url) == heads
+
+    def upgrade(*args):
+        raise AssertionError("an up to date database was migrated again")
+
+    monkeypatch.setattr(migrations, "_upgrade", upgrade)
+    migrations.run_migrations()
+    assert _revisions(url) == heads
+
+def test_migrations_create_every_model_table(tmp_path, monkeypatch):
+    url = f"sqlite+aiosqlite:///{tmp_path}/migrations.db"
+    monkeypatch.setattr(migrations.settings, "DATABASE_URL", url)
+    migrations.run_migrations()
+    assert _tables(url) - {"alembic_version"} == set(models.Base.metadata.tables)
@@ -0,0 +1,30 @@
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api.core.openapi import build_schema, use_prebuilt_schema
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping() -> dict:
+        return {}
+    return app
+
+def test_prebuilt_schema_served_from_file(tmp_path):
+    path = tmp_path / "openapi.json"
+    build_schema(_app(), path)
+    schema = json.loads(path.read_text())
+    schema["info"]["title"] = "prebuilt"
+    path.write_text(json.dumps(schema))
+
+    app = _app()
+    use_prebuilt_schema(app, path)
+    response = TestClient(app).get("/openapi.json")
+    assert response.json()["info"]["title"] == "prebuilt"
+    assert "/ping" in response.json()["paths"]
+
+def test_prebuilt_schema_missing_file(tmp_path):
+    app = _app()
+    use_prebuilt_schema(app, tmp_path / "missing.json")
+    assert "/ping" in TestClient(app).get("/openapi.json").json()["paths"]
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from api import pacing, routers
+from api.pacing import UPDATE_FORMAT, pace_update, parse_update
+
+app = FastAPI()
+app.include_router(routers.router)
+client = TestClient(app)
+
+GOAL = timedelta(hours=3, minutes=30)
+
+def test_pace_update_on_goal_pace():
+    # halfway in exactly half the goal time
+    update = pace_update(GOAL, 42195, 6300, 21097.5, unit="km")
+    assert update["required_pace"] == "4:58"
+    assert update["projected_finish"] == "3:30:00"
+    assert update["goal_delta"] == 0
+
+def test_pace_update_behind_goal():
+    update = pace_update(GOAL, 42195, 3600, 10000, unit="mi")
+    # 2:30:00 left for 32.195km
+    assert update["required_pace"] == "7:30"
+    # 6:00/km so far
+    assert update["projected_finish"] == "4:13:10"
+    assert update["goal_delta"] == 2590
+
+def test_pace_update_edges():
+    start = pace_update(GOAL, 42195, 0, 0, unit="km")
+    assert start["required_pace"] == "4:58"
+    assert start["projected_finish"] is None and start["goal_delta"] is None
+    finished = pace_update(GOAL, 42195, 12500, 42300, unit="km")
+    assert finished["required_pace"] is None
+    assert finished["distance"] == 42195
+    assert finished["projected_finish"] == "3:28:20"
+    assert finished["goal_delta"] == -100
+    too_late = pace_update(GOAL, 42195, 13000, 40000, unit="km")
+    assert too_late["required_pace"] is None
+    assert too_late["goal_delta"] > 0
+
+@pytest.mark.parametrize("message", ["", "[]", "{}", '{"elapsed": 10}', '{"elapsed": "x", "distance": 1}',
+                                     '{"elapsed": NaN, "distance": 1}', '{"elapsed": -1, "distance": 1}',
+                                     '{"elapsed": 1e15, "distance": 100}'])
+def test_parse_update_rejects(message):
+    with pytest.raises(ValueError, match="expected"):
+        parse_update(message)
+
+def test_pace_update_waits_for_distance_to_project():
+    update = pace_update(GOAL, 42195, *parse_update('{"elapsed": 100, "distance": 1e-9}'))
+    assert update["projected_finish"] is None and update["goal_delta"] is None
+    longest = pace_update(GOAL, 1_000_000, *parse_update('{"elapsed": 604800, "distance": 10}'))
+    assert longest["goal_delta"] > 0
+
+def test_race_live_streams_updates():
+    with client.websocket_connect("/race/live?goal_time=3:30:00&distance=42195&unit=km") as websocket:
+        websocket.send_text('{"elapsed": 6300, "distance": 21097.5}')
+        assert websocket.receive_json()["goal_delta"] == 0
+        websocket.send_text("not json")
+        assert websocket.receive_json() == {"error": UPDATE_FORMAT}
+        websocket.send_text('{"elapsed": 1e15, "distance": 100}')
+        assert websocket.receive_json() == {"error": UPDATE_FORMAT}
+        websocket.send_bytes(b'{"elapsed": 3600, "distance": 10000}')
+        assert websocket.receive_json()["projected_finish"] == "4:13:10"
+        assert pacing._connections == 1
+    assert pacing._connections == 0
+
+def test_race_live_rejects_bad_query():
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/race/live?goal_time=soon&distance=42195") as websocket:
+            websocket.receive_json()
+
+def test_race_live_connection_limit(monkeypatch):
+    monkeypatch.setattr(pacing.settings, "RACE_PACING_MAX_CONNECTIONS", 0)
+    with client.websocket_connect("/race/live?goal_time=3:30:00&distance=42195") as websocket:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1013
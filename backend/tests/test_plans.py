@@ -0,0 +1,34 @@
+from datetime import date
+from api import plans
+
+def test_generate_plan_shape():
+    plan = plans.generate_plan("Marathon", 53.5, date(2026, 11, 4), 50, weeks=16, max_heart_rate=185)
+    assert len(plan["weeks"]) == 16
+    assert [w["phase"] for w in plan["weeks"][-2:]] == ["Taper", "Taper"]
+    assert max(w["volume"] for w in plan["weeks"]) == 50
+    first_day = plan["weeks"][0]["days"][0]
+    assert first_day["date"] == date(2026, 11, 9)
+    race = plan["weeks"][-1]["days"][-1]
+    assert race["name"] == "Marathon Race"
+    assert race["pace"] == plan["training_paces"]["Marathon"]
+
+def test_generate_plan_long_run_splits():
+    plan = plans.generate_plan("Half Marathon", 50, date(2026, 11, 2), 40, weeks=12, unit="km")
+    long_run = plan["weeks"][0]["days"][-1]
+    assert long_run["name"] == "Long Run"
+    assert long_run["splits"][-1]["km"] == long_run["distance"]
+    assert "heart_rate" not in long_run
+
+def test_plan_workouts_skip_rest_days():
+    plan = plans.generate_plan("5K", 45, date(2026, 11, 2), 30, weeks=12)
+    workouts = plans.plan_workouts(plan)
+    assert all(w["name"] != "Rest" for w in workouts)
+    assert workouts[-1]["name"] == "5K Race"
+
+def test_generate_plan_low_volume_rests_instead_of_zero_runs():
+    plan = plans.generate_plan("Marathon", 40, date(2026, 11, 2), 1, weeks=12)
+    days = [day for week in plan["weeks"] for day in week["days"]]
+    assert all(day["distance"] > 0 for day in days if "distance" in day)
+    assert plan["weeks"][0]["days"][-1]["name"] == "Rest"
+    assert all(w["distance"] > 0 for w in plans.plan_workouts(plan))
+    assert plan["weeks"][-1]["days"][-1]["name"] == "Marathon Race"
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from api.core import profiling
+from api.core.profiling import AWAITING, TRUNCATED, ProfiledRoute, Profiler, ProfilerMiddleware
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _client(profiler: Profiler, **options) -> TestClient:
+    router = APIRouter(route_class=ProfiledRoute)
+
+    @router.get("/sync")
+    def sync_route():
+        _spin(0.05)
+        return {}
+
+    @router.get("/async")
+    async def async_route():
+        _spin(0.05)
+        await asyncio.sleep(0.05)
+        return {}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ProfilerMiddleware, profiler=profiler, **options)
+    return TestClient(app)
+
+def test_profiles_sync_route_in_threadpool():
+    profiler = Profiler(interval=0.001)
+    client = _client(profiler, token="secret")
+    assert client.get("/sync", headers={"X-Profile": "secret"}).status_code == 200
+    stacks = profiler.render().splitlines()
+    assert stacks
+    assert all(line.startswith("GET /sync;") for line in stacks)
+    assert any("test_profiling:_spin" in line for line in stacks)
+
+def test_profiles_async_route_running_and_awaiting():
+    profiler = Profiler(interval=0.001)
+    client = _client(profiler, sample_rate=1.0)
+    assert client.get("/async").status_code == 200
+    stacks = profiler.render().splitlines()
+    running = [line for line in stacks if "test_profiling:_spin" in line]
+    awaiting = [line for line in stacks if AWAITING in line]
+    assert running and awaiting
+    assert all("async_route" in line for line in running + awaiting)
+
+def test_unselected_requests_are_not_profiled():
+    profiler = Profiler(interval=0.001)
+    client = _client(profiler, token="secret")
+    client.get("/sync")
+    client.get("/sync", headers={"X-Profile": "wrong"})
+    assert profiler.samples == 0
+    assert profiler.render() == ""
+
+def test_stack_table_is_bounded():
+    profiler = Profiler(max_stacks=2)
+    for label in ("GET /a", "GET /b", "GET /c", "GET /c", "GET /a"):
+        profiler.record(label, [])
+    assert profiler.render().splitlines() == ["GET /a 2", "GET /b 1", f"{TRUNCATED} 2"]
+    profiler.reset()
+    assert profiler.render() == ""
+
+def test_admin_endpoint_requires_token(monkeypatch):
+    monkeypatch.setattr(profiling.settings, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "profiler", Profiler())
+    profiling.profiler.record("GET /vdot", [])
+    app = FastAPI()
+    app.include_router(profiling.router)
+    client = TestClient(app)
+    assert client.get("/admin/profile").status_code == 401
+    response = client.get("/admin/profile", headers={"X-Profile": "secret"})
+    assert response.text == "GET /vdot 1\n"
+    assert client.delete("/admin/profile", headers={"X-Profile": "secret"}).status_code == 204
+    assert profiling.profiler.samples == 0
+
+def test_admin_endpoint_hidden_without_token(monkeypatch):
+    monkeypatch.setattr(profiling.settings, "PROFILE_TOKEN", None)
+    app = FastAPI()
+    app.include_router(profiling.router)
+    client = TestClient(app)
+    assert client.get("/admin/profile").status_code == 404
+    assert client.delete("/admin/profile").status_code == 404
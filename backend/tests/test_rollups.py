@@ -0,0 +1,30 @@
+from datetime import date
+from api import rollups
+
+def test_rollup_deltas_group_by_week_and_month():
+    workouts = [
+        {"athlete_id": 1, "date": date(2026, 10, 5), "distance": 8, "time": 3600},
+        {"athlete_id": 1, "date": date(2026, 10, 11), "distance": 6.5, "time": None},
+        {"athlete_id": 1, "date": date(2026, 10, 12), "distance": 20, "time": 10200},
+        {"athlete_id": None, "date": date(2026, 10, 12), "distance": None, "time": None},
+        {"athlete_id": 1, "date": None, "distance": 5, "time": 1500},
+    ]
+    deltas = {(d["athlete_id"], d["period"], d["period_start"]): d for d in rollups.rollup_deltas(workouts)}
+    assert deltas[(1, "week", date(2026, 10, 5))] == {
+        "athlete_id": 1, "period": "week", "period_start": date(2026, 10, 5),
+        "distance": 14.5, "time": 3600, "count": 2,
+    }
+    assert deltas[(1, "week", date(2026, 10, 12))]["count"] == 1
+    assert deltas[(1, "month", date(2026, 10, 1))]["distance"] == 34.5
+    assert deltas[(rollups.NO_ATHLETE, "week", date(2026, 10, 12))]["count"] == 1
+    assert len(deltas) == 5
+
+def test_rollup_deltas_remove_and_sorted():
+    workouts = [
+        {"athlete_id": 2, "date": date(2026, 11, 2), "distance": 3, "time": 900},
+        {"athlete_id": 1, "date": date(2026, 10, 5), "distance": 8, "time": 3600},
+    ]
+    deltas = rollups.rollup_deltas(workouts, sign=-1)
+    keys = [(d["athlete_id"], d["period"], d["period_start"]) for d in deltas]
+    assert keys == sorted(keys)
+    assert all(d["count"] == -1 and d["distance"] < 0 for d in deltas)
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from api import routers
+from api.models import Workout
+
+app = FastAPI()
+app.include_router(routers.router)
+client = TestClient(app)
+
+def _seed(engine, count: int) -> None:
+    async def seed():
+        async with engine.begin() as connection:
+            await connection.execute(insert(Workout), [
+                {"name": f"Run {i}", "distance": float(i), "time": 600 * i} for i in range(1, count + 1)
+            ])
+
+    asyncio.run(seed())
+
+def test_get_workouts_pages_by_id(sqlite_database):
+    _seed(sqlite_database, 5)
+    first = client.get("/get_workouts", params={"limit": 2}).json()
+    assert [w["name"] for w in first["workouts"]] == ["Run 1", "Run 2"]
+    assert first["next_after_id"] == first["workouts"][-1]["id"]
+    second = client.get("/get_workouts", params={"limit": 2, "after_id": first["next_after_id"]}).json()
+    assert [w["name"] for w in second["workouts"]] == ["Run 3", "Run 4"]
+    last = client.get("/get_workouts", params={"limit": 2, "after_id": second["next_after_id"]}).json()
+    assert [w["name"] for w in last["workouts"]] == ["Run 5"]
+    assert last["next_after_id"] is None
+
+def test_get_workouts_empty_page(sqlite_database):
+    assert client.get("/get_workouts").json() == {"workouts": [], "next_after_id": None}
+
+def test_get_workouts_streams_ndjson(sqlite_database):
+    _seed(sqlite_database, 3)
+    response = client.get("/get_workouts", params={"format": "ndjson", "after_id": 1, "limit": 1})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    workouts = [json.loads(line) for line in response.text.splitlines()]
+    assert [w["name"] for w in workouts] == ["Run 2", "Run 3"]
+    assert workouts[0]["time"] == "20:00"
+
+def test_plans_with_low_weekly_volume():
+    response = client.post("/plans", json={"goal_race": "Marathon", "vdot": 40,
+                                           "start_date": "2026-11-02", "weekly_volume": 1})
+    assert response.status_code == 200
+
+def test_create_workout_accepts_day_long_time(sqlite_database):
+    response = client.post("/create_workout", json={"name": "Ultra", "time": "25:00:00", "distance": 100})
+    assert response.status_code == 200
+    assert response.json()["time"] == "25:00:00"
+
+def test_bulk_import_reports_invalid_rows(sqlite_database):
+    body = b'{"name": "Easy", "time": "40:00"}\n\xff\xfe\n{"name": ""}\nnot json\n{"name": "Tempo"}\n'
+    response = client.post("/workouts/bulk", content=body, params={"batch_size": 1},
+                           headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 2 and result["failed"] == 3
+    assert [error["row"] for error in result["errors"]] == [2, 3, 4]
+    names = [w["name"] for w in client.get("/get_workouts").json()["workouts"]]
+    assert names == ["Easy", "Tempo"]
+
+def test_bulk_import_unreadable_csv_header(sqlite_database):
+    response = client.post("/workouts/bulk", content=b"na\xffme\nEasy\n", headers={"content-type": "text/csv"})
+    assert response.status_code == 422
+
+def test_race_predictions_reject_impossible_inputs():
+    assert client.get("/race_predictions", params={"distance": 0, "time": "20:00"}).status_code == 422
+    assert client.get("/race_predictions", params={"vdot": 0}).status_code == 422
+    assert client.get("/race_predictions", params={"vdot": 1000}).status_code == 422
+    assert client.get("/race_predictions", params={"distance": 1, "time": "59:00"}).status_code == 422
+    assert client.get("/race_predictions", params={"vdot": 50}).json()["predictions"]["5K"] == "19:56"
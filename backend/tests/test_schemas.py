@@ -0,0 +1,35 @@
+from datetime import date
+import pytest
+from pydantic import ValidationError
+from api.schemas import WorkoutCreate, WorkoutResponse
+
+def test_workout_times_stored_as_seconds():
+    workout = WorkoutCreate(name="Long Run", pace="8:30", time="2:50:00", distance=120.5,
+                            date="2026-10-05", athlete_id=1)
+    row = workout.to_row()
+    assert row["pace"] == 510
+    assert row["time"] == 10200
+    assert row["date"] == date(2026, 10, 5)
+    assert WorkoutCreate(name="Easy").to_row()["pace"] is None
+
+def test_workout_response_formats_seconds():
+    response = WorkoutResponse.model_validate({"id": 1, "name": "Tempo", "pace": 370, "time": 3723})
+    assert response.pace == "6:10"
+    assert response.time == "1:02:03"
+
+def test_workout_response_reads_day_long_times():
+    # legacy rows accepted any string, e.g. "25:00:00"
+    response = WorkoutResponse.model_validate({"id": 1, "name": "Ultra", "time": 90000})
+    assert response.time == "25:00:00"
+    assert WorkoutResponse.model_validate_json(response.model_dump_json()).time == "25:00:00"
+
+def test_workout_accepts_day_long_times():
+    workout = WorkoutCreate(name="Ultra", time="25:00:00", pace="12:30")
+    assert workout.to_row()["time"] == 90000
+    assert WorkoutCreate(name="Multi-day", time="100:05:00").to_row()["time"] == 360300
+    with pytest.raises(ValidationError):
+        WorkoutCreate(name="Ultra", time="25:60:00")
+
+def test_workout_rejects_invalid_pace():
+    with pytest.raises(ValidationError):
+        WorkoutCreate(name="Tempo", pace="fast")
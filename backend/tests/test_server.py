@@ -0,0 +1,43 @@
+import os
+import server
+from api.core import database
+from api.core.cache import MemoryBackend, NullBackend, workout_cache
+
+def test_default_workers():
+    assert server.default_workers() >= 1
+
+def test_listen_reuses_inherited_socket(monkeypatch):
+    bound = server.listen("127.0.0.1", 0)
+    try:
+        monkeypatch.setenv(server.LISTEN_FD_ENV, str(bound.fileno()))
+        inherited = server.listen("127.0.0.1", 0)
+        assert inherited.getsockname() == bound.getsockname()
+        assert inherited.get_inheritable()
+        assert server.LISTEN_FD_ENV not in os.environ
+        inherited.detach()
+    finally:
+        bound.close()
+
+def test_forked_child_gets_own_pool():
+    parent_pool = database.engine.sync_engine.pool
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write, b"1" if database.engine.sync_engine.pool is not parent_pool else b"0")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b"1"
+    assert database.engine.sync_engine.pool is parent_pool
+
+def test_workout_cache_off_for_several_workers(monkeypatch):
+    monkeypatch.setattr(workout_cache, "backend", MemoryBackend())
+    server.configure_workout_cache(1)
+    assert isinstance(workout_cache.backend, MemoryBackend)
+    server.configure_workout_cache(4)
+    assert isinstance(workout_cache.backend, NullBackend)
+
+def test_workout_cache_kept_with_cache_server(monkeypatch):
+    monkeypatch.setattr(workout_cache, "backend", MemoryBackend())
+    monkeypatch.setattr(server.settings, "WORKOUT_CACHE_URL", "redis://localhost:6379/0")
+    server.configure_workout_cache(4)
+    assert isinstance(workout_cache.backend, MemoryBackend)
@@ -0,0 +1,38 @@
+from datetime import timedelta
+from api import calcs, splits
+
+def test_progressive_matches_pfitz_long_run_pace():
+    for distance in (5, 15, 22):
+        expected = calcs.pfitz_long_run_pace(distance, "mi", timedelta(seconds=360))
+        assert splits.long_run_splits(distance, "mi", timedelta(seconds=360)) == expected
+
+def test_fractional_distance():
+    table = splits.long_run_splits(15.5, "km", timedelta(seconds=240))
+    assert len(table) == 16
+    assert table[-1]["km"] == 15.5
+    assert table[0]["km"] == 1
+
+def test_progressive_fractional_distance_ends_at_fast_pace():
+    # 8:00 marathon pace: from 9:36 down to 8:48 over 1.5 miles
+    paces = splits.long_run_paces(1.5, timedelta(minutes=8))
+    assert paces.tolist() == [544, 528]
+    assert splits.split_paces(2.5, 600, 500).tolist() == [560, 520, 500]
+
+def test_even_and_negative_strategies():
+    even = splits.split_paces(10, 480, 420, "even")
+    assert set(even.tolist()) == {450}
+    negative = splits.split_paces(10, 480, 420, "negative")
+    assert negative[0] == 465 and negative[-1] == 435
+    assert (negative[:5] == 465).all() and (negative[5:] == 435).all()
+
+def test_columnar():
+    table = splits.long_run_splits(3, "mi", timedelta(seconds=360), columnar=True)
+    assert table["mi"] == [1, 2, 3]
+    assert len(table["Target Pace"]) == 3
+
+def test_short_and_fast_splits():
+    table = splits.long_run_splits(0.004, "mi", timedelta(seconds=360))
+    assert [row["mi"] for row in table] == [0.004]
+    assert splits.long_run_splits(1.005, "mi", timedelta(seconds=360))[-1]["mi"] == 1.0
+    fast = splits.long_run_splits(2, "km", timedelta(seconds=1))
+    assert all(row["Target Pace"].startswith("0:00 to ") for row in fast)
@@ -0,0 +1,31 @@
+import pytest
+from api import calcs
+from api.vdot_table import VdotTable
+
+def test_get_race_time_inverts_get_vdot():
+    for distance in calcs.DISTANCES.values():
+        time = calcs.get_race_time(54.6, distance)
+        assert calcs.get_vdot(distance, time) == 54.6
+
+def test_get_race_time():
+    time = calcs.get_race_time(30, calcs.DISTANCES['5K'])
+    assert calcs.format_time_delta(time) == '30:40'
+
+def test_vdot_table_matches_solver():
+    table = VdotTable()
+    times = table.race_times(47.33)
+    for name, distance in calcs.DISTANCES.items():
+        assert abs(times[name] - calcs.get_race_time(47.33, distance).total_seconds()) < 0.5
+
+def test_vdot_table_outside_grid():
+    table = VdotTable(vdot_min=40, vdot_max=50)
+    times = table.race_times(60)
+    assert times['5K'] == calcs.get_race_time(60, calcs.DISTANCES['5K']).total_seconds()
+
+def test_get_race_time_out_of_range():
+    for vdot, distance in ((-4.7, calcs.DISTANCES['Marathon']), (1000, calcs.DISTANCES['5K']),
+                           (50, 0)):
+        with pytest.raises(ValueError):
+            calcs.get_race_time(vdot, distance)
+    with pytest.raises(ValueError):
+        VdotTable(vdot_min=-5, vdot_max=10)
@@ -0,0 +1,82 @@
+import asyncio
+from api.write_buffer import WriteBuffer
+
+class FakeTable:
+    """Assigns ids like a sequence and records every batch written."""
+
+    def __init__(self, reject: str | None = None):
+        self.batches = []
+        self.reject = reject
+
+    async def write(self, rows):
+        self.batches.append([row["name"] for row in rows])
+        await asyncio.sleep(0)
+        results = []
+        for row in rows:
+            if row["name"] == self.reject:
+                results.append(ValueError(f"rejected {row['name']}"))
+            else:
+                results.append({**row, "id": sum(map(len, self.batches)) * 100 + len(results)})
+        return results
+
+def test_write_buffer_batches_by_size():
+    table = FakeTable()
+    buffer = WriteBuffer(table.write, batch_size=4, max_delay=10)
+
+    async def run():
+        written = await asyncio.gather(*(buffer.submit({"name": str(i)}) for i in range(8)))
+        await buffer.close()
+        return written
+    written = asyncio.run(run())
+    assert table.batches == [["0", "1", "2", "3"], ["4", "5", "6", "7"]]
+    assert [row["name"] for row in written] == [str(i) for i in range(8)]
+    assert len({row["id"] for row in written}) == 8
+
+def test_write_buffer_flushes_after_delay():
+    table = FakeTable()
+    buffer = WriteBuffer(table.write, batch_size=100, max_delay=0.01)
+
+    async def run():
+        written = await buffer.submit({"name": "a"})
+        await buffer.close()
+        return written
+    assert asyncio.run(run())["name"] == "a"
+    assert table.batches == [["a"]]
+
+def test_write_buffer_close_drains_queue():
+    table = FakeTable()
+    buffer = WriteBuffer(table.write, batch_size=2, max_delay=10)
+
+    async def run():
+        pending = [asyncio.ensure_future(buffer.submit({"name": str(i)})) for i in range(5)]
+        await asyncio.sleep(0)
+        await buffer.close()
+        assert table.batches == [["0", "1"], ["2", "3"], ["4"]]
+        assert len(await asyncio.gather(*pending)) == 5
+        # a later submit starts a new flusher
+        assert (await asyncio.gather(buffer.submit({"name": "5"}), buffer.close()))[0]["name"] == "5"
+    asyncio.run(run())
+
+def test_write_buffer_fails_only_rejected_rows():
+    buffer = WriteBuffer(FakeTable(reject="bad").write, batch_size=3, max_delay=10)
+
+    async def run():
+        results = await asyncio.gather(*(buffer.submit({"name": name}) for name in ("a", "bad", "c")),
+                                       return_exceptions=True)
+        await buffer.close()
+        return results
+    a, bad, c = asyncio.run(run())
+    assert a["name"] == "a" and c["name"] == "c"
+    assert isinstance(bad, ValueError)
+
+def test_write_buffer_reports_failed_batch():
+    async def broken(rows):
+        raise ConnectionError("database is down")
+    buffer = WriteBuffer(broken, batch_size=2, max_delay=10)
+
+    async def run():
+        results = await asyncio.gather(*(buffer.submit({"name": str(i)}) for i in range(2)),
+                                       return_exceptions=True)
+        await buffer.close()
+        return results
+    assert all(isinstance(result, ConnectionError) for result in asyncio.run(run()))